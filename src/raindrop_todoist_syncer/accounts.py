@@ -0,0 +1,215 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from http.cookiejar import DefaultCookiePolicy
+from pathlib import Path
+import signal
+import threading
+import time
+from typing import Any, Callable
+
+from loguru import logger
+import requests
+
+from raindrop_todoist_syncer.config import SystemConfig, UserConfig
+from raindrop_todoist_syncer.daemon import CycleStats, SyncDaemon, SyncFunc
+from raindrop_todoist_syncer.transport import (
+    RequestsTransport,
+    Transport,
+    build_http_client,
+)
+
+
+def load_accounts(accounts_dir: Path) -> dict[str, UserConfig]:
+    """
+    Load the config of every account in `accounts_dir`.
+
+    Each account is a directory laid out like `~/.config/rts`, with its own `.env`,
+    database, cache and logs. Directories without a `.env` file are ignored. Accounts
+    whose `.env` file is missing a secret are logged and skipped, so one bad account
+    doesn't stop the rest.
+
+    Returns
+    -------
+    dict[str, UserConfig]
+        User configs by account name, i.e. directory name.
+    """
+    accounts = {}
+    if not accounts_dir.is_dir():
+        return accounts
+    for config_dir in sorted(accounts_dir.iterdir()):
+        system_config = SystemConfig(config_dir=config_dir)
+        if not system_config.env_file.exists():
+            continue
+        try:
+            accounts[config_dir.name] = UserConfig.from_env_file(system_config)
+        except KeyError as err:
+            logger.error(f"Skipping account {config_dir.name}: {err}")
+    return accounts
+
+
+def shared_transport() -> RequestsTransport:
+    """
+    A pooled transport for every account to share. Cookies are never stored, so
+    nothing one account's responses set is sent with another's requests.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    return RequestsTransport(session)
+
+
+class AccountPool:
+    """
+    Sync many accounts in one process, on a pool of worker threads, e.g.
+    `rts accounts`.
+
+    Each account has its own `SyncDaemon`, so its tokens, database, Todoist rate
+    governor and Raindrop rate limit are its own and stay warm between cycles. The
+    HTTP clients of every account share one transport, so requests to the same host
+    share one connection pool.
+
+    An account runs at most one cycle at a time, and is due again `interval` seconds
+    after its last cycle finished. Due accounts are started least-served first, i.e.
+    in order of the total time their cycles have taken so far. A huge account
+    therefore holds at most one worker, and is started after the accounts it has
+    been keeping waiting, while the others keep cycling on the remaining workers.
+
+    Parameters
+    ----------
+    daemons : dict[str, SyncDaemon]
+        A daemon per account, by account name. Only their `run_cycle` is used.
+    workers : int, default = 4
+        Accounts synced at once.
+    interval : float, default = 300
+        Seconds from the end of an account's cycle to the start of its next.
+    clock : Callable, default = time.monotonic
+        Allow a fake clock to be passed for testing.
+
+    Example
+    -------
+    >>> pool = AccountPool.from_dir(accounts_dir, partial(sync_once, engine="async"))
+    >>> pool.run(rounds=1)
+    """
+
+    STOP_SIGNALS = SyncDaemon.STOP_SIGNALS
+
+    def __init__(
+        self,
+        daemons: dict[str, SyncDaemon],
+        workers: int = 4,
+        interval: float = 300,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.daemons = daemons
+        self.workers = workers
+        self.interval = interval
+        self._clock = clock
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_dir(
+        cls,
+        accounts_dir: Path,
+        sync: SyncFunc,
+        transport: Transport | None = None,
+        **kwargs: Any,
+    ) -> "AccountPool":
+        """
+        Build a pool for every account in `accounts_dir`, see `load_accounts`.
+
+        Parameters
+        ----------
+        accounts_dir : Path
+        sync : Callable
+            Runs one sync of an account, see `SyncDaemon`.
+        transport : Transport, default = None
+            Shared by every account. Defaults to `shared_transport()`.
+        **kwargs
+            Passed to `AccountPool`.
+        """
+        transport = transport or shared_transport()
+        daemons = {
+            name: SyncDaemon(user_config, sync, http=build_http_client(transport))
+            for name, user_config in load_accounts(accounts_dir).items()
+        }
+        return cls(daemons, **kwargs)
+
+    def install_signal_handlers(self) -> None:
+        """
+        Stop once the cycles in progress have finished on SIGTERM or SIGINT. Must be
+        called from the main thread.
+        """
+        for name in self.STOP_SIGNALS:
+            signal.signal(getattr(signal, name), self._handle_stop)
+
+    def run(self, rounds: int | None = None) -> dict[str, CycleStats]:
+        """
+        Sync accounts until each has run `rounds` cycles, or until stopped.
+
+        Parameters
+        ----------
+        rounds : int, default = None
+            Cycles per account. Runs until stopped if not given.
+
+        Returns
+        -------
+        dict[str, CycleStats]
+            The cycle timings of each account.
+        """
+        logger.info(f"Syncing {len(self.daemons)} accounts on {self.workers} workers.")
+        next_due = dict.fromkeys(self.daemons, 0.0)
+        running: dict[Future, str] = {}
+        with ThreadPoolExecutor(
+            self.workers, thread_name_prefix="rts-account"
+        ) as executor:
+            while True:
+                now = self._clock()
+                waiting = [
+                    name
+                    for name, daemon in self.daemons.items()
+                    if name not in running.values()
+                    and (rounds is None or daemon.stats.cycles < rounds)
+                ]
+                due = [name for name in waiting if next_due[name] <= now]
+                later = [next_due[name] - now for name in waiting if name not in due]
+                if not self._stop.is_set():
+                    for name in sorted(due, key=self._served_seconds)[
+                        : self.workers - len(running)
+                    ]:
+                        future = executor.submit(self._run_cycle, name)
+                        running[future] = name
+                if not running:
+                    if self._stop.is_set() or not waiting:
+                        break
+                    # Every worker is free, so nothing waiting is due yet.
+                    self._stop.wait(min(later))
+                    continue
+                # Wake for the next account to fall due, or else a free worker.
+                timeout = min(later) if later and not self._stop.is_set() else None
+                finished, _ = wait(
+                    running, timeout=timeout, return_when=FIRST_COMPLETED
+                )
+                for future in finished:
+                    next_due[running.pop(future)] = self._clock() + self.interval
+        stats = {name: daemon.stats for name, daemon in self.daemons.items()}
+        summary = {name: account.as_dict() for name, account in stats.items()}
+        logger.info(f"Account sync finished. Cycles: {summary}")
+        return stats
+
+    def stop(self) -> None:
+        """
+        Stop once the cycles in progress have finished.
+        """
+        self._stop.set()
+
+    def _run_cycle(self, name: str) -> bool:
+        logger.info(f"Syncing account {name}.")
+        return self.daemons[name].run_cycle()
+
+    def _served_seconds(self, name: str) -> float:
+        return self.daemons[name].stats.total_seconds
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        logger.info(
+            f"Received {signal.Signals(signum).name}. Stopping after these cycles."
+        )
+        signal.signal(signum, signal.SIG_DFL)
+        self.stop()
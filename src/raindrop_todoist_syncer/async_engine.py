@@ -0,0 +1,547 @@
+import asyncio
+import threading
+import time
+from typing import Any, AsyncIterator
+
+from loguru import logger
+import requests
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.db_manage import DatabaseManager
+from raindrop_todoist_syncer.env_manage import EnvironmentVariablesFileManager
+from raindrop_todoist_syncer.rd_client import RaindropClient, RaindropPageDecoder
+from raindrop_todoist_syncer.rd_credentials import RaindropCredentialsManager
+from raindrop_todoist_syncer.rd_highlights import HighlightIndex
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.rd_token import RaindropAccessTokenRefresher
+from raindrop_todoist_syncer.routing import (
+    ResolutionCache,
+    Route,
+    TaskRouter,
+    load_routing_rules,
+)
+from raindrop_todoist_syncer.td_index import TodoistTaskIndex
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor, TodoistRateLimitError
+from raindrop_todoist_syncer.td_task import task_description
+from raindrop_todoist_syncer.transport import (
+    AsyncTransport,
+    HttpClient,
+    HttpResponse,
+    Transport,
+    build_http_client,
+    default_http_client,
+)
+
+
+class AsyncRaindropClient:
+    """
+    A non-blocking client for the Raindrop API, for use on an event loop.
+
+    Pages are requested concurrently, up to `max_concurrency` at once, and checked
+    with the same validators as `RaindropClient`. A 401 refreshes the access token
+    once, however many requests see it, and the requests are retried.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    http : HttpClient
+        An HTTP client with an async transport.
+    max_concurrency : int, default = 4
+        The most Raindrop requests in flight at once.
+
+    Example
+    -------
+    >>> http = build_http_client(AsyncTransport())
+    >>> raindrop_client = AsyncRaindropClient(user_config, http)
+    >>> async for response in raindrop_client.iter_pages():
+    ...     ...
+    """
+
+    BASE_URL = RaindropClient.BASE_URL
+    OAUTH_URL = "https://raindrop.io/oauth/access_token"
+    RAINDROPS_PER_PAGE = RaindropClient.RAINDROPS_PER_PAGE
+    HIGHLIGHTS_PER_PAGE = RaindropClient.HIGHLIGHTS_PER_PAGE
+    MAX_ALLOWED_PAGES = RaindropClient.MAX_ALLOWED_PAGES
+
+    # Pages are checked with the same validators as the blocking client.
+    _response_validator = RaindropClient._response_validator
+    _extract_benchmark_count = RaindropClient._extract_benchmark_count
+    _calculate_max_pages = RaindropClient._calculate_max_pages
+    _data_validator = RaindropClient._data_validator
+    _individual_rd_validator = RaindropClient._individual_rd_validator
+    _cumulative_rds_validator = RaindropClient._cumulative_rds_validator
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        http: HttpClient,
+        max_concurrency: int = 4,
+    ) -> None:
+        self.user_config = user_config
+        self.http = http
+        self.headers = {"Authorization": f"Bearer {user_config.raindrop_access_token}"}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._refresh_lock = asyncio.Lock()
+
+    async def get_all_raindrops(self) -> list[dict[str, Any]]:
+        """
+        Fetch and validate every favourited raindrop.
+        """
+        decoder = RaindropPageDecoder(self)
+        async for response in self.iter_pages():
+            decoder.decode(response)
+        return decoder.finish()
+
+    async def iter_pages(self) -> AsyncIterator[HttpResponse]:
+        """
+        Yield the pages of favourited raindrops in order.
+
+        The count in the first page sets how many pages there are. The rest are then
+        all requested at once, so later pages are already on their way while earlier
+        ones are being processed.
+        """
+        first = await self._get_page(0)
+        yield first
+        target_pages = self._calculate_max_pages(
+            self._extract_benchmark_count(first.json())
+        )
+        pages = [
+            asyncio.ensure_future(self._get_page(page))
+            for page in range(1, target_pages)
+        ]
+        try:
+            for page in pages:
+                yield await page
+        finally:
+            for page in pages:
+                page.cancel()
+
+    async def get_highlights(self, newer_than: str | None = None) -> list[dict]:
+        """
+        The async version of `RaindropClient.get_highlights`.
+        """
+        highlights: list[dict[str, Any]] = []
+        for page in range(self.MAX_ALLOWED_PAGES):
+            params = {"page": page, "perpage": self.HIGHLIGHTS_PER_PAGE}
+            response = await self.request("GET", "highlights", params=params)
+            items = response.json().get("items", [])
+            highlights.extend(items)
+            if len(items) < self.HIGHLIGHTS_PER_PAGE:
+                break
+            if newer_than and any(item["created"] <= newer_than for item in items):
+                break
+        logger.info(f"Collected {len(highlights)} highlights.")
+        return highlights
+
+    async def get_collections(self) -> list[dict[str, Any]]:
+        """
+        The async version of `RaindropClient.get_collections`. Root and child
+        collections are requested together.
+        """
+        responses = await asyncio.gather(
+            self.request("GET", "collections"),
+            self.request("GET", "collections/childrens"),
+        )
+        collections = [item for r in responses for item in r.json().get("items", [])]
+        logger.info(f"Collected {len(collections)} collections.")
+        return collections
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> HttpResponse:
+        """
+        Make a Raindrop API request, refreshing the access token on a 401.
+
+        Transport errors and 5xx responses are retried by the HTTP client, as for
+        `RaindropClient`.
+
+        Raises
+        ------
+        requests.HTTPError
+            For any other error response.
+        """
+        async with self._semaphore:
+            headers = self.headers
+            response = await self.http.request_async(
+                method, f"{self.BASE_URL}/{endpoint}", headers=headers, **kwargs
+            )
+            if response.status_code == 401:
+                await self._refresh_token(headers)
+                response = await self.http.request_async(
+                    method,
+                    f"{self.BASE_URL}/{endpoint}",
+                    headers=self.headers,
+                    **kwargs,
+                )
+        response.raise_for_status()
+        return response
+
+    async def _get_page(self, page: int) -> HttpResponse:
+        params = {"perpage": self.RAINDROPS_PER_PAGE, "page": page, "search": "❤️"}
+        return await self.request("GET", "raindrops/0/", params=params)
+
+    async def _refresh_token(self, stale_headers: dict[str, str]) -> None:
+        """
+        Refresh the access token, unless another request already has.
+        """
+        async with self._refresh_lock:
+            if self.headers is not stale_headers:
+                return
+            logger.warning("Access token is stale.")
+            rcm = RaindropCredentialsManager(self.user_config)
+            evfm = EnvironmentVariablesFileManager(self.user_config)
+            ratr = RaindropAccessTokenRefresher(rcm, evfm)
+            response = await self.http.request_async(
+                "POST",
+                self.OAUTH_URL,
+                headers=rcm.HEADERS,
+                json=ratr._refresh_token_create_body(),
+            )
+            rcm.response_validator(response)
+            new_token = rcm.extract_access_token(response)
+            await asyncio.to_thread(evfm.write_new_access_token, new_token)
+            self.user_config.raindrop_access_token = new_token
+            self.headers = {"Authorization": f"Bearer {new_token}"}
+
+
+class AsyncTodoistClient:
+    """
+    A non-blocking client for the Todoist REST API writes used to create tasks.
+
+    Requests take their slot and budget from the run's `TodoistRateGovernor`, so they
+    share its limits with any blocking requests made in the same run. 429 responses
+    are retried after their `Retry-After`.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    http : HttpClient
+        An HTTP client with an async transport.
+    governor : TodoistRateGovernor
+        The rate governor for the run.
+    """
+
+    API_URL = "https://api.todoist.com/api/v1"
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        http: HttpClient,
+        governor: TodoistRateGovernor,
+    ) -> None:
+        self.http = http
+        self.governor = governor
+        self.headers = {"Authorization": f"Bearer {user_config.todoist_api_key}"}
+
+    async def add_task(self, **fields) -> dict[str, Any]:
+        return await self.request("POST", "tasks", json=fields)
+
+    async def add_comment(self, task_id: str, content: str) -> dict[str, Any]:
+        return await self.request(
+            "POST", "comments", json={"task_id": task_id, "content": content}
+        )
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
+        """
+        Make a Todoist API request inside the governor's limits.
+
+        Raises
+        ------
+        TodoistRateLimitError
+            If the request is still being throttled after `max_retries` retries.
+        requests.HTTPError
+            For any other error response.
+        """
+        attempt = 0
+        while True:
+            while (delay := self.governor.try_acquire()) > 0:
+                await asyncio.sleep(delay)
+            start = time.monotonic()
+            try:
+                response = await self.http.request_async(
+                    method, f"{self.API_URL}/{endpoint}", headers=self.headers, **kwargs
+                )
+            except requests.RequestException:
+                self.governor.release(time.monotonic() - start)
+                raise
+            latency = time.monotonic() - start
+            if response.status_code != 429:
+                self.governor.release(latency, response.status_code)
+                response.raise_for_status()
+                return response.json()
+            retry_after = self.governor.retry_after(response)
+            self.governor.release(latency, 429, retry_after)
+            attempt += 1
+            if attempt > self.governor.max_retries:
+                raise TodoistRateLimitError(
+                    f"Todoist still rate limiting after {self.governor.max_retries} "
+                    "retries."
+                )
+            logger.warning(
+                f"Todoist returned 429. Retrying in {retry_after:.1f}s "
+                f"(attempt {attempt}/{self.governor.max_retries})."
+            )
+
+
+class _BlockingRaindropClient:
+    """
+    Make the `AsyncRaindropClient` callable from worker threads, for the indexes that
+    are loaded off the event loop. Requests still run on the loop and its pool.
+    """
+
+    def __init__(
+        self, client: AsyncRaindropClient, loop: asyncio.AbstractEventLoop
+    ) -> None:
+        self._client = client
+        self._loop = loop
+
+    def get_highlights(self, newer_than: str | None = None) -> list[dict]:
+        return self._run(self._client.get_highlights(newer_than))
+
+    def get_collections(self) -> list[dict[str, Any]]:
+        return self._run(self._client.get_collections())
+
+    def _run(self, coroutine: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+
+class AsyncSyncEngine:
+    """
+        Fetch favourites and create their tasks on one event loop.
+
+        An asyncio alternative to `SyncPipeline`, with the same interface. Raindrop pages
+        are fetched concurrently. Each page's new favourites are diffed and their tasks
+        created while later pages are still arriving, and any token refresh interleaves
+        with both. Raindrop and Todoist requests share one pooled `AsyncTransport`, and
+    are recorded in the process-wide transport metrics.
+
+        The Todoist task index, highlight index and routing cache use blocking clients, so
+        they are loaded in a worker thread, once the first new favourite is found.
+
+        Parameters
+        ----------
+        user_config : UserConfig
+            A user config.
+        raindrop_client : RaindropClient
+            A blocking Raindrop client, used by `highlight_index` after the run.
+        database_manager : DatabaseManager
+            A database manager.
+        governor : TodoistRateGovernor, default = None
+            The rate governor for the run.
+        transport : Transport, default = None
+            Allow a fake transport to be passed for testing. Defaults to a new
+            `AsyncTransport` for each run.
+
+        Attributes
+        ----------
+        favourites : list[dict]
+            Every favourite fetched by `run`, as returned by the API.
+        created : list[Raindrop]
+            Raindrops whose tasks were created.
+        already_tasked : list[Raindrop]
+            New favourites that already had a Todoist task, added to the database without
+            creating another.
+
+        Example
+        -------
+        >>> engine = AsyncSyncEngine(user_config, raindrop_client, database_manager)
+        >>> favourites = engine.run()
+    """
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        raindrop_client: Any,
+        database_manager: DatabaseManager,
+        governor: TodoistRateGovernor | None = None,
+        transport: Transport | None = None,
+    ) -> None:
+        self.user_config = user_config
+        self.raindrop_client = raindrop_client
+        self.database_manager = database_manager
+        self.governor = governor or TodoistRateGovernor()
+        self.transport = transport
+        self.favourites: list[dict[str, Any]] = []
+        self.created: list[Raindrop] = []
+        self.already_tasked: list[Raindrop] = []
+        self.timings: dict[str, float] = {}
+        self._task_index: TodoistTaskIndex | None = None
+        self._highlight_index: HighlightIndex | None = None
+        self._router: TaskRouter | None = None
+        self._lock = threading.Lock()
+
+    def run(self) -> list[dict[str, Any]]:
+        """
+        Run the engine to completion from synchronous code, e.g. the CLI.
+
+        Returns
+        -------
+        list[dict]
+            Every favourite fetched, for finding changed and removed favourites.
+        """
+        return asyncio.run(self.run_async())
+
+    async def run_async(self) -> list[dict[str, Any]]:
+        """
+        Fetch every favourite and create tasks for the new ones.
+        """
+        start = time.perf_counter()
+        transport = self.transport or AsyncTransport()
+        http = build_http_client(transport, metrics=default_http_client().metrics)
+        try:
+            self._raindrops = AsyncRaindropClient(self.user_config, http)
+            self._todoist = AsyncTodoistClient(self.user_config, http, self.governor)
+            self._writes = asyncio.Semaphore(self.governor.max_concurrency)
+            self._prepare_lock = asyncio.Lock()
+            self._commit_lock = asyncio.Lock()
+            self._warm: asyncio.Future | None = None
+
+            rows = await asyncio.to_thread(self.database_manager.get_latest_database)
+            tracked_ids = {row["id"] for row in rows["Processed Raindrops"]}
+            decoder = RaindropPageDecoder(self._raindrops)
+            pages: list[asyncio.Task] = []
+            try:
+                async for response in self._raindrops.iter_pages():
+                    favourites = [
+                        rd for rd in decoder.decode(response) if rd.get("important")
+                    ]
+                    self.favourites.extend(favourites)
+                    new = [
+                        Raindrop(rd)
+                        for rd in favourites
+                        if rd["_id"] not in tracked_ids
+                    ]
+                    if new:
+                        pages.append(asyncio.create_task(self._create_page(new)))
+                decoder.finish()
+                self.timings["fetch_seconds"] = time.perf_counter() - start
+            finally:
+                # Tasks already created must still reach the database.
+                await asyncio.gather(*pages)
+        finally:
+            if self.transport is None:
+                await transport.aclose()
+        if self.created:
+            await asyncio.to_thread(self._task_index.save)
+        if self.already_tasked:
+            logger.warning(
+                f"{len(self.already_tasked)} new favourite(s) already have a Todoist "
+                "task. Added to database without creating tasks."
+            )
+        self.timings["total_seconds"] = time.perf_counter() - start
+        logger.info(
+            f"Fetched {len(self.favourites)} favourites. Created {len(self.created)} "
+            "tasks."
+        )
+        return self.favourites
+
+    def report(self) -> str:
+        """
+        The timings of the last run.
+        """
+        return ", ".join(f"{key}: {value:.2f}" for key, value in self.timings.items())
+
+    def highlight_index(self) -> HighlightIndex:
+        """
+        The highlight index, loaded on first use and shared with the run.
+        """
+        with self._lock:
+            if self._highlight_index is None:
+                self._highlight_index = HighlightIndex(
+                    self.user_config, self.raindrop_client
+                ).load()
+            return self._highlight_index
+
+    async def _create_page(self, raindrops: list[Raindrop]) -> None:
+        """
+        Create the tasks for a page of new favourites, then add them to the database.
+        """
+        if self._warm is None:
+            self._warm = asyncio.ensure_future(self._warm_up())
+        await self._warm
+        already_tasked, to_create = [], []
+        for raindrop in raindrops:
+            if self._task_index.contains(raindrop):
+                raindrop.task_id = self._task_index.task_id_for(raindrop)
+                already_tasked.append(raindrop)
+            else:
+                to_create.append(raindrop)
+        self._highlight_index.attach(to_create)
+        async with self._prepare_lock:
+            await asyncio.to_thread(self._router.prepare, to_create)
+        results = await asyncio.gather(
+            *(self._create_task(rd, self._router.route(rd)) for rd in to_create)
+        )
+        created = [rd for rd, ok in zip(to_create, results) if ok]
+        if not already_tasked and not created:
+            return
+        async with self._commit_lock:
+            await asyncio.to_thread(
+                self.database_manager.update_database, already_tasked + created
+            )
+            for raindrop in created:
+                self._task_index.add(raindrop.task_id, raindrop)
+            self.created.extend(created)
+            self.already_tasked.extend(already_tasked)
+
+    async def _create_task(self, raindrop: Raindrop, route: Route) -> bool:
+        """
+        The async version of `TodoistTaskCreator.create_task`.
+        """
+        fields: dict[str, Any] = {
+            "content": raindrop.title,
+            "description": task_description(raindrop),
+            "project_id": route.project_id,
+            "due_string": "today",
+            "due_lang": "en",
+            "priority": 1,
+            "labels": list(route.labels),
+        }
+        if route.section_id:
+            fields["section_id"] = route.section_id
+        async with self._writes:
+            try:
+                task = await self._todoist.add_task(**fields)
+            except Exception as e:
+                logger.error(f"Task not created for '{raindrop.title}': {e}")
+                return False
+            raindrop.task_id = task["id"]
+            try:
+                await self._todoist.add_comment(task["id"], raindrop.link)
+            except Exception as e:
+                logger.error(e)
+        logger.info(f"Created task: {task['content']}")
+        return True
+
+    async def _warm_up(self) -> None:
+        """
+        Load the task index, highlight index and routing cache, concurrently, in
+        worker threads.
+        """
+        raindrop_client = _BlockingRaindropClient(
+            self._raindrops, asyncio.get_running_loop()
+        )
+
+        def load_highlights() -> None:
+            with self._lock:
+                if self._highlight_index is None:
+                    self._highlight_index = HighlightIndex(
+                        self.user_config, raindrop_client
+                    ).load()
+
+        self._task_index, _, resolution_cache = await asyncio.gather(
+            asyncio.to_thread(
+                TodoistTaskIndex(self.user_config, governor=self.governor).load
+            ),
+            asyncio.to_thread(load_highlights),
+            asyncio.to_thread(
+                ResolutionCache(
+                    self.user_config,
+                    governor=self.governor,
+                    raindrop_client=raindrop_client,
+                ).load
+            ),
+        )
+        self._router = TaskRouter(
+            resolution_cache, load_routing_rules(self.user_config)
+        )
@@ -24,6 +24,9 @@ class UserConfigProtocol(Protocol):
     metafile_path: Path
     launch_agents_dir: Path
     logs_dir: Path
+    cache_dir: Path
+    routing_file: Path
+    accounts_dir: Path
     todoist_api_key: str
     raindrop_client_id: str
     raindrop_client_secret: str
@@ -39,20 +42,28 @@ class SystemConfig:
     ----------
     user_dir: Path, default = None
         Allow a directory to be passed as `user_dir` for testing.
+    config_dir: Path, default = None
+        Defaults to `~/.config/rts`. Each account synced by `rts accounts` has its own
+        config dir, in `accounts_dir`.
 
     """
 
-    def __init__(self, user_dir: Path | None = None) -> None:
+    def __init__(
+        self, user_dir: Path | None = None, config_dir: Path | None = None
+    ) -> None:
         if user_dir is None:
             self.user_dir = Path.home()
         else:
             self.user_dir = user_dir
-        self.config_dir = self.user_dir / ".config" / "rts"
+        self.config_dir = config_dir or self.user_dir / ".config" / "rts"
         self.env_file = self.config_dir / ".env"
         self.logs_dir = self.config_dir / "logs"
         self.database_dir = self.config_dir / "db"
         self.metafile_dir = self.config_dir / "metafile"
         self.metafile_path = self.metafile_dir / "metafile.txt"
+        self.cache_dir = self.config_dir / "cache"
+        self.routing_file = self.config_dir / "routing.json"
+        self.accounts_dir = self.config_dir / "accounts"
         self.launch_agents_dir = self.user_dir / "Library" / "LaunchAgents"
 
     def __repr__(self):
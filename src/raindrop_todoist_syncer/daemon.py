@@ -0,0 +1,358 @@
+import signal
+import threading
+import time
+from typing import Any, Callable
+
+from loguru import logger
+import requests
+
+from raindrop_todoist_syncer.config import UserConfig
+from raindrop_todoist_syncer.db_manage import DatabaseManager
+from raindrop_todoist_syncer.rd_client import RaindropClient
+from raindrop_todoist_syncer.schedule import AdaptiveSchedule
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.transport import HttpClient, default_http_client
+
+# One sync: (user_config, raindrop_client, database_manager, governor) -> changes
+SyncFunc = Callable[
+    [UserConfig, RaindropClient, DatabaseManager, TodoistRateGovernor], int
+]
+# Sync pushed raindrops: (..., governor, raindrop_ids) -> changes
+PushFunc = Callable[
+    [UserConfig, RaindropClient, DatabaseManager, TodoistRateGovernor, set[int]],
+    int,
+]
+
+
+class CycleStats:
+    """
+    Timings of the daemon's sync cycles.
+
+    Attributes
+    ----------
+    cycles : int
+        Cycles run, including failed ones.
+    failures : int
+        Cycles that raised an error.
+    last_seconds : float
+    max_seconds : float
+    total_seconds : float
+    """
+
+    def __init__(self) -> None:
+        self.cycles = 0
+        self.failures = 0
+        self.last_seconds = 0.0
+        self.max_seconds = 0.0
+        self.total_seconds = 0.0
+
+    def record(self, seconds: float, failed: bool = False) -> None:
+        self.cycles += 1
+        self.failures += failed
+        self.last_seconds = seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.total_seconds += seconds
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.cycles if self.cycles else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "failures": self.failures,
+            "last_seconds": round(self.last_seconds, 3),
+            "mean_seconds": round(self.mean_seconds, 3),
+            "max_seconds": round(self.max_seconds, 3),
+        }
+
+
+class SyncDaemon:
+    """
+    Run the sync every `interval` seconds in one long-lived process, e.g. `rts serve`.
+
+    Unlike a process per run, state is kept warm between cycles: the pooled HTTP
+    client, the Raindrop client and its checked access token, the database manager
+    and its last loaded database, and the Todoist rate governor with its budget. A
+    cycle that fails with a stale Raindrop token rebuilds the Raindrop client, which
+    refreshes the token, and runs again once.
+
+    SIGTERM and SIGINT stop the daemon once the cycle in progress has finished, so a
+    cycle is never cut off between creating tasks and storing them. A second signal
+    stops it at once. SIGHUP re-reads the `.env` file, rebuilds the clients and runs a
+    cycle straight away.
+
+    `trigger` also runs a cycle straight away, e.g. from a `TriggerServer`. Triggers
+    that arrive within `coalesce` seconds of each other, or while a cycle is running,
+    are coalesced into one cycle. If every trigger names a raindrop, the cycle only
+    syncs those raindrops with `push`; otherwise it is a full sync.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    sync : Callable
+        Runs one sync, given the user config, Raindrop client, database manager and
+        governor, and returns the number of changes found. See `main.sync_once`.
+    interval : float, default = 300
+        Seconds between the end of one cycle and the start of the next.
+    schedule : AdaptiveSchedule, default = None
+        If given, sets the wait after each cycle instead of `interval`.
+    push : Callable, default = None
+        Syncs pushed raindrops, given the same arguments as `sync` and a set of
+        raindrop ids. See `main.push_raindrops`. Without it, pushes run a full sync.
+    coalesce : float, default = 2
+        Seconds to wait after a trigger for others to join it.
+    max_cycles : int, default = None
+        Stop after this many cycles. Runs until signalled if not given.
+    http : HttpClient, default = None
+        Defaults to the process-wide client.
+    clock : Callable, default = time.perf_counter
+        Allow a fake clock to be passed for testing.
+
+    Attributes
+    ----------
+    stats : CycleStats
+        The timings of every cycle run.
+    last_changes : int
+        The number of changes found by the last cycle.
+    triggers : int
+        Triggers received.
+
+    Example
+    -------
+    >>> daemon = SyncDaemon(user_config, partial(sync_once, on_complete="tag"))
+    >>> daemon.install_signal_handlers()
+    >>> daemon.serve()
+    """
+
+    STOP_SIGNALS = ("SIGTERM", "SIGINT")
+    RELOAD_SIGNALS = ("SIGHUP",)
+
+    def __init__(
+        self,
+        user_config: UserConfig,
+        sync: SyncFunc,
+        interval: float = 300,
+        schedule: AdaptiveSchedule | None = None,
+        push: PushFunc | None = None,
+        coalesce: float = 2,
+        max_cycles: int | None = None,
+        http: HttpClient | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.user_config = user_config
+        self.sync = sync
+        self.interval = interval
+        self.schedule = schedule
+        self.push = push
+        self.coalesce = coalesce
+        self.max_cycles = max_cycles
+        self.http = http or default_http_client()
+        self._clock = clock
+        self.stats = CycleStats()
+        self.last_changes = 0
+        self.triggers = 0
+        self.governor = TodoistRateGovernor()
+        self.raindrop_client: RaindropClient | None = None
+        self.database_manager: DatabaseManager | None = None
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._reload = threading.Event()
+        self._trigger_lock = threading.Lock()
+        self._pushed: set[int] = set()
+        self._full_sync_requested = False
+
+    def install_signal_handlers(self) -> None:
+        """
+        Handle stop and reload signals. Must be called from the main thread.
+        """
+        for name in self.STOP_SIGNALS:
+            signal.signal(getattr(signal, name), self._handle_stop)
+        for name in self.RELOAD_SIGNALS:
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), self._handle_reload)
+
+    def serve(self) -> CycleStats:
+        """
+        Run cycles until stopped.
+
+        Returns
+        -------
+        CycleStats
+            The timings of every cycle run.
+        """
+        if self.schedule:
+            logger.info("Sync daemon started. Syncing on an adaptive schedule.")
+        else:
+            logger.info(f"Sync daemon started. Syncing every {self.interval}s.")
+        raindrop_ids = None
+        while not self._stop.is_set():
+            if self._reload.is_set():
+                self._reload.clear()
+                self.reload()
+            self.run_cycle(raindrop_ids)
+            if self.max_cycles is not None and self.stats.cycles >= self.max_cycles:
+                break
+            woken = self._wake.wait(self._delay())
+            self._wake.clear()
+            raindrop_ids = self._take_triggers() if woken else None
+        logger.info(f"Sync daemon stopped. Cycles: {self.stats.as_dict()}")
+        return self.stats
+
+    def stop(self) -> None:
+        """
+        Stop once the cycle in progress, if any, has finished.
+        """
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self, raindrop_id: int | None = None) -> None:
+        """
+        Run a cycle as soon as possible. Safe to call from any thread.
+
+        Parameters
+        ----------
+        raindrop_id : int, default = None
+            Only sync this raindrop, unless the cycle is coalesced with a full sync.
+        """
+        with self._trigger_lock:
+            self.triggers += 1
+            if raindrop_id is None:
+                self._full_sync_requested = True
+            else:
+                self._pushed.add(raindrop_id)
+            self._wake.set()
+
+    def reload(self) -> None:
+        """
+        Re-read the `.env` file and drop the clients built from it.
+        """
+        logger.info("Reloading config.")
+        self.user_config = UserConfig.from_env_file(self.user_config.system_config)
+        self.raindrop_client = None
+        self.database_manager = None
+
+    def run_cycle(self, raindrop_ids: set[int] | None = None) -> bool:
+        """
+        Run one sync, logging and recording its time. Errors are logged, not raised,
+        so one failed cycle doesn't stop the daemon.
+
+        Parameters
+        ----------
+        raindrop_ids : set[int], default = None
+            Only sync these raindrops, with `push`. A full sync if not given.
+
+        Returns
+        -------
+        bool
+            True if the sync succeeded.
+        """
+        start = self._clock()
+        failed = False
+        self.last_changes = 0
+        try:
+            try:
+                self.last_changes = self._sync(raindrop_ids)
+            except requests.HTTPError as err:
+                if not _stale_raindrop_token(err):
+                    raise
+                logger.warning("Raindrop access token went stale. Retrying cycle.")
+                self.raindrop_client = None
+                self.last_changes = self._sync(raindrop_ids)
+        except Exception as err:
+            failed = True
+            logger.exception(f"Sync cycle failed: {err}")
+        seconds = self._clock() - start
+        self.stats.record(seconds, failed)
+        logger.info(
+            f"Sync cycle {self.stats.cycles} {'failed' if failed else 'finished'} in "
+            f"{seconds:.2f}s. HTTP requests by host: {self._http_summary()}"
+        )
+        return not failed
+
+    def _delay(self) -> float:
+        """
+        Seconds to wait before the next cycle. A failed cycle counts as quiet, so
+        repeated failures back off too.
+        """
+        if self.schedule is None:
+            return self.interval
+        return self.schedule.record(self.last_changes > 0)
+
+    def _take_triggers(self) -> set[int] | None:
+        """
+        Wait `coalesce` seconds for more triggers, then take them all.
+
+        Returns
+        -------
+        set[int] | None
+            The raindrop ids to push, or None for a full sync.
+        """
+        with self._trigger_lock:
+            if not self._pushed and not self._full_sync_requested:
+                # Woken by a signal, not a trigger.
+                return None
+        self._stop.wait(self.coalesce)
+        with self._trigger_lock:
+            # Triggers from here on are for the next cycle.
+            self._wake.clear()
+            raindrop_ids, self._pushed = self._pushed, set()
+            full_sync, self._full_sync_requested = self._full_sync_requested, False
+        if raindrop_ids and not full_sync and self.push is not None:
+            logger.info(f"Triggered. Syncing pushed raindrops {sorted(raindrop_ids)}.")
+            return raindrop_ids
+        logger.info("Triggered. Running a full sync.")
+        return None
+
+    def _sync(self, raindrop_ids: set[int] | None = None) -> int:
+        # Pages cached while checking the token must not outlive the cycle.
+        self.http.clear_cache()
+        if self.raindrop_client is None:
+            self.raindrop_client = RaindropClient(self.user_config, self.http)
+        if self.database_manager is None:
+            self.database_manager = DatabaseManager(self.user_config)
+        clients = (
+            self.user_config,
+            self.raindrop_client,
+            self.database_manager,
+            self.governor,
+        )
+        if raindrop_ids:
+            return self.push(*clients, raindrop_ids)
+        return self.sync(*clients)
+
+    def _http_summary(self) -> dict[str, Any]:
+        """
+        The HTTP metrics for the cycle, which are then reset for the next.
+        """
+        if self.http.metrics is None:
+            return {}
+        summary = self.http.metrics.summary()
+        self.http.metrics.reset()
+        return summary
+
+    def _handle_stop(self, signum: int, frame: Any) -> None:
+        logger.info(
+            f"Received {signal.Signals(signum).name}. Stopping after this cycle."
+        )
+        # A second signal stops at once.
+        signal.signal(signum, signal.SIG_DFL)
+        self.stop()
+
+    def _handle_reload(self, signum: int, frame: Any) -> None:
+        logger.info(f"Received {signal.Signals(signum).name}. Reloading.")
+        self._reload.set()
+        self._wake.set()
+
+
+def _stale_raindrop_token(err: requests.HTTPError) -> bool:
+    """
+    Whether an error is a 401 from the Raindrop API.
+    """
+    if err.response is None:
+        return False
+    request = getattr(err.response, "request", None)
+    return err.response.status_code == 401 and (
+        getattr(request, "host", None) == "api.raindrop.io"
+    )
@@ -22,6 +22,10 @@ class DatabaseManager:
     A metafile, stored in 'metafile' in the project root, tracks the path to the most
     recent database version.
 
+    The last database loaded or written is kept in memory and reused while the latest
+    version's file is unchanged, so a long-lived manager, e.g. in `rts serve`, only
+    parses the database when it changes.
+
     Parameters
     ----------
     user_config : UserConfig
@@ -42,6 +46,7 @@ class DatabaseManager:
         self.database_directory = self.user_config.database_dir
         self.metafile_directory = self.user_config.metafile_dir
         self.metafile_path = self.user_config.metafile_path
+        self._cached: tuple[tuple[str, int, int], dict[str, Any]] | None = None
 
     def update_database(self, new_favourited_raindrop_objects: list[Raindrop]) -> bool:
         """
@@ -70,6 +75,49 @@ class DatabaseManager:
         db["Processed Raindrops"] = previous_rds + rds_to_add
         logger.info(f"New db length {len(db['Processed Raindrops'])}")
 
+        self._write_new_version(db)
+
+    def replace_rows(self, raindrop_objects: list[Raindrop]) -> None:
+        """
+        Replace the stored rows of already processed raindrops, e.g. after their tasks
+        are updated, and update the metafile.
+
+        Rows are matched by id. Raindrops without a stored row are ignored.
+
+        Parameters
+        ----------
+        raindrop_objects : List[Raindrop]
+            The raindrops whose rows should be replaced.
+        """
+        new_rows = {rd.id: rd.to_dict() for rd in raindrop_objects}
+        db: dict[str, list[dict[str, Any]]] = self.get_latest_database()
+        db["Processed Raindrops"] = [
+            new_rows.get(row["id"], row) for row in db["Processed Raindrops"]
+        ]
+        logger.info(f"Replacing {len(new_rows)} db row(s)")
+        self._write_new_version(db)
+
+    def remove_rows(self, raindrop_ids: set[int]) -> None:
+        """
+        Remove the stored rows of raindrops, e.g. after their tasks are closed, and
+        update the metafile.
+
+        Parameters
+        ----------
+        raindrop_ids : set[int]
+            The ids of the raindrops to remove.
+        """
+        db: dict[str, list[dict[str, Any]]] = self.get_latest_database()
+        db["Processed Raindrops"] = [
+            row for row in db["Processed Raindrops"] if row["id"] not in raindrop_ids
+        ]
+        logger.info(f"Removing {len(raindrop_ids)} db row(s)")
+        self._write_new_version(db)
+
+    def _write_new_version(self, db: dict[str, list[dict[str, Any]]]) -> None:
+        """
+        Write the database as a new numbered version and point the metafile at it.
+        """
         file_number = len(os.listdir(self.database_directory)) + 1
 
         output_file = (
@@ -86,6 +134,7 @@ class DatabaseManager:
         with open(self.metafile_path, "w") as metafile:
             metafile.write(new_database_file_name)
         logger.info("Metafile updated")
+        self._cached = (self._version_key(new_database_file_name), db)
 
     def get_latest_database(self) -> dict[str, Any]:
         """
@@ -93,6 +142,10 @@ class DatabaseManager:
         create a new, empty, database (with "Processed Raindrops" as the key, and an
         empty list as the value).
 
+        The database is only read from disk if it has changed since it was last
+        loaded or written by this manager. The lists returned are copies, so callers
+        may change them, but the rows in them are shared and must not be changed.
+
         Returns
         -------
         Dict[str, Any]
@@ -108,11 +161,26 @@ class DatabaseManager:
         with open(self.metafile_path, "r") as metafile:
             latest_version = metafile.read().strip()
 
-        with open(latest_version, "r") as f:
-            json_data = f.read()
-            latest_db = json.loads(json_data)
-
-        return latest_db
+        key = self._version_key(latest_version)
+        if self._cached is None or self._cached[0] != key:
+            with open(latest_version, "r") as f:
+                json_data = f.read()
+                self._cached = (key, json.loads(json_data))
+        else:
+            logger.debug("Reusing the loaded database.")
+
+        return {
+            name: list(value) if isinstance(value, list) else value
+            for name, value in self._cached[1].items()
+        }
+
+    @staticmethod
+    def _version_key(path: str) -> tuple[str, int, int]:
+        """
+        Identify a version of the database file by its path, mtime and size.
+        """
+        stat = os.stat(path)
+        return (path, stat.st_mtime_ns, stat.st_size)
 
     def _create_new_database_and_metafile(self) -> bool:
         """
@@ -1,25 +1,154 @@
 import argparse
 import datetime
+from functools import partial
 import traceback
 
 from loguru import logger
 
+from raindrop_todoist_syncer.accounts import AccountPool
+from raindrop_todoist_syncer.async_engine import AsyncSyncEngine
 from raindrop_todoist_syncer.config import UserConfig, SystemConfig
+from raindrop_todoist_syncer.daemon import SyncDaemon
 from raindrop_todoist_syncer.db_manage import DatabaseManager
 from raindrop_todoist_syncer.logging_config import configure_logging
 from raindrop_todoist_syncer.plist import AutomationManager
-from raindrop_todoist_syncer.rd_process import RaindropsProcessor
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.rd_process import RaindropChange, RaindropsProcessor
+from raindrop_todoist_syncer.reconcile import Reconciler
 from raindrop_todoist_syncer.rd_client import RaindropClient
-from raindrop_todoist_syncer.td_task import TodoistTaskCreator
+from raindrop_todoist_syncer.schedule import AdaptiveSchedule
+from raindrop_todoist_syncer.sync_pipeline import SyncPipeline
+from raindrop_todoist_syncer.td_completions import (
+    COMPLETION_ACTIONS,
+    TodoistCompletionReader,
+)
+from raindrop_todoist_syncer.td_index import TodoistTaskIndex, normalise_link
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.td_update import TodoistTaskCloser, TodoistTaskUpdater
+from raindrop_todoist_syncer.transport import default_http_client
+from raindrop_todoist_syncer.trigger import TriggerServer
+
+# Ways to fetch favourites and create their tasks. Both have the same interface.
+ENGINES = {"pipeline": SyncPipeline, "async": AsyncSyncEngine}
 
 
 def fetch_raindrops_and_create_tasks(
     user_config: UserConfig,
     raindrop_client: RaindropClient,
     database_manager: DatabaseManager,
+    governor: TodoistRateGovernor | None = None,
+    engine: str = "pipeline",
+) -> int:
+    """
+    Driver function to fetch raindrops, create and update tasks and update database.
+
+    New favourites become tasks as they are fetched, see `SyncPipeline` or, with the
+    "async" engine, `AsyncSyncEngine`. Processed favourites whose title, notes or link
+    have changed have their tasks updated, see `update_changed_tasks`. Processed
+    favourites that are no longer favourites have their tasks closed, see
+    `close_removed_tasks`.
+
+    Highlights are joined from a locally cached index of all the user's highlights,
+    so there is no per-task highlight request.
+
+    Parameters
+    ----------
+    user_config: UserConfig
+        A UserConfig object.
+    raindrop_client: RaindropClient
+        A RaindropClient object.
+    database_manager: DatabaseManager
+        A Database Manager object
+    governor: TodoistRateGovernor, default = None
+        A Todoist rate governor. A new one is created if none is given.
+    engine: str, default = "pipeline"
+        A key of `ENGINES`.
+
+    Returns
+    -------
+    int
+        The number of favourites that were new, changed or removed.
+    """
+    governor = governor or TodoistRateGovernor()
+    sync_pipeline = ENGINES[engine](
+        user_config, raindrop_client, database_manager, governor
+    )
+    favourites = sync_pipeline.run()
+    logger.info(f"Sync engine report:\n{sync_pipeline.report()}")
+
+    rp = RaindropsProcessor(user_config, favourites)
+    changes = rp.changed_raindrops_extractor()
+    removed = rp.removed_favourites_extractor()
+    if changes:
+        sync_pipeline.highlight_index().attach([change.raindrop for change in changes])
+        update_changed_tasks(user_config, database_manager, changes, governor)
+    if removed:
+        close_removed_tasks(user_config, database_manager, removed, governor)
+    logger.info(f"Todoist rate governor: {governor.stats()}")
+    new = len(sync_pipeline.created) + len(sync_pipeline.already_tasked)
+    return new + len(changes) + len(removed)
+
+
+def update_changed_tasks(
+    user_config: UserConfig,
+    database_manager: DatabaseManager,
+    changes: list[RaindropChange],
+    governor: TodoistRateGovernor,
 ) -> None:
     """
-    Driver function to fetch raindrops, create tasks and update database.
+    Update the tasks of changed favourites in batches, then their database rows.
+
+    Rows are only replaced for tasks that were updated, so a failed update is retried
+    on the next run.
+    """
+    updated = TodoistTaskUpdater(user_config, governor).update_tasks(changes)
+    if updated:
+        database_manager.replace_rows(updated)
+
+
+def close_removed_tasks(
+    user_config: UserConfig,
+    database_manager: DatabaseManager,
+    removed: list[dict],
+    governor: TodoistRateGovernor,
+) -> None:
+    """
+    Close the tasks of favourites that were unfavourited or deleted, in batches, then
+    remove their database rows.
+
+    Rows stored without a task id are looked up in the Todoist task index, which is
+    only loaded if there are any. A row with no task to close is just removed.
+    """
+    task_ids = {row["id"]: row.get("task_id") for row in removed}
+    if not all(task_ids.values()):
+        task_index = TodoistTaskIndex(user_config, governor=governor).load()
+        for row in removed:
+            if not task_ids[row["id"]]:
+                task_ids[row["id"]] = task_index.by_raindrop_id.get(
+                    row["id"]
+                ) or task_index.by_link.get(normalise_link(row["link"]))
+    closed = TodoistTaskCloser(user_config, governor).close_tasks(
+        {raindrop_id: task_id for raindrop_id, task_id in task_ids.items() if task_id}
+    )
+    no_task = {raindrop_id for raindrop_id, task_id in task_ids.items() if not task_id}
+    if closed or no_task:
+        database_manager.remove_rows(set(closed) | no_task)
+
+
+def sync_completions(
+    user_config: UserConfig,
+    raindrop_client: RaindropClient,
+    database_manager: DatabaseManager,
+    on_complete: str,
+    governor: TodoistRateGovernor | None = None,
+) -> int:
+    """
+    Apply Todoist task completions back to their raindrops.
+
+    Only the Todoist changes since the last run are read. Completed tasks are matched
+    to raindrops by the task id stored in the database, and the matching raindrops are
+    updated in bulk. Unfavourited raindrops are removed from the database, so their
+    (already completed) tasks are not closed again.
 
     Parameters
     ----------
@@ -29,14 +158,96 @@ def fetch_raindrops_and_create_tasks(
         A RaindropClient object.
     database_manager: DatabaseManager
         A Database Manager object
+    on_complete: str
+        "unfavourite" or "tag", see `COMPLETION_ACTIONS`.
+    governor: TodoistRateGovernor, default = None
+        A Todoist rate governor. A new one is created if none is given.
+
+    Returns
+    -------
+    int
+        The number of raindrops updated.
+    """
+    reader = TodoistCompletionReader(user_config, governor)
+    completed = reader.completed_task_ids()
+    raindrop_ids = []
+    if completed:
+        rows = database_manager.get_latest_database()["Processed Raindrops"]
+        raindrop_ids = [row["id"] for row in rows if row.get("task_id") in completed]
+        if raindrop_ids:
+            raindrop_client.update_raindrops(
+                raindrop_ids, COMPLETION_ACTIONS[on_complete]
+            )
+            if on_complete == "unfavourite":
+                database_manager.remove_rows(set(raindrop_ids))
+    reader.commit()
+    return len(raindrop_ids)
+
+
+def push_raindrops(
+    user_config: UserConfig,
+    raindrop_client: RaindropClient,
+    database_manager: DatabaseManager,
+    governor: TodoistRateGovernor,
+    raindrop_ids: set[int],
+) -> int:
+    """
+    Create tasks for raindrops pushed by id, without fetching every favourite.
+
+    Used by `rts serve` when a trigger names the raindrops to sync. Raindrops that
+    already have a database row or aren't favourites are skipped. Changes and
+    removals are left to the next full sync.
+
+    Returns
+    -------
+    int
+        The number of new favourites.
+    """
+    rows = database_manager.get_latest_database()["Processed Raindrops"]
+    tracked = {row["id"] for row in rows}
+    raindrops = []
+    for raindrop_id in sorted(set(raindrop_ids) - tracked):
+        raindrop = raindrop_client.get_raindrop(raindrop_id)
+        if raindrop and raindrop.get("important"):
+            raindrops.append(Raindrop(raindrop))
+    if not raindrops:
+        logger.info(f"No new favourites in pushed raindrops {sorted(raindrop_ids)}.")
+        return 0
+    sync_pipeline = SyncPipeline(
+        user_config, raindrop_client, database_manager, governor
+    )
+    sync_pipeline.create(raindrops)
+    return len(sync_pipeline.created) + len(sync_pipeline.already_tasked)
+
+
+def sync_once(
+    user_config: UserConfig,
+    raindrop_client: RaindropClient,
+    database_manager: DatabaseManager,
+    governor: TodoistRateGovernor,
+    on_complete: str = "unfavourite",
+    engine: str = "pipeline",
+) -> int:
     """
-    all_raindrops = raindrop_client.get_all_raindrops()
-    rp = RaindropsProcessor(user_config, all_raindrops)
-    tasks_to_create = rp.newly_favourited_raindrops_extractor()
-    for task in tasks_to_create:
-        task_creator = TodoistTaskCreator(user_config, task)
-        task_creator.create_task()
-        database_manager.update_database([task])
+    Run one full sync: apply completions back to Raindrop, unless `on_complete` is
+    "none", then fetch raindrops and create, update and close tasks.
+
+    Used by `rts run` once and by `rts serve` every cycle.
+
+    Returns
+    -------
+    int
+        The number of raindrops completed, and favourites new, changed or removed.
+    """
+    changes = 0
+    if on_complete != "none":
+        changes += sync_completions(
+            user_config, raindrop_client, database_manager, on_complete, governor
+        )
+    changes += fetch_raindrops_and_create_tasks(
+        user_config, raindrop_client, database_manager, governor, engine
+    )
+    return changes
 
 
 def driver(args: argparse.Namespace, user_config: UserConfig):
@@ -58,9 +269,59 @@ def driver(args: argparse.Namespace, user_config: UserConfig):
     logger.info(f"Parsed args were {args}")
 
     if args.command == "run":
+        schedule = AdaptiveSchedule(user_config).load() if args.adaptive else None
+        if schedule and not schedule.due():
+            logger.info(
+                f"Next sync not due for {schedule.seconds_until_due():.0f}s. Skipped."
+            )
+            return
         rc = RaindropClient(user_config)
         dbm = DatabaseManager(user_config)
-        fetch_raindrops_and_create_tasks(user_config, rc, dbm)
+        governor = TodoistRateGovernor()
+        changes = 0
+        try:
+            changes = sync_once(
+                user_config, rc, dbm, governor, args.on_complete, args.engine
+            )
+        finally:
+            # A failed sync counts as quiet, so repeated failures back off too.
+            if schedule:
+                schedule.record(changes > 0)
+        logger.info(f"HTTP requests by host: {default_http_client().metrics.summary()}")
+
+    elif args.command == "serve":
+        daemon = SyncDaemon(
+            user_config,
+            partial(sync_once, on_complete=args.on_complete, engine=args.engine),
+            interval=args.interval,
+            schedule=AdaptiveSchedule(user_config).load() if args.adaptive else None,
+            push=push_raindrops,
+        )
+        triggers = TriggerServer(
+            daemon,
+            port=args.port,
+            socket_path=user_config.config_dir / "rts.sock" if args.socket else None,
+        )
+        daemon.install_signal_handlers()
+        triggers.start()
+        try:
+            daemon.serve()
+        finally:
+            triggers.close()
+
+    elif args.command == "reconcile":
+        rc = RaindropClient(user_config)
+        dbm = DatabaseManager(user_config)
+        reconciler = Reconciler(user_config, rc, dbm)
+        plan = reconciler.plan()
+        print(plan.summary())
+        if plan.is_empty():
+            print("Nothing to reconcile.")
+        elif args.apply:
+            reconciler.apply(plan)
+            print("Plan applied.")
+        else:
+            print("Run with --apply to apply this plan.")
 
     elif args.command == "automate_enable":
         am = AutomationManager(user_config)
@@ -75,6 +336,24 @@ def driver(args: argparse.Namespace, user_config: UserConfig):
         raise NotImplementedError(f"No handler defined for command: {args.command}")
 
 
+def sync_accounts(args: argparse.Namespace, system_config: SystemConfig) -> None:
+    """
+    Sync every account in `system_config.accounts_dir`, once or, with `--serve`,
+    until stopped. See `AccountPool`.
+    """
+    pool = AccountPool.from_dir(
+        system_config.accounts_dir,
+        partial(sync_once, on_complete=args.on_complete, engine=args.engine),
+        workers=args.workers,
+        interval=args.interval,
+    )
+    if not pool.daemons:
+        logger.warning(f"No accounts found in {system_config.accounts_dir}.")
+        return
+    pool.install_signal_handlers()
+    pool.run(rounds=None if args.serve else 1)
+
+
 def parse_args() -> None:
     """
     Parse args.
@@ -91,16 +370,84 @@ def parse_args() -> None:
 
     subparsers = parser.add_subparsers(dest="command")
 
-    subparsers.add_parser("run", help="Fetch raindrops and create tasks")
+    run_parser = subparsers.add_parser("run", help="Fetch raindrops and create tasks")
+    _add_sync_arguments(run_parser)
+    serve_parser = subparsers.add_parser(
+        "serve", help="Keep running, fetching raindrops and creating tasks every cycle"
+    )
+    _add_sync_arguments(serve_parser)
+    serve_parser.add_argument(
+        "--interval",
+        type=float,
+        default=300,
+        help="Seconds to wait between cycles, if not --adaptive",
+    )
+    serve_parser.add_argument(
+        "--port",
+        type=int,
+        help="Accept sync triggers over HTTP on this localhost port",
+    )
+    serve_parser.add_argument(
+        "--socket",
+        action="store_true",
+        help="Accept sync triggers on the UNIX socket ~/.config/rts/rts.sock",
+    )
+    accounts_parser = subparsers.add_parser(
+        "accounts", help="Sync every account in ~/.config/rts/accounts"
+    )
+    _add_sync_arguments(accounts_parser)
+    accounts_parser.add_argument(
+        "--workers", type=int, default=4, help="Accounts to sync at once"
+    )
+    accounts_parser.add_argument(
+        "--serve", action="store_true", help="Keep syncing until stopped"
+    )
+    accounts_parser.add_argument(
+        "--interval",
+        type=float,
+        default=300,
+        help="With --serve, seconds between each account's cycles",
+    )
+    reconcile_parser = subparsers.add_parser(
+        "reconcile", help="Compare Raindrop, the database and Todoist and fix drift"
+    )
+    reconcile_parser.add_argument(
+        "--apply", action="store_true", help="Apply the plan, not just print it"
+    )
     subparsers.add_parser("automate_enable", help="Activate automation")
     subparsers.add_parser("automate_disable", help="Deactivate automation")
 
     # Default to 'run' if no command is given
-    parser.set_defaults(command="run")
+    parser.set_defaults(
+        command="run", on_complete="unfavourite", engine="pipeline", adaptive=False
+    )
 
     return parser.parse_args()
 
 
+def _add_sync_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the arguments shared by the commands that sync.
+    """
+    parser.add_argument(
+        "--on-complete",
+        choices=[*COMPLETION_ACTIONS, "none"],
+        default="unfavourite",
+        help="What to do to a raindrop when its task is completed",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default="pipeline",
+        help="Fetch and create tasks on threads (pipeline) or an event loop (async)",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Sync sooner after changes and less often while nothing changes",
+    )
+
+
 def main() -> None:
     """
     Entry point for raindrop todoist syncer.
@@ -110,6 +457,10 @@ def main() -> None:
     configure_logging(system_config)
     logger.info(system_config)
 
+    if args.command == "accounts":
+        # Each account has its own `.env`, so there needn't be one here.
+        sync_accounts(args, system_config)
+        return
     user_config = UserConfig.from_env_file(system_config)
     driver(args, user_config)
 
@@ -0,0 +1,312 @@
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable
+
+from loguru import logger
+
+# Marks the end of a stage's input.
+_DONE = object()
+
+
+class StageStats:
+    """
+    Counters for one pipeline stage.
+
+    Attributes
+    ----------
+    name : str
+        The stage name.
+    items_in : int
+        Items the stage processed.
+    items_out : int
+        Items the stage passed downstream.
+    busy_seconds : float
+        Time spent processing, summed across workers.
+    wait_seconds : float
+        Time workers spent waiting for input, summed across workers. High when the
+        stages before are the bottleneck.
+    blocked_seconds : float
+        Time spent waiting for space in the next stage's queue. High when the stages
+        after are the bottleneck.
+    elapsed_seconds : float
+        Wall time from the stage starting to it finishing.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.items_in = 0
+        self.items_out = 0
+        self.busy_seconds = 0.0
+        self.wait_seconds = 0.0
+        self.blocked_seconds = 0.0
+        self.elapsed_seconds = 0.0
+        # Shared by the stage's workers.
+        self.lock = threading.Lock()
+
+    @property
+    def throughput(self) -> float:
+        """
+        Items processed per second of wall time.
+        """
+        if not self.elapsed_seconds:
+            return 0.0
+        return self.items_in / self.elapsed_seconds
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "throughput": round(self.throughput, 2),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "wait_seconds": round(self.wait_seconds, 3),
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+        }
+
+
+class Stage:
+    """
+    One step of a `Pipeline`: a function run by a pool of worker threads over a
+    bounded input queue.
+
+    Parameters
+    ----------
+    name : str
+        The stage name, used in stats and thread names.
+    func : Callable
+        Called as `func(item, emit)` for each item, or `func(batch, emit)` when
+        `batch_size` is over 1. `emit(item)` passes an item to the next stage and
+        blocks while that stage's queue is full.
+    workers : int, default = 1
+        The number of worker threads. With one worker, items are processed in order.
+    queue_size : int, default = 16
+        The size of the input queue. A full queue blocks the stage before.
+    batch_size : int, default = 1
+        The most items passed to `func` at once. A worker takes whatever is already
+        queued, up to this size, so batches are small when input is slow.
+    setup : Callable, default = None
+        Called once, in the stage's own thread, before any item is processed. The
+        stages before carry on meanwhile, so slow setup overlaps with their work.
+    flush : Callable, default = None
+        Called as `flush(emit)` once all input is processed.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable[[Any, Callable[[Any], None]], None],
+        workers: int = 1,
+        queue_size: int = 16,
+        batch_size: int = 1,
+        setup: Callable[[], None] | None = None,
+        flush: Callable[[Callable[[Any], None]], None] | None = None,
+    ) -> None:
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+        self.setup = setup
+        self.flush = flush
+        self.input: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.stats = StageStats(name)
+
+
+class Pipeline:
+    """
+    Run stages concurrently, each feeding the next through its bounded queue.
+
+    Every stage starts at once. An exception in any stage stops the whole pipeline
+    and is re-raised by `run`.
+
+    Parameters
+    ----------
+    stages : list[Stage]
+        The stages, in order.
+    clock : Callable, default = time.perf_counter
+        Allow a fake clock to be passed for testing.
+
+    Example
+    -------
+    >>> pipeline = Pipeline([Stage("double", lambda x, emit: emit(x * 2))])
+    >>> pipeline.run([1, 2, 3])
+    >>> logger.info(pipeline.report())
+    """
+
+    POLL_SECONDS = 0.05
+
+    def __init__(
+        self, stages: list[Stage], clock: Callable[[], float] = time.perf_counter
+    ) -> None:
+        self.stages = stages
+        self._clock = clock
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+
+    def run(self, source: Iterable[Any]) -> None:
+        """
+        Feed `source` into the first stage and wait for every stage to finish.
+
+        Raises
+        ------
+        Exception
+            The first exception raised in any stage.
+        """
+        threads = [
+            threading.Thread(target=self._run_stage, args=(i,), name=stage.name)
+            for i, stage in enumerate(self.stages)
+        ]
+        for thread in threads:
+            thread.start()
+        first = self.stages[0]
+        try:
+            for item in source:
+                if not self._put(first.input, item):
+                    break
+        except Exception as err:
+            self._fail(err)
+        self._put(first.input, _DONE)
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+
+    def stats(self) -> dict[str, dict[str, Any]]:
+        """
+        Every stage's stats, by stage name.
+        """
+        return {stage.name: stage.stats.as_dict() for stage in self.stages}
+
+    def report(self) -> str:
+        """
+        The stage stats as a table. The stage with the most busy time per worker is
+        marked as the bottleneck.
+        """
+        bottleneck = max(
+            self.stages, key=lambda stage: stage.stats.busy_seconds / stage.workers
+        )
+        lines = [
+            f"{'stage':<10}{'in':>7}{'out':>7}{'per s':>9}{'busy s':>9}"
+            f"{'wait s':>9}{'blocked s':>11}"
+        ]
+        for stage in self.stages:
+            s = stage.stats
+            marker = "  <- bottleneck" if stage is bottleneck else ""
+            lines.append(
+                f"{stage.name:<10}{s.items_in:>7}{s.items_out:>7}{s.throughput:>9.1f}"
+                f"{s.busy_seconds:>9.2f}{s.wait_seconds:>9.2f}"
+                f"{s.blocked_seconds:>11.2f}{marker}"
+            )
+        return "\n".join(lines)
+
+    def _run_stage(self, index: int) -> None:
+        stage = self.stages[index]
+        output = self.stages[index + 1].input if index + 1 < len(self.stages) else None
+        started = self._clock()
+        try:
+            if stage.setup is not None:
+                stage.setup()
+            workers = [
+                threading.Thread(
+                    target=self._work, args=(stage, output), name=f"{stage.name}-{i}"
+                )
+                for i in range(stage.workers)
+            ]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            if stage.flush is not None and not self._stop.is_set():
+                stage.flush(self._emitter(stage, output, [0.0]))
+        except Exception as err:
+            self._fail(err)
+        finally:
+            stage.stats.elapsed_seconds = self._clock() - started
+            if output is not None:
+                self._put(output, _DONE)
+
+    def _work(self, stage: Stage, output: queue.Queue | None) -> None:
+        blocked = [0.0]
+        emit = self._emitter(stage, output, blocked)
+        while not self._stop.is_set():
+            batch = self._get(stage)
+            if batch is None:
+                return
+            started, blocked[0] = self._clock(), 0.0
+            try:
+                stage.func(batch if stage.batch_size > 1 else batch[0], emit)
+            except Exception as err:
+                self._fail(err)
+                return
+            with stage.stats.lock:
+                # Time blocked on a full queue downstream is not busy time.
+                stage.stats.busy_seconds += self._clock() - started - blocked[0]
+                stage.stats.items_in += len(batch)
+
+    def _emitter(
+        self, stage: Stage, output: queue.Queue | None, blocked: list[float]
+    ) -> Callable[[Any], None]:
+        """
+        The `emit` function for one of a stage's workers. Adds the time it waits on a
+        full queue to `blocked`.
+        """
+
+        def emit(item: Any) -> None:
+            started = self._clock()
+            if output is not None:
+                self._put(output, item)
+            waited = self._clock() - started
+            blocked[0] += waited
+            with stage.stats.lock:
+                stage.stats.blocked_seconds += waited
+                stage.stats.items_out += 1
+
+        return emit
+
+    def _get(self, stage: Stage) -> list[Any] | None:
+        """
+        The next batch of items, or None once the input is done or the run stopped.
+        """
+        started = self._clock()
+        while True:
+            try:
+                item = stage.input.get(timeout=self.POLL_SECONDS)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    return None
+        with stage.stats.lock:
+            stage.stats.wait_seconds += self._clock() - started
+        if item is _DONE:
+            # Put it back for the stage's other workers.
+            stage.input.put(_DONE)
+            return None
+        batch = [item]
+        while len(batch) < stage.batch_size:
+            try:
+                item = stage.input.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                stage.input.put(_DONE)
+                break
+            batch.append(item)
+        return batch
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        """
+        Put an item on a queue, waiting while it is full. Returns False if the run
+        stopped first.
+        """
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=self.POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _fail(self, err: BaseException) -> None:
+        logger.error(f"Pipeline stopped: {err!r}")
+        self._errors.append(err)
+        self._stop.set()
@@ -4,6 +4,7 @@ import subprocess
 from loguru import logger
 
 from raindrop_todoist_syncer.config import UserConfig
+from raindrop_todoist_syncer.schedule import AdaptiveSchedule
 
 
 PLIST_TEMPLATE = """
@@ -17,13 +18,15 @@ PLIST_TEMPLATE = """
         <key>ProgramArguments</key>
         <array>
                 <string>{{PATH_TO_EXECUTABLE}}</string>
+                <string>run</string>
+                <string>--adaptive</string>
         </array>
 
         <key>RunAtLoad</key>
         <true/>
 
         <key>StartInterval</key>
-        <integer>300</integer>
+        <integer>{{START_INTERVAL}}</integer>
 
         <key>StandardOutPath</key>
         <string>{{PATH_TO_LOGS_DIR}}/launchd-stdout.log</string>
@@ -42,6 +45,10 @@ class AutomationManager:
     Assumes raindrop-todoist-syncer has been installed via pipx or uvx and the 'rts'
     entry point command is globally available in the user.
 
+    launchd starts `rts run --adaptive` every `AdaptiveSchedule.MIN_INTERVAL`
+    seconds. Runs that aren't due under the learned schedule exit before making any
+    requests, so the effective interval adapts without reloading the plist.
+
     Methods
     -------
     activate_automatic_rd_fetch_and_task_creation
@@ -123,6 +130,9 @@ class AutomationManager:
             "{{PATH_TO_LOGS_DIR}}",
             str(self.user_config.logs_dir),
         )
+        content = content.replace(
+            "{{START_INTERVAL}}", str(AdaptiveSchedule.MIN_INTERVAL)
+        )
         logger.debug("Generated plist file content.")
         self.plist_content = content
 
@@ -1,19 +1,17 @@
 from loguru import logger
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 
 import requests
-from requests import Response
-from tenacity import (
-    retry,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_exponential,
-)
 
 from raindrop_todoist_syncer.config import UserConfig
 from raindrop_todoist_syncer.rd_token import RaindropAccessTokenRefresher
 from raindrop_todoist_syncer.env_manage import EnvironmentVariablesFileManager
 from raindrop_todoist_syncer.rd_credentials import RaindropCredentialsManager
+from raindrop_todoist_syncer.transport import (
+    HttpClient,
+    HttpResponse,
+    default_http_client,
+)
 
 
 class RaindropClient:
@@ -27,8 +25,12 @@ class RaindropClient:
     Attributes:
         BASE_URL (str)           : API uri
         RAINDROPS_PER_PAGE (int) : total rds per paginated page
+        HIGHLIGHTS_PER_PAGE (int): total highlights per paginated page (API maximum)
+        UPDATE_BATCH_SIZE (int)  : raindrops changed per bulk update request
         MAX_ALLOWED_PAGES (int)  : arbitrary fallback to prevent infinte loops etc. 200
                                    pages @ 25 rds per page = 5,000 rds
+        PAGE_CACHE_SECONDS (int) : how long a page may be reused, so the token check
+                                   doubles as the first page of the next fetch
 
     Example:
     >>> raindrop_client = RaindropClient()
@@ -37,31 +39,45 @@ class RaindropClient:
 
     BASE_URL = "https://api.raindrop.io/rest/v1"
     RAINDROPS_PER_PAGE = 25
+    HIGHLIGHTS_PER_PAGE = 50
+    UPDATE_BATCH_SIZE = 100
     MAX_ALLOWED_PAGES = 200
+    PAGE_CACHE_SECONDS = 60
+
+    _http: HttpClient | None = None
 
-    def __init__(self, user_config: UserConfig) -> None:
+    def __init__(self, user_config: UserConfig, http: HttpClient | None = None) -> None:
         """
         Initializes an instance of Raindrop Client.
 
         Parameters:
             user_config (UserConfig) : User configuration variables
+            http (HttpClient)        : Defaults to the process-wide client
 
         Instance variables:
             raindrop_access_token (str) : Oauth access token extracted from .env
             headers (dict)             : HTTP request header
         """
         self.user_config = user_config
+        self._http = http
         self.raindrop_access_token = user_config.raindrop_access_token
         self.headers = {"Authorization": f"Bearer {self.raindrop_access_token}"}
         self._refresh_raindrop_access_token_if_stale()
         logger.info("Raindrop Client initialised")
 
+    @property
+    def http(self) -> HttpClient:
+        """
+        The HTTP client requests are sent through.
+        """
+        return self._http or default_http_client()
+
     def _refresh_raindrop_access_token_if_stale(self) -> None:
         """
         If `stale_token` fetch a new token and update object including headers.
         """
         if self.stale_token():
-            rcm = RaindropCredentialsManager(self.user_config)
+            rcm = RaindropCredentialsManager(self.user_config, self._http)
             evfm = EnvironmentVariablesFileManager(self.user_config)
             ratr = RaindropAccessTokenRefresher(rcm, evfm)
             new_token = ratr.refresh_token_process_runner()
@@ -126,32 +142,142 @@ class RaindropClient:
             easily added.
         """
         logger.info("Get all raindrops called")
-        cumulative_rds = []
-        page = 0
-        while True:
-            response = self._make_api_call(page)
-            self._response_validator(response)
-            data = response.json()
-            if page == 0:
-                benchmark_count = self._extract_benchmark_count(data)
-                target_pages = self._calculate_max_pages(benchmark_count)
-            self._data_validator(data, benchmark_count)
-            current_rds = data.get("items", [])
-            self._individual_rd_validator(current_rds)
-            cumulative_rds.extend(current_rds)
-            logger.debug(f"Length of culmative rds: {len(cumulative_rds)}")
-            page += 1
-            if page >= target_pages:
-                logger.debug(f"Page({page}) equals target pages({target_pages})")
+        decoder = RaindropPageDecoder(self)
+        for response in self.iter_pages():
+            decoder.decode(response)
+        return decoder.finish()
+
+    def iter_pages(self) -> Iterator[HttpResponse]:
+        """
+        Fetch the pages of favourited raindrops one at a time, without decoding them.
+
+        The count in the first page sets how many pages are requested. Pages are
+        decoded and validated by a `RaindropPageDecoder`, so fetching and decoding can
+        run in separate stages.
+
+        Yields:
+            Response    : The API response for each page, in order.
+        """
+        response = self._make_api_call(0)
+        yield response
+        benchmark_count = self._extract_benchmark_count(response.json())
+        target_pages = self._calculate_max_pages(benchmark_count)
+        for page in range(1, target_pages):
+            yield self._make_api_call(page)
+
+    def get_raindrop(self, raindrop_id: int) -> Dict[str, Any] | None:
+        """
+        Retrieve one raindrop by id.
+
+        Parameters:
+            raindrop_id : The raindrop's id.
+
+        Returns:
+            Dict        : The raindrop, as returned in a page of raindrops. None if
+                          there is no such raindrop.
+
+        Also:
+            API Endpoint Documentation: https://developer.raindrop.io/v1/raindrops/single.
+        """
+        response = self.http.get(
+            f"{self.BASE_URL}/raindrop/{raindrop_id}", headers=self.headers
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json().get("item")
+
+    def get_collections(self) -> List[Dict[str, Any]]:
+        """
+        Retrieve all the user's collections, root and nested.
+
+        Returns:
+            List        : A list of collection dictionaries including "_id" and "title".
+
+        Also:
+            API Endpoint Documentation: https://developer.raindrop.io/v1/collections/methods.
+            Two calls are made, one for root collections and one for child collections.
+        """
+        collections = []
+        for endpoint in ("collections", "collections/childrens"):
+            response = self.http.get(
+                f"{self.BASE_URL}/{endpoint}", headers=self.headers
+            )
+            response.raise_for_status()
+            collections.extend(response.json().get("items", []))
+        logger.info(f"Collected {len(collections)} collections.")
+        return collections
+
+    def get_highlights(self, newer_than: str | None = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve the user's highlights across all raindrops, newest first.
+
+        Parameters:
+            newer_than  : An ISO timestamp. Paging stops at the first page that
+                          reaches a highlight created at or before it. Highlights on
+                          that page are still returned, so callers should de-duplicate.
+
+        Returns:
+            List        : A list of highlight dictionaries including "_id", "text",
+                          "note", "created" and "raindropRef" (the raindrop id).
+
+        Also:
+            API Endpoint Documentation: https://developer.raindrop.io/v1/highlights.
+            One request per HIGHLIGHTS_PER_PAGE highlights, however many raindrops
+            they are spread across.
+        """
+        highlights = []
+        for page in range(self.MAX_ALLOWED_PAGES):
+            params = {"page": page, "perpage": self.HIGHLIGHTS_PER_PAGE}
+            response = self.http.get(
+                f"{self.BASE_URL}/highlights", headers=self.headers, params=params
+            )
+            response.raise_for_status()
+            items = response.json().get("items", [])
+            highlights.extend(items)
+            if len(items) < self.HIGHLIGHTS_PER_PAGE:
                 break
-        self._cumulative_rds_validator(cumulative_rds, current_rds, benchmark_count)
-        logger.info(f"Collected {len(cumulative_rds)} total bookmarks.")
-        return cumulative_rds
+            if newer_than and any(item["created"] <= newer_than for item in items):
+                break
+        logger.info(f"Collected {len(highlights)} highlights.")
+        return highlights
+
+    def update_raindrops(self, raindrop_ids: List[int], changes: Dict[str, Any]) -> int:
+        """
+        Apply the same change to many raindrops, UPDATE_BATCH_SIZE per request.
+
+        Parameters:
+            raindrop_ids : The ids of the raindrops to update.
+            changes      : The fields to change, e.g. {"important": False} or
+                           {"tags": ["done"]} (tags are added, not replaced).
+
+        Returns:
+            int          : The number of raindrops Raindrop reports as modified.
 
-    def _core_api_call(self, page: int) -> Response:
+        Also:
+            API Endpoint Documentation: https://developer.raindrop.io/v1/raindrops/multiple.
+            Collection 0 means raindrops in any collection.
+        """
+        modified = 0
+        for start in range(0, len(raindrop_ids), self.UPDATE_BATCH_SIZE):
+            batch = raindrop_ids[start : start + self.UPDATE_BATCH_SIZE]
+            response = self.http.put(
+                f"{self.BASE_URL}/raindrops/0",
+                headers=self.headers,
+                json={"ids": batch, **changes},
+            )
+            response.raise_for_status()
+            modified += response.json().get("modified", 0)
+        logger.info(f"Updated {modified} raindrops with {changes}.")
+        return modified
+
+    def _core_api_call(self, page: int) -> HttpResponse:
         """
         Makes the API call to fetch only favourited raindrops.
 
+        Pages are cached for PAGE_CACHE_SECONDS, until any write to Raindrop, so the
+        page 0 request made by `stale_token` is not repeated by `get_all_raindrops`.
+
         Parameters:
             page     : A page to request from the full paginated list.
 
@@ -160,24 +286,21 @@ class RaindropClient:
         """
         collection_id = 0
         params = {"perpage": self.RAINDROPS_PER_PAGE, "page": page, "search": "❤️"}
-        response = requests.get(
+        response = self.http.get(
             f"{self.BASE_URL}/raindrops/{collection_id}/",
             headers=self.headers,
             params=params,
+            cache_ttl=self.PAGE_CACHE_SECONDS,
         )
         response.raise_for_status()
         return response
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, max=10),
-        retry=retry_if_exception_type(requests.exceptions.RequestException),
-    )
-    def _make_api_call(self, page: int) -> Response:
+    def _make_api_call(self, page: int) -> HttpResponse:
         """
-        A retry logic wrapper for the core API caller.
+        A rate limit logging wrapper for the core API caller.
 
-        The retry logic makes three calls with increasing waits. If the headers contain
+        Server errors and connection failures are retried by the HTTP client's
+        `RetryMiddleware`, three calls with increasing waits. If the headers contain
         rate limit status - this is logged. NOTE: 200 responses should contain headers,
         but this is not currently enforced.
 
@@ -199,7 +322,7 @@ class RaindropClient:
             logger.warning("API headers does not include rate limit status.")
         return response
 
-    def _response_validator(self, response: Response) -> None:
+    def _response_validator(self, response: HttpResponse) -> None:
         """
         --DEPRECATED-- Validation for the response status.
 
@@ -355,3 +478,58 @@ class RaindropClient:
             raise ValueError(
                 f"Last page results not expected length. Expected: {expected_len_last_page}, Got: {len(current_rds)}"
             )
+
+
+class RaindropPageDecoder:
+    """
+    Decode and validate the pages from `RaindropClient.iter_pages`, in order.
+
+    Applies the same checks as `get_all_raindrops`: each page against the count in the
+    first page, then the total in `finish`.
+
+    Parameters:
+        raindrop_client (RaindropClient) : The client whose validators are used.
+
+    Example:
+    >>> decoder = RaindropPageDecoder(raindrop_client)
+    >>> for response in raindrop_client.iter_pages():
+    ...     page_rds = decoder.decode(response)
+    >>> all_rds = decoder.finish()
+    """
+
+    def __init__(self, raindrop_client: RaindropClient) -> None:
+        self.client = raindrop_client
+        self.benchmark_count = None
+        self.cumulative_rds = []
+        self.current_rds = []
+
+    def decode(self, response: HttpResponse) -> List[Dict[str, Any]]:
+        """
+        Decode and validate one page.
+
+        Returns:
+            List        : The raindrops in the page.
+        """
+        self.client._response_validator(response)
+        data = response.json()
+        if self.benchmark_count is None:
+            self.benchmark_count = self.client._extract_benchmark_count(data)
+        self.client._data_validator(data, self.benchmark_count)
+        self.current_rds = data.get("items", [])
+        self.client._individual_rd_validator(self.current_rds)
+        self.cumulative_rds.extend(self.current_rds)
+        logger.debug(f"Length of culmative rds: {len(self.cumulative_rds)}")
+        return self.current_rds
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """
+        Check every raindrop was collected, in order.
+
+        Returns:
+            List        : All the raindrops decoded.
+        """
+        self.client._cumulative_rds_validator(
+            self.cumulative_rds, self.current_rds, self.benchmark_count
+        )
+        logger.info(f"Collected {len(self.cumulative_rds)} total bookmarks.")
+        return self.cumulative_rds
@@ -1,16 +1,20 @@
 import json
 
 from loguru import logger
-import requests
-from requests import Request, Response
 
 from raindrop_todoist_syncer.config import UserConfig
+from raindrop_todoist_syncer.transport import (
+    HttpClient,
+    HttpResponse,
+    default_http_client,
+)
 
 
 class RaindropCredentialsManager:
-    def __init__(self, user_config: UserConfig) -> None:
+    def __init__(self, user_config: UserConfig, http: HttpClient | None = None) -> None:
         """Provide variables and methods for managing Raindrop Oauth2 credentials."""
         self.user_config = user_config
+        self.http = http or default_http_client()
         self.env_file = user_config.env_file
         self.AUTH_CODE_BASE_URL = "https://raindrop.io/oauth/authorize"
         self.REDIRECT_URI = "http://localhost"
@@ -20,18 +24,18 @@ class RaindropCredentialsManager:
         self.RAINDROP_REFRESH_TOKEN = self.user_config.raindrop_refresh_token
         self.RAINDROP_ACCESS_TOKEN = self.user_config.raindrop_access_token
 
-    def make_request(self, body: dict[str, str]) -> Request:
-        """Makes the an request and returns a Request object."""
+    def make_request(self, body: dict[str, str]) -> HttpResponse:
+        """Makes the an request and returns a Response object."""
         headers = self.HEADERS
         data = body
-        oauth_response = requests.post(
+        oauth_response = self.http.post(
             "https://raindrop.io/oauth/access_token",
             headers=headers,
             data=json.dumps(data),
         )
         return oauth_response
 
-    def response_validator(self, response: Response) -> None:
+    def response_validator(self, response: HttpResponse) -> None:
         """Checks a Response object returned by the Raindrop API Oauth2 process is
         valid.
         """
@@ -46,7 +50,7 @@ class RaindropCredentialsManager:
                 f"Response code 200 but no token in response. Full response {response.json()}"
             )
 
-    def extract_access_token(self, oauth_response: Response) -> str:
+    def extract_access_token(self, oauth_response: HttpResponse) -> str:
         """Extracts the access token from the response.json of a Response object."""
         data = oauth_response.json()
         access_token = data.get("access_token")
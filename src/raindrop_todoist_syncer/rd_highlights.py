@@ -0,0 +1,133 @@
+import json
+import time
+from typing import Any, Callable
+
+from loguru import logger
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.rd_object import Raindrop
+
+
+class HighlightIndex:
+    """
+    A local index of the user's Raindrop highlights, keyed by raindrop id.
+
+    Highlights are fetched account-wide, a page of 50 at a time, rather than one
+    request per raindrop. The index is cached to disk. Within `FULL_REFRESH_SECONDS`
+    only highlights newer than the newest one already held are fetched. A full fetch
+    after that picks up edited and deleted highlights.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    raindrop_client : RaindropClient
+        The client used to fetch highlights.
+    clock : Callable, default = time.time
+        Allow a fake clock to be passed for testing.
+
+    Attributes
+    ----------
+    cache_path : Path
+        Where the index is cached.
+    highlights : dict[str, dict]
+        Highlight id to highlight.
+    by_raindrop_id : dict[int, list[dict]]
+        Raindrop id to its highlights, oldest first.
+    """
+
+    FULL_REFRESH_SECONDS = 24 * 60 * 60
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        raindrop_client: Any,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.raindrop_client = raindrop_client
+        self._clock = clock
+        self.cache_path = user_config.cache_dir / "highlights.json"
+        self.highlights: dict[str, dict[str, Any]] = {}
+        self.by_raindrop_id: dict[int, list[dict[str, Any]]] = {}
+        self.full_fetched_at = 0.0
+
+    def load(self) -> "HighlightIndex":
+        """
+        Load the cached index and bring it up to date.
+
+        Returns
+        -------
+        HighlightIndex
+            The index itself, to allow `HighlightIndex(...).load()`.
+        """
+        self._read_cache()
+        now = self._clock()
+        if now - self.full_fetched_at > self.FULL_REFRESH_SECONDS:
+            self.highlights = {}
+            fetched = self.raindrop_client.get_highlights()
+            self.full_fetched_at = now
+        else:
+            fetched = self.raindrop_client.get_highlights(self.newest_created())
+        new = 0
+        for highlight in fetched:
+            if highlight["_id"] not in self.highlights:
+                new += 1
+            self.highlights[highlight["_id"]] = self._compact(highlight)
+        self._build_by_raindrop_id()
+        self.save()
+        logger.info(f"Highlight index: {len(self.highlights)} highlights, {new} new.")
+        return self
+
+    def newest_created(self) -> str | None:
+        """
+        The creation time of the newest highlight held, if any.
+        """
+        return max((h["created"] for h in self.highlights.values()), default=None)
+
+    def for_raindrop(self, raindrop_id: int) -> list[dict[str, Any]]:
+        """
+        A raindrop's highlights, oldest first.
+        """
+        return self.by_raindrop_id.get(raindrop_id, [])
+
+    def attach(self, raindrops: list[Raindrop]) -> None:
+        """
+        Set `highlights` on each raindrop from the index.
+        """
+        for raindrop in raindrops:
+            raindrop.highlights = self.for_raindrop(raindrop.id)
+
+    def save(self) -> None:
+        """
+        Write the index to the cache file.
+        """
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache = {"full_fetched_at": self.full_fetched_at, "highlights": self.highlights}
+        self.cache_path.write_text(json.dumps(cache))
+
+    def _read_cache(self) -> None:
+        """
+        Read the cache file. A missing or corrupt cache is ignored.
+        """
+        try:
+            cache = json.loads(self.cache_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        self.highlights = cache.get("highlights", {})
+        self.full_fetched_at = cache.get("full_fetched_at", 0.0)
+
+    def _build_by_raindrop_id(self) -> None:
+        self.by_raindrop_id = {}
+        for highlight in sorted(self.highlights.values(), key=lambda h: h["created"]):
+            self.by_raindrop_id.setdefault(highlight["raindrop_id"], []).append(
+                highlight
+            )
+
+    @staticmethod
+    def _compact(highlight: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "raindrop_id": highlight["raindropRef"],
+            "text": highlight.get("text", ""),
+            "note": highlight.get("note", ""),
+            "created": highlight["created"],
+        }
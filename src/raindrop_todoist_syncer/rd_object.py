@@ -1,4 +1,16 @@
 from datetime import datetime, timezone
+import hashlib
+import json
+
+
+def content_hash(title: str, notes: str, link: str) -> str:
+    """
+    A short hash of the raindrop fields that are written to Todoist.
+
+    Used to tell whether a processed raindrop has changed since its task was created.
+    """
+    content = json.dumps([title, notes, link], ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()[:16]
 
 
 class Raindrop:
@@ -24,6 +36,16 @@ class Raindrop:
         Any notes attached to the Raindrop.
     link : str
         The hyperlink associated with the Raindrop.
+    collection_id : int | None
+        The id of the collection the Raindrop is in.
+    tags : list[str]
+        The Raindrop's tags.
+    highlights : list[dict]
+        The Raindrop's highlights. Empty until set from a `HighlightIndex`.
+    last_update : str | None
+        When the Raindrop was last changed, per the API.
+    task_id : str | None
+        The id of the Raindrop's Todoist task, once known.
 
     """
 
@@ -46,6 +68,18 @@ class Raindrop:
         self.title = raindrop_json["title"]
         self.notes = raindrop_json["note"]
         self.link = raindrop_json["link"]
+        self.collection_id = raindrop_json.get("collection", {}).get("$id")
+        self.tags = raindrop_json.get("tags", [])
+        self.highlights = []
+        self.last_update = raindrop_json.get("lastUpdate")
+        self.task_id = None
+
+    @property
+    def content_hash(self) -> str:
+        """
+        The hash of the title, notes and link. See `content_hash`.
+        """
+        return content_hash(self.title, self.notes, self.link)
 
     def to_dict(self) -> None:
         """
@@ -64,4 +98,7 @@ class Raindrop:
             "title": self.title,
             "notes": self.notes,
             "link": self.link,
+            "last_update": self.last_update,
+            "content_hash": self.content_hash,
+            "task_id": self.task_id,
         }
@@ -1,10 +1,19 @@
-from typing import Any
+from typing import Any, NamedTuple
 
 from loguru import logger
 
 from raindrop_todoist_syncer.config import UserConfig
 from raindrop_todoist_syncer.db_manage import DatabaseManager
-from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.rd_object import Raindrop, content_hash
+
+
+class RaindropChange(NamedTuple):
+    """
+    A processed raindrop whose title, notes or link has changed since it was stored.
+    """
+
+    raindrop: Raindrop
+    previous: dict[str, Any]
 
 
 class RaindropsProcessor:
@@ -14,8 +23,15 @@ class RaindropsProcessor:
     Class Attributes:
     all_raindrops_api_response :  The list of raindrops (rds) collected from multiple API
                                   calls by RaindropClient.
+    REMOVAL_SAFETY_FRACTION    :  The largest share of tracked favourites that may be
+                                  found removed in one run before the fetch is treated
+                                  as truncated.
+    REMOVAL_SAFETY_MINIMUM     :  Removals up to this many are always allowed.
     """
 
+    REMOVAL_SAFETY_FRACTION = 0.25
+    REMOVAL_SAFETY_MINIMUM = 10
+
     def __init__(self, user_config: UserConfig, all_rds: dict[str, Any]):
         """
         Initalise an instance of the Raindrops Process, taking all_rds as state.
@@ -27,6 +43,7 @@ class RaindropsProcessor:
         """
         self.user_config = user_config
         self.all_rds = all_rds
+        self._tracked_favs = None
 
     def newly_favourited_raindrops_extractor(self) -> list[Raindrop]:
         """
@@ -55,6 +72,67 @@ class RaindropsProcessor:
         logger.info(f"Found {len(rd_objects)} tasks to create.")
         return rd_objects
 
+    def changed_raindrops_extractor(self) -> list[RaindropChange]:
+        """
+        Find processed favourites whose title, notes or link have changed.
+
+        Only rows with a stored task id and content hash can be compared. Rows written
+        before these were recorded are skipped. A favourite is only hashed if its
+        `lastUpdate` differs from the stored one, so an unchanged library costs one
+        string comparison per favourite.
+
+        Returns:
+        -------
+        changes:  The changed raindrops, each with its `task_id` set, paired with its
+                  stored row.
+        """
+        tracked_by_id = {
+            row["id"]: row
+            for row in self._fetch_tracked_favs()
+            if row.get("task_id") and row.get("content_hash")
+        }
+        changes = []
+        for rd in self._extract_all_fav_rds():
+            row = tracked_by_id.get(rd["_id"])
+            if row is None or rd.get("lastUpdate") == row.get("last_update"):
+                continue
+            if content_hash(rd["title"], rd["note"], rd["link"]) == row["content_hash"]:
+                continue
+            raindrop = Raindrop(rd)
+            raindrop.task_id = row["task_id"]
+            changes.append(RaindropChange(raindrop, row))
+        logger.info(f"Found {len(changes)} changed favourites.")
+        return changes
+
+    def removed_favourites_extractor(self) -> list[dict]:
+        """
+        Find processed favourites that are no longer favourited (or no longer exist).
+
+        The reverse of `newly_favourited_raindrops_extractor`. If more than
+        `REMOVAL_SAFETY_FRACTION` of the tracked favourites look removed (and more than
+        `REMOVAL_SAFETY_MINIMUM`), the fetch is assumed to be incomplete and nothing
+        is returned.
+
+        Returns:
+        -------
+        removed_favs:  The stored rows of the removed favourites.
+        """
+        all_favs = self._extract_all_fav_rds()
+        tracked_favs = self._fetch_tracked_favs()
+        removed_favs = self._extract_removed_favs(all_favs, tracked_favs)
+        limit = max(
+            self.REMOVAL_SAFETY_MINIMUM,
+            self.REMOVAL_SAFETY_FRACTION * len(tracked_favs),
+        )
+        if len(removed_favs) > limit:
+            logger.error(
+                f"{len(removed_favs)} of {len(tracked_favs)} tracked favourites look "
+                f"removed, over the safety limit of {int(limit)}. Assuming an "
+                "incomplete fetch: no tasks will be closed."
+            )
+            return []
+        return removed_favs
+
     def _extract_all_fav_rds(self) -> list[dict]:
         """
         Finds all favourited Raindrops in an Raindrop API response. Designed to work
@@ -78,10 +156,13 @@ class RaindropsProcessor:
         return fav_rds
 
     def _fetch_tracked_favs(self):
-        db_manager = DatabaseManager(self.user_config)
-        tracked_favs = db_manager.get_latest_database()["Processed Raindrops"]
-        logger.info(f"db holds {len(tracked_favs)} favourited rds previously tracked")
-        return tracked_favs
+        if self._tracked_favs is None:
+            db_manager = DatabaseManager(self.user_config)
+            self._tracked_favs = db_manager.get_latest_database()["Processed Raindrops"]
+            logger.info(
+                f"db holds {len(self._tracked_favs)} favourited rds previously tracked"
+            )
+        return self._tracked_favs
 
     def _extract_untracked_favs(self, all_favs: list[dict], tracked_favs: list[dict]):
         """
@@ -102,6 +183,25 @@ class RaindropsProcessor:
         logger.info(f"Untracked favourites found: {untracked_favs}")
         return untracked_favs
 
+    def _extract_removed_favs(self, all_favs: list[dict], tracked_favs: list[dict]):
+        """
+        Takes a list of favourited Raindrop JSONs and compares them to the list of
+        previously processed favourites.
+
+        Returns the processed favourites that are not in the current favourites.
+
+        Parameters:
+            all_favs        : List of all Raindrop JSONs that are favorited.
+            tracked_favs    : List of processed favourites from the database.
+
+        Returns:
+            removed_favs    : List of database rows no longer favourited.
+        """
+        fav_ids = {rd["_id"] for rd in all_favs}
+        removed_favs = [rd for rd in tracked_favs if rd["id"] not in fav_ids]
+        logger.info(f"Total removed favourites found: {len(removed_favs)}")
+        return removed_favs
+
     def _convert_to_rd_objects(self, untracked_favs: list[dict]) -> list[Raindrop]:
         """
         Convert a list of newly favorited Raindrop JSONs to Raindrop objects ready for
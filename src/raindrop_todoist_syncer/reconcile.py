@@ -0,0 +1,238 @@
+import math
+from typing import Any, NamedTuple
+
+from loguru import logger
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.db_manage import DatabaseManager
+from raindrop_todoist_syncer.rd_object import Raindrop, content_hash
+from raindrop_todoist_syncer.rd_process import RaindropChange
+from raindrop_todoist_syncer.sync_pipeline import SyncPipeline
+from raindrop_todoist_syncer.td_index import TodoistTaskIndex, normalise_link
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.td_sync import TodoistSyncClient
+from raindrop_todoist_syncer.td_update import TodoistTaskCloser, TodoistTaskUpdater
+
+# Creating a task costs one request for the task and one for the link comment.
+REQUESTS_PER_CREATED_TASK = 2
+
+
+class ReconcilePlan(NamedTuple):
+    """
+    The changes needed to bring Raindrop, the database and Todoist back in line.
+
+    Attributes
+    ----------
+    missing_tasks : list[Raindrop]
+        Favourites with no database row and no Todoist task. Tasks are created.
+    untracked : list[Raindrop]
+        Favourites with a Todoist task but no database row. Rows are added.
+    stale_rows : list[dict]
+        Database rows for raindrops that are no longer favourites. Rows are removed.
+    orphaned_tasks : dict[int, str]
+        Raindrop id to the id of an open task whose raindrop is no longer a
+        favourite. Tasks are closed.
+    changed : list[RaindropChange]
+        Favourites whose title, notes or link changed since their row was stored.
+        Tasks and rows are updated.
+    """
+
+    missing_tasks: list[Raindrop]
+    untracked: list[Raindrop]
+    stale_rows: list[dict[str, Any]]
+    orphaned_tasks: dict[int, str]
+    changed: list[RaindropChange]
+
+    def is_empty(self) -> bool:
+        """
+        Whether everything is already in line.
+        """
+        return not any(self)
+
+    def api_cost(self) -> int:
+        """
+        The estimated number of Todoist requests needed to apply the plan.
+
+        Database changes cost nothing. Closes and updates are batched in Sync API
+        requests of `TodoistSyncClient.MAX_COMMANDS`.
+        """
+        update_commands = len(self.changed) + sum(
+            normalise_link(change.raindrop.link)
+            != normalise_link(change.previous["link"])
+            for change in self.changed
+        )
+        return (
+            REQUESTS_PER_CREATED_TASK * len(self.missing_tasks)
+            + math.ceil(len(self.orphaned_tasks) / TodoistSyncClient.MAX_COMMANDS)
+            + math.ceil(update_commands / TodoistSyncClient.MAX_COMMANDS)
+        )
+
+    def summary(self) -> str:
+        """
+        The plan as printable text.
+        """
+        counts = {
+            "Tasks to create": len(self.missing_tasks),
+            "Rows to add": len(self.untracked),
+            "Stale rows to remove": len(self.stale_rows),
+            "Orphaned tasks to close": len(self.orphaned_tasks),
+            "Tasks to update": len(self.changed),
+            "Estimated Todoist requests": self.api_cost(),
+        }
+        lines = [f"{label + ':':<28}{count}" for label, count in counts.items()]
+        examples = [
+            *(f"  + {rd.title}" for rd in self.missing_tasks[:5]),
+            *(f"  ~ {change.raindrop.title}" for change in self.changed[:5]),
+        ]
+        return "\n".join(lines + examples)
+
+
+class Reconciler:
+    """
+    A three-way diff across Raindrop favourites, the database and Todoist tasks.
+
+    Each side is loaded once into a dictionary keyed by raindrop id, so the diff is a
+    few set operations and one pass over each side, however large the library.
+    Todoist tasks are read with a full refresh of the `TodoistTaskIndex`.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    raindrop_client : RaindropClient
+        A Raindrop client.
+    database_manager : DatabaseManager
+        A database manager.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+    task_index : TodoistTaskIndex, default = None
+        Created from the user config if not given.
+
+    Example
+    -------
+    >>> reconciler = Reconciler(user_config, raindrop_client, database_manager)
+    >>> plan = reconciler.plan()
+    >>> print(plan.summary())
+    >>> reconciler.apply(plan)
+    """
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        raindrop_client: Any,
+        database_manager: DatabaseManager,
+        governor: TodoistRateGovernor | None = None,
+        task_index: TodoistTaskIndex | None = None,
+    ) -> None:
+        self.user_config = user_config
+        self.raindrop_client = raindrop_client
+        self.database_manager = database_manager
+        self.governor = governor or TodoistRateGovernor()
+        self.task_index = task_index or TodoistTaskIndex(
+            user_config, governor=self.governor
+        )
+
+    def plan(self) -> ReconcilePlan:
+        """
+        Load all three sides and work out what needs to change.
+        """
+        favourites = {
+            rd["_id"]: rd
+            for rd in self.raindrop_client.get_all_raindrops()
+            if rd.get("important")
+        }
+        rows = {
+            row["id"]: row
+            for row in self.database_manager.get_latest_database()[
+                "Processed Raindrops"
+            ]
+        }
+        self.task_index.full_refresh()
+        self.task_index.save()
+        tasks = self._tasks_by_raindrop_id(favourites, rows)
+
+        missing_tasks, untracked, changed = [], [], []
+        for raindrop_id in favourites.keys() - rows.keys():
+            raindrop = Raindrop(favourites[raindrop_id])
+            if raindrop_id in tasks:
+                raindrop.task_id = tasks[raindrop_id]
+                untracked.append(raindrop)
+            else:
+                missing_tasks.append(raindrop)
+        for raindrop_id in favourites.keys() & rows.keys() & tasks.keys():
+            rd, row = favourites[raindrop_id], rows[raindrop_id]
+            if content_hash(rd["title"], rd["note"], rd["link"]) != row.get(
+                "content_hash"
+            ):
+                raindrop = Raindrop(rd)
+                raindrop.task_id = tasks[raindrop_id]
+                changed.append(RaindropChange(raindrop, row))
+        stale_ids = rows.keys() - favourites.keys()
+        plan = ReconcilePlan(
+            missing_tasks=missing_tasks,
+            untracked=untracked,
+            stale_rows=[rows[raindrop_id] for raindrop_id in stale_ids],
+            orphaned_tasks={
+                raindrop_id: task_id
+                for raindrop_id, task_id in tasks.items()
+                if raindrop_id not in favourites
+            },
+            changed=changed,
+        )
+        logger.info(f"Reconcile plan:\n{plan.summary()}")
+        return plan
+
+    def apply(self, plan: ReconcilePlan) -> None:
+        """
+        Apply a plan with the batched writers.
+
+        Missing tasks are created by the same pipeline stages as in `rts run`.
+        """
+        if plan.untracked:
+            self.database_manager.update_database(plan.untracked)
+        if plan.stale_rows:
+            self.database_manager.remove_rows({row["id"] for row in plan.stale_rows})
+        if plan.orphaned_tasks:
+            TodoistTaskCloser(self.user_config, self.governor).close_tasks(
+                plan.orphaned_tasks
+            )
+        if plan.changed:
+            updated = TodoistTaskUpdater(self.user_config, self.governor).update_tasks(
+                plan.changed
+            )
+            if updated:
+                self.database_manager.replace_rows(updated)
+        if plan.missing_tasks:
+            SyncPipeline(
+                self.user_config,
+                self.raindrop_client,
+                self.database_manager,
+                self.governor,
+            ).create(plan.missing_tasks)
+        logger.info(
+            f"Reconcile applied. Todoist rate governor: {self.governor.stats()}"
+        )
+
+    def _tasks_by_raindrop_id(
+        self, favourites: dict[int, dict], rows: dict[int, dict]
+    ) -> dict[int, str]:
+        """
+        Open Raindrop tasks by raindrop id.
+
+        Tasks without an id marker are matched by link to a favourite or a row. Tasks
+        that can't be tied to a raindrop are left out, so they are never closed.
+        """
+        raindrop_id_by_link = {
+            normalise_link(item["link"]): raindrop_id
+            for side in (rows, favourites)
+            for raindrop_id, item in side.items()
+            if item.get("link")
+        }
+        tasks = {}
+        for task_id, entry in self.task_index.tasks.items():
+            raindrop_id = entry["raindrop_id"]
+            if raindrop_id is None and entry["link"]:
+                raindrop_id = raindrop_id_by_link.get(entry["link"])
+            if raindrop_id is not None:
+                tasks[raindrop_id] = task_id
+        return tasks
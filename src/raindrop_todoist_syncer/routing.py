@@ -0,0 +1,370 @@
+import json
+import time
+from typing import Any, Callable, NamedTuple
+
+from loguru import logger
+from todoist_api_python.api import TodoistAPI
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.td_index import MAIN_WORK_PROJECT, RAINDROP_LABEL
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.td_sync import TodoistSyncClient
+from raindrop_todoist_syncer.transport import sdk_client
+
+# Raindrop system collections are not returned by the collections endpoints.
+SYSTEM_COLLECTIONS = {"-1": "Unsorted", "-99": "Trash"}
+
+# Todoist's maximum label name length.
+MAX_LABEL_LENGTH = 60
+
+
+class Route(NamedTuple):
+    """
+    Where a task for a raindrop is created.
+    """
+
+    project_id: str
+    section_id: str | None = None
+    labels: tuple[str, ...] = (RAINDROP_LABEL,)
+
+
+def load_routing_rules(user_config: UserConfigProtocol) -> dict[str, Any]:
+    """
+    Load routing rules from the user's `routing.json`, if there is one.
+
+    The file is optional. Without it every task goes to `MAIN_WORK_PROJECT`.
+
+    Example
+    -------
+    {
+        "default_project": "Work",
+        "collections": {"Reading": {"project": "Reading List"}},
+        "tags": {"python": {"project": "Dev", "section": "Articles"}},
+        "tag_labels": {"to-read": "Reading"},
+        "unmapped_tags_as_labels": true
+    }
+
+    Tag rules take precedence over collection rules. A rule may give a "project", a
+    "section" in that project, and extra "labels".
+
+    Raindrop tags become Todoist labels through "tag_labels" (tag name to label name).
+    With "unmapped_tags_as_labels" any other tag is used as a label unchanged. Without
+    either key tags are not turned into labels.
+    """
+    if not user_config.routing_file.exists():
+        return {}
+    rules = json.loads(user_config.routing_file.read_text())
+    logger.info(f"Routing rules loaded from {user_config.routing_file}")
+    return rules
+
+
+class ResolutionCache:
+    """
+    A persistent local cache of the name/id lookups needed to route tasks.
+
+    Holds Raindrop collection ids to names and Todoist project, section and label names
+    to ids. Each kind is refreshed in one paginated fetch when it is older than
+    `TTL_SECONDS`, or on a cache miss. Each kind is fetched at most once per run, so a
+    name that doesn't exist can't cause repeated fetches.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    api : TodoistAPI, default = None
+        A Todoist API client. One is created from the user's API key if not given.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+    raindrop_client : RaindropClient, default = None
+        Required to resolve collection names.
+    sync_client : TodoistSyncClient, default = None
+        Used to create missing labels in one batch. Created on first use if not given.
+    clock : Callable, default = time.time
+        Allow a fake clock to be passed for testing.
+
+    Attributes
+    ----------
+    cache_path : Path
+        Where the cache is stored.
+    data : dict[str, dict]
+        The cached lookups by kind.
+    refreshed_at : dict[str, float]
+        When each kind was last fetched.
+    """
+
+    TTL_SECONDS = 24 * 60 * 60
+    KINDS = ("collections", "projects", "sections", "labels")
+    PAGE_LIMIT = 200
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        api: TodoistAPI | None = None,
+        governor: TodoistRateGovernor | None = None,
+        raindrop_client: Any = None,
+        sync_client: TodoistSyncClient | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.user_config = user_config
+        self._api = api
+        self.governor = governor or TodoistRateGovernor()
+        self.raindrop_client = raindrop_client
+        self._sync_client = sync_client
+        self._clock = clock
+        self.cache_path = user_config.cache_dir / "resolution.json"
+        self.data: dict[str, dict[str, Any]] = {kind: {} for kind in self.KINDS}
+        self.refreshed_at: dict[str, float] = {kind: 0.0 for kind in self.KINDS}
+        self._refreshed_this_run: set[str] = set()
+
+    @property
+    def api(self) -> TodoistAPI:
+        """
+        The Todoist client, only created when a Todoist lookup is actually needed.
+        """
+        if self._api is None:
+            self._api = TodoistAPI(
+                self.user_config.todoist_api_key, client=sdk_client()
+            )
+        return self._api
+
+    @property
+    def sync_client(self) -> TodoistSyncClient:
+        """
+        The Todoist Sync API client, only created when labels need creating.
+        """
+        if self._sync_client is None:
+            self._sync_client = TodoistSyncClient(self.user_config, self.governor)
+        return self._sync_client
+
+    def load(self) -> "ResolutionCache":
+        """
+        Read the cache from disk. A missing or corrupt cache starts empty.
+        """
+        try:
+            cache = json.loads(self.cache_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return self
+        for kind in self.KINDS:
+            self.data[kind] = cache.get("data", {}).get(kind, {})
+            self.refreshed_at[kind] = cache.get("refreshed_at", {}).get(kind, 0.0)
+        return self
+
+    def save(self) -> None:
+        """
+        Write the cache to disk.
+        """
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache = {"data": self.data, "refreshed_at": self.refreshed_at}
+        self.cache_path.write_text(json.dumps(cache))
+
+    def collection_name(self, collection_id: int | None) -> str | None:
+        """
+        The name of a Raindrop collection.
+        """
+        if collection_id is None:
+            return None
+        key = str(collection_id)
+        if key in SYSTEM_COLLECTIONS:
+            return SYSTEM_COLLECTIONS[key]
+        return self._lookup("collections", key)
+
+    def project_id(self, name: str) -> str | None:
+        """
+        The id of a Todoist project.
+        """
+        return self._lookup("projects", name)
+
+    def section_id(self, project_id: str, name: str) -> str | None:
+        """
+        The id of a section in a Todoist project.
+        """
+        return self._lookup("sections", f"{project_id}/{name}")
+
+    def ensure_labels(self, names: set[str]) -> list[str]:
+        """
+        Create any labels that don't exist yet, in one batch.
+
+        The label set is fetched at most once per run, and only if it is stale or a
+        name is not already known. Missing labels are created with one Sync API
+        request per 100 labels.
+
+        Parameters
+        ----------
+        names : set[str]
+            Every label name the run will use.
+
+        Returns
+        -------
+        list[str]
+            The names of the labels created.
+        """
+        if self._is_stale("labels") or not names <= self.data["labels"].keys():
+            self._refresh_once("labels")
+        missing = sorted(names - self.data["labels"].keys())
+        if not missing:
+            return []
+        commands = [
+            self.sync_client.command("label_add", {"name": name}, temp_id=f"label-{i}")
+            for i, name in enumerate(missing)
+        ]
+        result = self.sync_client.commands(commands)
+        created = []
+        for i, name in enumerate(missing):
+            label_id = result["temp_id_mapping"].get(f"label-{i}")
+            if label_id:
+                self.data["labels"][name] = label_id
+                created.append(name)
+        logger.info(f"Created {len(created)} Todoist label(s): {created}")
+        return created
+
+    def _lookup(self, kind: str, key: str) -> Any:
+        if self._is_stale(kind) or key not in self.data[kind]:
+            self._refresh_once(kind)
+        return self.data[kind].get(key)
+
+    def _is_stale(self, kind: str) -> bool:
+        return self._clock() - self.refreshed_at[kind] > self.TTL_SECONDS
+
+    def _refresh_once(self, kind: str) -> None:
+        if kind in self._refreshed_this_run:
+            return
+        self._refreshed_this_run.add(kind)
+        self.data[kind] = getattr(self, f"_fetch_{kind}")()
+        self.refreshed_at[kind] = self._clock()
+        logger.info(f"Resolution cache refreshed {len(self.data[kind])} {kind}.")
+
+    def _fetch_collections(self) -> dict[str, str]:
+        if self.raindrop_client is None:
+            raise ValueError("A RaindropClient is required to resolve collections.")
+        return {
+            str(collection["_id"]): collection["title"]
+            for collection in self.raindrop_client.get_collections()
+        }
+
+    def _fetch_projects(self) -> dict[str, str]:
+        projects = self.governor.collect(self.api.get_projects(limit=self.PAGE_LIMIT))
+        return {project.name: project.id for project in projects}
+
+    def _fetch_sections(self) -> dict[str, str]:
+        sections = self.governor.collect(self.api.get_sections(limit=self.PAGE_LIMIT))
+        return {
+            f"{section.project_id}/{section.name}": section.id for section in sections
+        }
+
+    def _fetch_labels(self) -> dict[str, str]:
+        labels = self.governor.collect(self.api.get_labels(limit=self.PAGE_LIMIT))
+        return {label.name: label.id for label in labels}
+
+
+class TaskRouter:
+    """
+    Decide the Todoist project, section and labels for each raindrop.
+
+    All name resolution happens in `prepare`, once per batch of raindrops and before
+    any task is written. That includes creating any labels needed for the raindrops'
+    tags. `route` is then a dictionary lookup.
+
+    Parameters
+    ----------
+    resolution_cache : ResolutionCache
+        A loaded resolution cache.
+    rules : dict
+        Routing rules, see `load_routing_rules`.
+    """
+
+    def __init__(self, resolution_cache: ResolutionCache, rules: dict[str, Any]):
+        self.cache = resolution_cache
+        self.rules = rules
+        self.default_route = Route(MAIN_WORK_PROJECT)
+        self._routes: dict[int, Route] = {}
+
+    def prepare(self, raindrops: list[Raindrop]) -> None:
+        """
+        Resolve the route for every raindrop and create any missing labels.
+
+        Makes no API calls when there are no routing rules.
+
+        Parameters
+        ----------
+        raindrops : list[Raindrop]
+            The raindrops about to become tasks.
+        """
+        if not self.rules or not raindrops:
+            return
+        default_project = self.rules.get("default_project")
+        if default_project:
+            project_id = self.cache.project_id(default_project)
+            if project_id:
+                self.default_route = Route(project_id)
+            else:
+                logger.warning(f"Default project '{default_project}' not found.")
+
+        resolved: dict[str, Route] = {}
+        for raindrop in raindrops:
+            rule_key, rule = self._match(raindrop)
+            if rule is None:
+                route = self.default_route
+            else:
+                if rule_key not in resolved:
+                    resolved[rule_key] = self._resolve(rule_key, rule)
+                route = resolved[rule_key]
+            self._routes[raindrop.id] = self._with_tag_labels(route, raindrop)
+
+        labels = {label for route in self._routes.values() for label in route.labels}
+        self.cache.ensure_labels(labels)
+        self.cache.save()
+
+    def route(self, raindrop: Raindrop) -> Route:
+        """
+        The route for a raindrop. Raindrops not passed to `prepare` get the default.
+        """
+        return self._routes.get(raindrop.id, self.default_route)
+
+    def tag_labels(self, raindrop: Raindrop) -> tuple[str, ...]:
+        """
+        The Todoist labels for a raindrop's tags, per the "tag_labels" mapping.
+        """
+        mapping = self.rules.get("tag_labels", {})
+        include_unmapped = self.rules.get("unmapped_tags_as_labels", False)
+        labels = []
+        for tag in raindrop.tags:
+            label = mapping.get(tag, tag if include_unmapped else None)
+            if label:
+                labels.append(label.strip()[:MAX_LABEL_LENGTH])
+        return tuple(labels)
+
+    def _with_tag_labels(self, route: Route, raindrop: Raindrop) -> Route:
+        extra = [
+            label for label in self.tag_labels(raindrop) if label not in route.labels
+        ]
+        if not extra:
+            return route
+        return route._replace(labels=(*route.labels, *dict.fromkeys(extra)))
+
+    def _match(self, raindrop: Raindrop) -> tuple[str | None, dict | None]:
+        tag_rules = self.rules.get("tags", {})
+        for tag in raindrop.tags:
+            if tag in tag_rules:
+                return f"tag:{tag}", tag_rules[tag]
+        collection_rules = self.rules.get("collections", {})
+        if collection_rules:
+            name = self.cache.collection_name(raindrop.collection_id)
+            if name in collection_rules:
+                return f"collection:{name}", collection_rules[name]
+        return None, None
+
+    def _resolve(self, rule_key: str, rule: dict[str, Any]) -> Route:
+        project_id = self.default_route.project_id
+        if rule.get("project"):
+            project_id = self.cache.project_id(rule["project"])
+            if project_id is None:
+                logger.warning(f"Project '{rule['project']}' for {rule_key} not found.")
+                return self.default_route
+        section_id = None
+        if rule.get("section"):
+            section_id = self.cache.section_id(project_id, rule["section"])
+            if section_id is None:
+                logger.warning(f"Section '{rule['section']}' for {rule_key} not found.")
+        labels = (RAINDROP_LABEL, *rule.get("labels", []))
+        return Route(project_id, section_id, labels)
@@ -0,0 +1,139 @@
+import json
+import random
+import time
+from typing import Callable
+
+from loguru import logger
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+
+
+class AdaptiveSchedule:
+    """
+    Learn how often to sync from how often favourites change.
+
+    After a sync that found changes, the interval drops to `min_interval`, so a burst
+    of new favourites is picked up quickly. After each sync that found nothing, it is
+    multiplied by `backoff`, up to `max_interval`, so an idle account makes few
+    requests. Each delay is varied by up to `jitter` either way, so syncs don't fall
+    into step with other clients or rate limit windows.
+
+    The interval and the time of the next sync are saved in the cache dir, so the
+    learned rate survives restarts and can be shared by separate `rts run` processes.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    min_interval : float, default = MIN_INTERVAL
+    max_interval : float, default = MAX_INTERVAL
+    backoff : float, default = BACKOFF
+    jitter : float, default = JITTER
+        The largest change to a delay, as a fraction of it.
+    clock : Callable, default = time.time
+    rand : Callable, default = random.random
+        Allow a fake clock and random number source to be passed for testing.
+
+    Attributes
+    ----------
+    interval : float
+        The current interval, before jitter.
+    next_run_at : float
+        When the next sync is due, as a timestamp.
+
+    Example
+    -------
+    >>> schedule = AdaptiveSchedule(user_config).load()
+    >>> if schedule.due():
+    ...     changes = sync_once(...)
+    ...     schedule.record(changes > 0)
+    """
+
+    MIN_INTERVAL = 60
+    MAX_INTERVAL = 60 * 60
+    BACKOFF = 2.0
+    JITTER = 0.1
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        min_interval: float = MIN_INTERVAL,
+        max_interval: float = MAX_INTERVAL,
+        backoff: float = BACKOFF,
+        jitter: float = JITTER,
+        clock: Callable[[], float] = time.time,
+        rand: Callable[[], float] = random.random,
+    ) -> None:
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self._clock = clock
+        self._rand = rand
+        self.path = user_config.cache_dir / "poll_schedule.json"
+        self.interval = min_interval
+        self.next_run_at = 0.0
+
+    def load(self) -> "AdaptiveSchedule":
+        """
+        Load the saved schedule. A missing or corrupt file starts from
+        `min_interval`.
+
+        Returns
+        -------
+        AdaptiveSchedule
+            The schedule itself, to allow `AdaptiveSchedule(...).load()`.
+        """
+        try:
+            saved = json.loads(self.path.read_text())
+            interval = float(saved["interval"])
+            next_run_at = float(saved["next_run_at"])
+        except (FileNotFoundError, KeyError, TypeError, ValueError):
+            return self
+        self.interval = min(max(interval, self.min_interval), self.max_interval)
+        self.next_run_at = next_run_at
+        return self
+
+    def save(self) -> None:
+        """
+        Write the schedule to the cache file.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(
+            json.dumps({"interval": self.interval, "next_run_at": self.next_run_at})
+        )
+
+    def due(self) -> bool:
+        """
+        Whether the next sync is due.
+        """
+        return self._clock() >= self.next_run_at
+
+    def seconds_until_due(self) -> float:
+        return max(self.next_run_at - self._clock(), 0.0)
+
+    def record(self, changed: bool) -> float:
+        """
+        Adjust the interval after a sync, and save when the next one is due.
+
+        Parameters
+        ----------
+        changed : bool
+            Whether the sync found new, changed or removed favourites.
+
+        Returns
+        -------
+        float
+            Seconds until the next sync.
+        """
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+        delay = self.interval * (1 + self.jitter * (2 * self._rand() - 1))
+        self.next_run_at = self._clock() + delay
+        self.save()
+        logger.info(
+            f"{'Changes' if changed else 'No changes'} found. Next sync in {delay:.0f}s."
+        )
+        return delay
@@ -0,0 +1,265 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import Any, Callable
+
+from loguru import logger
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.db_manage import DatabaseManager
+from raindrop_todoist_syncer.pipeline import Pipeline, Stage
+from raindrop_todoist_syncer.rd_client import RaindropPageDecoder
+from raindrop_todoist_syncer.rd_highlights import HighlightIndex
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.routing import (
+    ResolutionCache,
+    TaskRouter,
+    load_routing_rules,
+)
+from raindrop_todoist_syncer.td_index import TodoistTaskIndex
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.td_task import TodoistTaskCreator
+
+
+class SyncPipeline:
+    """
+    Fetch favourites and create their tasks as a pipeline of concurrent stages.
+
+    fetch -> decode -> diff -> write -> commit
+
+    - fetch: request the pages of favourites from Raindrop.
+    - decode: decode and validate each page, in order, and pick out favourites
+      without a database row.
+    - diff: drop favourites that already have a Todoist task, attach highlights and
+      resolve routes, a page at a time.
+    - write: create tasks, `governor.max_concurrency` at a time.
+    - commit: add created tasks to the database in batches of `COMMIT_BATCH_SIZE`.
+
+    Each stage feeds the next through a bounded queue, so tasks for the first page
+    are being written while later pages are still being fetched, and a slow stage
+    holds back the ones before it rather than letting work pile up in memory.
+
+    The Todoist task index, highlight index and routing cache are only loaded when
+    the first new favourite reaches the diff stage, so a run with nothing new makes
+    no Todoist requests.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    raindrop_client : RaindropClient
+        A Raindrop client.
+    database_manager : DatabaseManager
+        A database manager.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+
+    Attributes
+    ----------
+    favourites : list[dict]
+        Every favourite fetched by `run`, as returned by the API.
+    created : list[Raindrop]
+        Raindrops whose tasks were created.
+    already_tasked : list[Raindrop]
+        New favourites that already had a Todoist task, added to the database without
+        creating another.
+
+    Example
+    -------
+    >>> sync_pipeline = SyncPipeline(user_config, raindrop_client, database_manager)
+    >>> favourites = sync_pipeline.run()
+    >>> logger.info(sync_pipeline.report())
+    """
+
+    COMMIT_BATCH_SIZE = 25
+    QUEUE_SIZE = 16
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        raindrop_client: Any,
+        database_manager: DatabaseManager,
+        governor: TodoistRateGovernor | None = None,
+    ) -> None:
+        self.user_config = user_config
+        self.raindrop_client = raindrop_client
+        self.database_manager = database_manager
+        self.governor = governor or TodoistRateGovernor()
+        self.favourites: list[dict[str, Any]] = []
+        self.created: list[Raindrop] = []
+        self.already_tasked: list[Raindrop] = []
+        self.pipeline: Pipeline | None = None
+        self._tracked_ids: set[int] = set()
+        self._task_index: TodoistTaskIndex | None = None
+        self._highlight_index: HighlightIndex | None = None
+        self._router: TaskRouter | None = None
+        self._lock = threading.Lock()
+
+    def run(self) -> list[dict[str, Any]]:
+        """
+        Fetch every favourite and create tasks for the new ones.
+
+        Returns
+        -------
+        list[dict]
+            Every favourite fetched, for finding changed and removed favourites.
+        """
+        decoder = RaindropPageDecoder(self.raindrop_client)
+
+        def fetch(_: Any, emit: Callable[[Any], None]) -> None:
+            for response in self.raindrop_client.iter_pages():
+                emit(response)
+
+        def decode(response: Any, emit: Callable[[Any], None]) -> None:
+            favourites = [rd for rd in decoder.decode(response) if rd.get("important")]
+            self.favourites.extend(favourites)
+            new = [
+                Raindrop(rd) for rd in favourites if rd["_id"] not in self._tracked_ids
+            ]
+            if new:
+                emit(new)
+
+        stages = [
+            Stage("fetch", fetch),
+            Stage(
+                "decode",
+                decode,
+                queue_size=self.QUEUE_SIZE,
+                setup=self._load_tracked_ids,
+                flush=lambda emit: decoder.finish(),
+            ),
+            *self._create_stages(),
+        ]
+        self._run(stages, [None])
+        logger.info(
+            f"Fetched {len(self.favourites)} favourites. Created {len(self.created)} "
+            "tasks."
+        )
+        return self.favourites
+
+    def create(self, raindrops: list[Raindrop]) -> None:
+        """
+        Create tasks for raindrops already fetched, through the diff, write and commit
+        stages only.
+        """
+        self._run(self._create_stages(), [raindrops])
+
+    def report(self) -> str:
+        """
+        The per-stage stats of the last run.
+        """
+        return self.pipeline.report() if self.pipeline else ""
+
+    def highlight_index(self) -> HighlightIndex:
+        """
+        The highlight index, loaded on first use and shared with the diff stage.
+        """
+        with self._lock:
+            if self._highlight_index is None:
+                self._highlight_index = HighlightIndex(
+                    self.user_config, self.raindrop_client
+                ).load()
+            return self._highlight_index
+
+    def _run(self, stages: list[Stage], source: list[Any]) -> None:
+        self.pipeline = Pipeline(stages)
+        self.pipeline.run(source)
+        if self.already_tasked:
+            logger.warning(
+                f"{len(self.already_tasked)} new favourite(s) already have a Todoist "
+                "task. Added to database without creating tasks."
+            )
+
+    def _create_stages(self) -> list[Stage]:
+        return [
+            Stage("diff", self._diff, queue_size=self.QUEUE_SIZE),
+            Stage(
+                "write",
+                self._write,
+                workers=self.governor.max_concurrency,
+                queue_size=self.QUEUE_SIZE,
+            ),
+            Stage(
+                "commit",
+                self._commit,
+                queue_size=self.QUEUE_SIZE,
+                batch_size=self.COMMIT_BATCH_SIZE,
+                flush=self._save_index,
+            ),
+        ]
+
+    def _load_tracked_ids(self) -> None:
+        rows = self.database_manager.get_latest_database()["Processed Raindrops"]
+        self._tracked_ids = {row["id"] for row in rows}
+
+    def _diff(self, raindrops: list[Raindrop], emit: Callable[[Any], None]) -> None:
+        """
+        Split a page of new favourites into those with a task already and those that
+        need one, then route the latter.
+        """
+        self._warm_up()
+        to_create = []
+        for raindrop in raindrops:
+            if self._task_index.contains(raindrop):
+                raindrop.task_id = self._task_index.task_id_for(raindrop)
+                emit((raindrop, None))
+            else:
+                to_create.append(raindrop)
+        self._highlight_index.attach(to_create)
+        self._router.prepare(to_create)
+        for raindrop in to_create:
+            emit((raindrop, self._router.route(raindrop)))
+
+    def _write(self, item: tuple, emit: Callable[[Any], None]) -> None:
+        """
+        Create the task for a raindrop with a route. Raindrops without one already
+        have a task and pass straight through.
+        """
+        raindrop, route = item
+        if route is None:
+            emit((raindrop, False))
+            return
+        creator = TodoistTaskCreator(self.user_config, raindrop, self.governor, route)
+        if creator.create_task():
+            emit((raindrop, True))
+
+    def _commit(self, batch: list[tuple], emit: Callable[[Any], None]) -> None:
+        """
+        Add a batch of raindrops to the database, and created tasks to the index.
+        """
+        self.database_manager.update_database([raindrop for raindrop, _ in batch])
+        for raindrop, created in batch:
+            if created:
+                self._task_index.add(raindrop.task_id, raindrop)
+                self.created.append(raindrop)
+            else:
+                self.already_tasked.append(raindrop)
+            emit(raindrop)
+
+    def _save_index(self, emit: Callable[[Any], None]) -> None:
+        if self.created:
+            self._task_index.save()
+
+    def _warm_up(self) -> None:
+        """
+        Load the task index, highlight index and routing cache, concurrently, the
+        first time they are needed.
+        """
+        if self._router is not None:
+            return
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            task_index = executor.submit(
+                TodoistTaskIndex(self.user_config, governor=self.governor).load
+            )
+            highlights = executor.submit(self.highlight_index)
+            resolution_cache = executor.submit(
+                ResolutionCache(
+                    self.user_config,
+                    governor=self.governor,
+                    raindrop_client=self.raindrop_client,
+                ).load
+            )
+            self._task_index = task_index.result()
+            highlights.result()
+            self._router = TaskRouter(
+                resolution_cache.result(), load_routing_rules(self.user_config)
+            )
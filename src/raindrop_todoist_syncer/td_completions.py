@@ -0,0 +1,87 @@
+import json
+
+from loguru import logger
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.td_sync import TodoistSyncClient
+
+# What happens to a raindrop when its task is completed.
+COMPLETION_ACTIONS = {
+    "unfavourite": {"important": False},
+    "tag": {"tags": ["done"]},
+}
+
+
+class TodoistCompletionReader:
+    """
+    Read task completions from Todoist incrementally, using a Sync API sync token.
+
+    Each read returns only the items changed since the last committed token, so a run
+    with nothing completed costs one small request. The token is stored in the cache
+    dir and only advanced by `commit`, after the completions have been acted on, so a
+    failed run reads the same completions again.
+
+    The first read (or a read Todoist answers with a full sync) sets a baseline: it
+    reports no completions.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+    sync_client : TodoistSyncClient, default = None
+        Created from the user config if not given.
+
+    Example
+    -------
+    >>> reader = TodoistCompletionReader(user_config)
+    >>> completed = reader.completed_task_ids()
+    >>> ...  # act on the completions
+    >>> reader.commit()
+    """
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        governor: TodoistRateGovernor | None = None,
+        sync_client: TodoistSyncClient | None = None,
+    ) -> None:
+        self.sync_client = sync_client or TodoistSyncClient(user_config, governor)
+        self.state_path = user_config.cache_dir / "todoist_sync_state.json"
+        self.sync_token = self._read_state()
+        self._next_sync_token: str | None = None
+
+    def completed_task_ids(self) -> set[str]:
+        """
+        The ids of the tasks completed since the last committed read.
+        """
+        data = self.sync_client.read(self.sync_token or "*", ["items"])
+        self._next_sync_token = data["sync_token"]
+        if self.sync_token is None or data.get("full_sync"):
+            logger.info("Todoist completion sync baseline set.")
+            return set()
+        completed = {
+            item["id"]
+            for item in data.get("items", [])
+            if item.get("checked") and not item.get("is_deleted")
+        }
+        logger.info(f"{len(completed)} Todoist task(s) completed since the last run.")
+        return completed
+
+    def commit(self) -> None:
+        """
+        Store the token from the last read, so the next read starts after it.
+        """
+        if self._next_sync_token is None:
+            return
+        self.sync_token = self._next_sync_token
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        self.state_path.write_text(json.dumps({"sync_token": self.sync_token}))
+
+    def _read_state(self) -> str | None:
+        try:
+            return json.loads(self.state_path.read_text()).get("sync_token")
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
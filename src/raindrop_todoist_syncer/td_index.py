@@ -0,0 +1,242 @@
+import json
+import math
+import re
+import time
+from typing import Any, Callable
+
+from loguru import logger
+from todoist_api_python.api import TodoistAPI
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.transport import sdk_client
+
+MAIN_WORK_PROJECT = "2314091414"
+RAINDROP_LABEL = "Raindrop"
+
+RAINDROP_MARKER_PATTERN = re.compile(r"\[raindrop:(\d+)\]")
+URL_PATTERN = re.compile(r"https?://\S+")
+
+
+def raindrop_marker(raindrop_id: int) -> str:
+    """
+    The marker written into a task description to tie it back to its raindrop.
+    """
+    return f"[raindrop:{raindrop_id}]"
+
+
+def normalise_link(link: str) -> str:
+    """
+    Normalise a link so trivially different forms of the same URL match.
+    """
+    return link.strip().rstrip("/")
+
+
+class TodoistTaskIndex:
+    """
+    An index of the active Raindrop-labelled tasks that already exist in Todoist.
+
+    The index guards against duplicate tasks when the local database is lost or out of
+    sync. Tasks are indexed by the raindrop id marker in their description and by the
+    link in their comments or description. Raindrop tasks can be routed to any project,
+    so the index covers every project.
+
+    The index is cached to disk. A full fetch (tasks, then the comments of each project
+    holding them, paginated) is only made when the cache is older than `FULL_REFRESH_SECONDS`. Otherwise only
+    tasks created since the last fetch are requested. Tasks created by this program
+    are added with `add` as they are created, so are never re-fetched.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    api : TodoistAPI, default = None
+        A Todoist API client. One is created from the user's API key if not given.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+    label : str, default = RAINDROP_LABEL
+        The label identifying tasks created from raindrops.
+    clock : Callable, default = time.time
+        Allow a fake clock to be passed for testing.
+
+    Attributes
+    ----------
+    cache_path : Path
+        Where the index is cached.
+    tasks : dict[str, dict]
+        Task id to the `link` and `raindrop_id` found for the task.
+    by_link : dict[str, str]
+        Normalised link to task id.
+    by_raindrop_id : dict[int, str]
+        Raindrop id to task id.
+    """
+
+    FULL_REFRESH_SECONDS = 24 * 60 * 60
+    PAGE_LIMIT = 200
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        api: TodoistAPI | None = None,
+        governor: TodoistRateGovernor | None = None,
+        label: str = RAINDROP_LABEL,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.user_config = user_config
+        self.api = api or TodoistAPI(user_config.todoist_api_key, client=sdk_client())
+        self.governor = governor or TodoistRateGovernor()
+        self.label = label
+        self._clock = clock
+        self.cache_path = user_config.cache_dir / "todoist_task_index.json"
+        self.tasks: dict[str, dict[str, Any]] = {}
+        self.by_link: dict[str, str] = {}
+        self.by_raindrop_id: dict[int, str] = {}
+        self.fetched_at = 0.0
+        self.full_fetched_at = 0.0
+
+    def load(self) -> "TodoistTaskIndex":
+        """
+        Load the cached index and bring it up to date.
+
+        Returns
+        -------
+        TodoistTaskIndex
+            The index itself, to allow `TodoistTaskIndex(...).load()`.
+        """
+        self._read_cache()
+        now = self._clock()
+        if now - self.full_fetched_at > self.FULL_REFRESH_SECONDS:
+            self.full_refresh()
+        else:
+            self.incremental_refresh()
+        self.save()
+        return self
+
+    def full_refresh(self) -> None:
+        """
+        Re-fetch every active Raindrop task, and the comments of the projects they are in.
+        """
+        now = self._clock()
+        tasks = self.governor.collect(
+            self.api.get_tasks(label=self.label, limit=self.PAGE_LIMIT)
+        )
+        self._clear()
+        for task in tasks:
+            self._index_task(task.id, task.description)
+        for project_id in sorted({task.project_id for task in tasks}):
+            comments = self.governor.collect(
+                self.api.get_comments(project_id=project_id, limit=self.PAGE_LIMIT)
+            )
+            for comment in comments:
+                self._index_comment(comment.task_id, comment.content)
+        self.fetched_at = self.full_fetched_at = now
+        logger.info(f"Todoist task index rebuilt: {len(self.tasks)} Raindrop tasks.")
+
+    def incremental_refresh(self) -> None:
+        """
+        Fetch only the Raindrop tasks created since the last fetch.
+
+        Todoist filters work in whole days, so the window overlaps the last fetch.
+        Tasks already in the index are skipped.
+        """
+        now = self._clock()
+        days = max(math.ceil((now - self.fetched_at) / 86400), 1)
+        query = f"@{self.label} & created after: -{days} days"
+        tasks = self.governor.collect(
+            self.api.filter_tasks(query=query, limit=self.PAGE_LIMIT)
+        )
+        new_tasks = [task for task in tasks if task.id not in self.tasks]
+        for task in new_tasks:
+            self._index_task(task.id, task.description)
+            comments = self.governor.collect(
+                self.api.get_comments(task_id=task.id, limit=self.PAGE_LIMIT)
+            )
+            for comment in comments:
+                self._index_comment(comment.task_id, comment.content)
+        self.fetched_at = now
+        logger.info(f"Todoist task index refreshed: {len(new_tasks)} new tasks.")
+
+    def contains(self, raindrop: Raindrop) -> bool:
+        """
+        Whether a Todoist task already exists for the raindrop.
+        """
+        return (
+            raindrop.id in self.by_raindrop_id
+            or normalise_link(raindrop.link) in self.by_link
+        )
+
+    def task_id_for(self, raindrop: Raindrop) -> str | None:
+        """
+        The id of the raindrop's existing task, if there is one.
+        """
+        return self.by_raindrop_id.get(raindrop.id) or self.by_link.get(
+            normalise_link(raindrop.link)
+        )
+
+    def add(self, task_id: str, raindrop: Raindrop) -> None:
+        """
+        Add a task created during this run, without fetching it.
+        """
+        self._store(task_id, raindrop.link, raindrop.id)
+
+    def save(self) -> None:
+        """
+        Write the index to the cache file.
+        """
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache = {
+            "label": self.label,
+            "fetched_at": self.fetched_at,
+            "full_fetched_at": self.full_fetched_at,
+            "tasks": self.tasks,
+        }
+        self.cache_path.write_text(json.dumps(cache))
+
+    def _read_cache(self) -> None:
+        """
+        Read the cache file. A missing, corrupt or mismatched cache is ignored.
+        """
+        try:
+            cache = json.loads(self.cache_path.read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if cache.get("label") != self.label:
+            logger.info("Todoist task index cache is for another label. Ignored.")
+            return
+        self._clear()
+        for task_id, entry in cache["tasks"].items():
+            self._store(task_id, entry.get("link"), entry.get("raindrop_id"))
+        self.fetched_at = cache["fetched_at"]
+        self.full_fetched_at = cache["full_fetched_at"]
+
+    def _index_task(self, task_id: str, description: str | None) -> None:
+        description = description or ""
+        marker = RAINDROP_MARKER_PATTERN.search(description)
+        link = URL_PATTERN.search(description)
+        self._store(
+            task_id,
+            link.group(0) if link else None,
+            int(marker.group(1)) if marker else None,
+        )
+
+    def _index_comment(self, task_id: str | None, content: str | None) -> None:
+        if task_id not in self.tasks or not content:
+            return
+        link = URL_PATTERN.search(content)
+        if link:
+            self._store(task_id, link.group(0), None)
+
+    def _store(self, task_id: str, link: str | None, raindrop_id: int | None) -> None:
+        entry = self.tasks.setdefault(task_id, {"link": None, "raindrop_id": None})
+        if link:
+            entry["link"] = normalise_link(link)
+            self.by_link[entry["link"]] = task_id
+        if raindrop_id is not None:
+            entry["raindrop_id"] = raindrop_id
+            self.by_raindrop_id[raindrop_id] = task_id
+
+    def _clear(self) -> None:
+        self.tasks = {}
+        self.by_link = {}
+        self.by_raindrop_id = {}
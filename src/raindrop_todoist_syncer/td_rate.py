@@ -0,0 +1,310 @@
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import threading
+import time
+from typing import Any, Callable, Iterator
+
+from loguru import logger
+
+
+class TodoistRateLimitError(Exception):
+    pass
+
+
+class TodoistRateGovernor:
+    """
+    Throttle Todoist API requests so a run stays inside the per-user request budget.
+
+    Todoist allows a fixed number of requests per user in a rolling window (1000 per 15
+    minutes at the time of writing). The governor records the time of every request and
+    blocks when the window is full. A 429 response blocks all requests until its
+    `Retry-After` has passed.
+
+    The number of writes allowed in flight at once is adjusted with additive-increase /
+    multiplicative-decrease (AIMD). A full round of fast, successful responses adds one
+    slot. A 429, or a response slower than `latency_target`, halves the slots.
+
+    One governor should be shared by every Todoist call made in a run.
+
+    Parameters
+    ----------
+    request_limit : int, default = 1000
+        Requests allowed per rolling window.
+    window_seconds : float, default = 900
+        Length of the rolling window in seconds.
+    max_concurrency : int, default = 4
+        Upper bound for the number of in-flight requests.
+    latency_target : float, default = 2.0
+        Responses slower than this many seconds are treated as congestion.
+    max_retries : int, default = 5
+        How many 429 responses a single call may receive before giving up.
+    default_retry_after : float, default = 5.0
+        Seconds to back off when a 429 arrives without a usable `Retry-After`.
+    clock : Callable, default = time.monotonic
+        Allow a fake clock to be passed for testing.
+    sleep : Callable, default = time.sleep
+        Allow a fake sleep to be passed for testing.
+
+    Attributes
+    ----------
+    concurrency : int
+        The current number of requests allowed in flight.
+    total_wait_seconds : float
+        Total time spent blocked waiting for budget or a `Retry-After` to pass.
+    throttled_responses : int
+        Number of 429 responses observed.
+    """
+
+    REQUEST_LIMIT = 1000
+    WINDOW_SECONDS = 15 * 60
+    SLOT_POLL_SECONDS = 0.05
+
+    def __init__(
+        self,
+        request_limit: int = REQUEST_LIMIT,
+        window_seconds: float = WINDOW_SECONDS,
+        max_concurrency: int = 4,
+        latency_target: float = 2.0,
+        max_retries: int = 5,
+        default_retry_after: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.request_limit = request_limit
+        self.window_seconds = window_seconds
+        self.max_concurrency = max_concurrency
+        self.latency_target = latency_target
+        self.max_retries = max_retries
+        self.default_retry_after = default_retry_after
+        self._clock = clock
+        self._sleep = sleep
+
+        self.concurrency = 1
+        self.total_wait_seconds = 0.0
+        self.throttled_responses = 0
+        self._in_flight = 0
+        self._successes_this_round = 0
+        self._blocked_until = 0.0
+        self._request_times: deque[float] = deque()
+        self._condition = threading.Condition()
+
+    @property
+    def remaining_budget(self) -> int:
+        """
+        Requests still available in the current rolling window.
+        """
+        with self._condition:
+            self._prune(self._clock())
+            return self.request_limit - len(self._request_times)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Summary of the governor state, for logging at the end of a run.
+        """
+        return {
+            "remaining_budget": self.remaining_budget,
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "concurrency": self.concurrency,
+            "throttled_responses": self.throttled_responses,
+        }
+
+    def call(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Call a Todoist API function inside the request budget.
+
+        429 responses are retried after their `Retry-After` up to `max_retries` times.
+        Any other error is re-raised unchanged.
+
+        Parameters
+        ----------
+        func : Callable
+            The API function to call e.g. `TodoistAPI.add_task`.
+
+        Raises
+        ------
+        TodoistRateLimitError
+            If the call is still being throttled after `max_retries` retries.
+        """
+        attempt = 0
+        while True:
+            self.acquire()
+            start = self._clock()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as err:
+                latency = self._clock() - start
+                response = getattr(err, "response", None)
+                status_code = getattr(response, "status_code", None)
+                if status_code != 429:
+                    self.release(latency, status_code)
+                    raise
+                retry_after = self.retry_after(response)
+                self.release(latency, 429, retry_after)
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise TodoistRateLimitError(
+                        f"Todoist still rate limiting after {self.max_retries} retries."
+                    ) from err
+                logger.warning(
+                    f"Todoist returned 429. Retrying in {retry_after:.1f}s "
+                    f"(attempt {attempt}/{self.max_retries})."
+                )
+            else:
+                self.release(self._clock() - start, 200)
+                return result
+
+    def collect(self, pages: Iterator[list[Any]]) -> list[Any]:
+        """
+        Exhaust a paginated Todoist SDK iterator, making each page request via `call`.
+
+        Parameters
+        ----------
+        pages : Iterator[list]
+            A paginator e.g. from `TodoistAPI.get_tasks`.
+
+        Returns
+        -------
+        list
+            The items from every page.
+        """
+        items = []
+        while True:
+            try:
+                page = self.call(next, pages)
+            except StopIteration:
+                return items
+            items.extend(page)
+
+    def acquire(self) -> None:
+        """
+        Block until a concurrency slot and request budget are both available.
+        """
+        with self._condition:
+            while self._in_flight >= self.concurrency:
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            self._wait_for_budget()
+        except BaseException:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+            raise
+
+    def try_acquire(self) -> float:
+        """
+        Take a concurrency slot and a request from the budget without blocking.
+
+        For callers that must not block, such as coroutines on an event loop, which
+        wait the returned time with `asyncio.sleep` and try again. A successful call
+        must be paired with `release`, as for `acquire`.
+
+        Returns
+        -------
+        float
+            0 if the request may go ahead, otherwise the seconds to wait.
+        """
+        with self._condition:
+            if self._in_flight >= self.concurrency:
+                return self.SLOT_POLL_SECONDS
+            now = self._clock()
+            delay = self._budget_delay(now)
+            if delay > 0:
+                self.total_wait_seconds += delay
+                return delay
+            self._request_times.append(now)
+            self._in_flight += 1
+            return 0.0
+
+    def release(
+        self,
+        latency: float,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ) -> None:
+        """
+        Release a concurrency slot and feed the response into the AIMD controller.
+
+        Parameters
+        ----------
+        latency : float
+            Seconds the request took.
+        status_code : int, default = None
+            Response status code. None if no response was received.
+        retry_after : float, default = None
+            Seconds to block all requests for, from a 429 `Retry-After` header.
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if status_code == 429:
+                self.throttled_responses += 1
+                self._blocked_until = max(
+                    self._blocked_until, self._clock() + (retry_after or 0)
+                )
+                self._decrease()
+            elif latency > self.latency_target:
+                logger.debug(f"Slow Todoist response ({latency:.2f}s).")
+                self._decrease()
+            elif status_code is not None and status_code < 400:
+                self._successes_this_round += 1
+                if self._successes_this_round >= self.concurrency:
+                    self._successes_this_round = 0
+                    self.concurrency = min(self.concurrency + 1, self.max_concurrency)
+            self._condition.notify_all()
+
+    def _decrease(self) -> None:
+        self._successes_this_round = 0
+        self.concurrency = max(1, self.concurrency // 2)
+        logger.debug(f"Todoist concurrency reduced to {self.concurrency}.")
+
+    def _wait_for_budget(self) -> None:
+        """
+        Sleep until a `Retry-After` block has passed and the window has room.
+        """
+        while True:
+            with self._condition:
+                now = self._clock()
+                delay = self._budget_delay(now)
+                if delay <= 0:
+                    self._request_times.append(now)
+                    return
+                self.total_wait_seconds += delay
+            logger.info(f"Todoist request budget exhausted. Waiting {delay:.1f}s.")
+            self._sleep(delay)
+
+    def _budget_delay(self, now: float) -> float:
+        """
+        Seconds until a `Retry-After` block has passed and the window has room.
+        """
+        self._prune(now)
+        delay = self._blocked_until - now
+        if delay <= 0 and len(self._request_times) >= self.request_limit:
+            delay = self._request_times[0] + self.window_seconds - now
+        return delay
+
+    def _prune(self, now: float) -> None:
+        while self._request_times and (
+            self._request_times[0] <= now - self.window_seconds
+        ):
+            self._request_times.popleft()
+
+    def retry_after(self, response: Any) -> float:
+        """
+        Read a 429 response's `Retry-After` as either delta-seconds or an HTTP date.
+        """
+        headers = getattr(response, "headers", None) or {}
+        value = headers.get("Retry-After") or headers.get("retry-after")
+        if value is None:
+            return self.default_retry_after
+        try:
+            return max(float(value), 0.0)
+        except (TypeError, ValueError):
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return self.default_retry_after
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
@@ -0,0 +1,141 @@
+import json
+from typing import Any
+import uuid
+
+from loguru import logger
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.transport import (
+    HttpClient,
+    HttpResponse,
+    default_http_client,
+)
+
+
+class TodoistSyncError(Exception):
+    pass
+
+
+class TodoistSyncClient:
+    """
+    A minimal client for the Todoist Sync API, used for batched writes.
+
+    The REST API (and `todoist_api_python`) makes one request per write. The Sync API
+    accepts up to 100 commands in one request, so bulk work such as creating labels or
+    updating tasks costs one request per 100 items instead of one per item.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+    http : HttpClient, default = None
+        Defaults to the process-wide client.
+
+    Example
+    -------
+    >>> sync_client = TodoistSyncClient(user_config)
+    >>> command = sync_client.command("label_add", {"name": "python"}, temp_id="t1")
+    >>> sync_client.commands([command])
+    """
+
+    SYNC_URL = "https://api.todoist.com/api/v1/sync"
+    MAX_COMMANDS = 100
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        governor: TodoistRateGovernor | None = None,
+        http: HttpClient | None = None,
+    ) -> None:
+        self.headers = {"Authorization": f"Bearer {user_config.todoist_api_key}"}
+        self.governor = governor or TodoistRateGovernor()
+        self.http = http or default_http_client()
+
+    @staticmethod
+    def command(
+        command_type: str, args: dict[str, Any], temp_id: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Build a Sync API command.
+
+        Parameters
+        ----------
+        command_type : str
+            e.g. "label_add", "item_update", "item_close".
+        args : dict
+            The command arguments.
+        temp_id : str, default = None
+            A temporary id for an object being created. The real id is returned in the
+            `temp_id_mapping`.
+        """
+        command = {"type": command_type, "uuid": str(uuid.uuid4()), "args": args}
+        if temp_id is not None:
+            command["temp_id"] = temp_id
+        return command
+
+    def commands(self, commands: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Send commands in batches of `MAX_COMMANDS`.
+
+        Parameters
+        ----------
+        commands : list[dict]
+            Commands built with `command`.
+
+        Returns
+        -------
+        dict
+            "temp_id_mapping" for created objects and "failed", the uuids of any
+            commands Todoist rejected mapped to their error.
+        """
+        temp_id_mapping: dict[str, str] = {}
+        failed: dict[str, Any] = {}
+        for start in range(0, len(commands), self.MAX_COMMANDS):
+            batch = commands[start : start + self.MAX_COMMANDS]
+            data = self.sync({"commands": json.dumps(batch)})
+            temp_id_mapping.update(data.get("temp_id_mapping", {}))
+            for command_uuid, status in data.get("sync_status", {}).items():
+                if status != "ok":
+                    failed[command_uuid] = status
+        if failed:
+            logger.error(f"{len(failed)} Todoist sync command(s) failed: {failed}")
+        logger.info(f"Sent {len(commands)} Todoist sync command(s).")
+        return {"temp_id_mapping": temp_id_mapping, "failed": failed}
+
+    def read(self, sync_token: str, resource_types: list[str]) -> dict[str, Any]:
+        """
+        Read resources changed since `sync_token`. "*" reads everything.
+
+        Returns
+        -------
+        dict
+            The Sync API response, including the next "sync_token" and "full_sync".
+        """
+        return self.sync(
+            {"sync_token": sync_token, "resource_types": json.dumps(resource_types)}
+        )
+
+    def sync(self, data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Make a single Sync API request via the rate governor.
+
+        Raises
+        ------
+        TodoistSyncError
+            If the response is not valid JSON.
+        """
+        response = self.governor.call(self._post, data)
+        try:
+            return response.json()
+        except ValueError as err:
+            raise TodoistSyncError(
+                f"Invalid Sync API response: {response.text}"
+            ) from err
+
+    def _post(self, data: dict[str, Any]) -> HttpResponse:
+        response = self.http.post(self.SYNC_URL, headers=self.headers, data=data)
+        response.raise_for_status()
+        return response
@@ -3,6 +3,26 @@ from todoist_api_python.api import TodoistAPI
 
 from raindrop_todoist_syncer.config import UserConfig
 from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.routing import Route
+from raindrop_todoist_syncer.td_index import MAIN_WORK_PROJECT, raindrop_marker
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.transport import sdk_client
+
+
+def task_description(raindrop: Raindrop) -> str:
+    """
+    Build a task description from a raindrop's notes, highlights and its id marker.
+
+    Highlights are rendered as quotes, each followed by its note if it has one.
+    """
+    parts = [raindrop.notes] if raindrop.notes else []
+    for highlight in raindrop.highlights:
+        quote = "\n".join(f"> {line}" for line in highlight["text"].splitlines())
+        if highlight.get("note"):
+            quote = f"{quote}\n{highlight['note']}"
+        parts.append(quote)
+    parts.append(raindrop_marker(raindrop.id))
+    return "\n\n".join(parts)
 
 
 class TodoistTaskCreator:
@@ -20,19 +40,33 @@ class TodoistTaskCreator:
     task_title : str
         a string representing the task title
     task_description : str
-        a string representing the task description
+        a string representing the task description: the raindrop's notes and
+        highlights, ending with the raindrop id marker used by `TodoistTaskIndex`
     website_link : str
         a string representing the website link
+    governor : TodoistRateGovernor
+        the rate governor every Todoist request is made through
+    task_id : str
+        the id of the created task, None until `create_task` succeeds. Also set on
+        the raindrop, so it is stored in the database.
+    route : Route
+        the project, section and labels the task is created with
 
     Methods
     -------
     create_task():
-        Creates a new task in Todoist.
+        Creates a new task in Todoist. Returns True if the task was created.
     _add_link_as_comment(task_id: str):
         Adds the Raindrops website link as a comment to the task.
     """
 
-    def __init__(self, user_config: UserConfig, raindrop: Raindrop) -> None:
+    def __init__(
+        self,
+        user_config: UserConfig,
+        raindrop: Raindrop,
+        governor: TodoistRateGovernor | None = None,
+        route: Route | None = None,
+    ) -> None:
         """
         Constructs all the necessary attributes for the TodoistTaskCreator object.
 
@@ -40,40 +74,64 @@ class TodoistTaskCreator:
         ----------
             raindrop : Raindrop
                 an instance of the Raindrop class
+            governor : TodoistRateGovernor, default = None
+                a rate governor shared across the run. A private one is created if
+                none is given.
+            route : Route, default = None
+                the route from the `TaskRouter`. Defaults to MAIN_WORK_PROJECT with
+                the Raindrop label.
         """
         self.user_config = user_config
-        self.MAIN_WORK_PROJECT = "2314091414"
+        self.raindrop = raindrop
+        self.MAIN_WORK_PROJECT = MAIN_WORK_PROJECT
         self.TODOIST_API_KEY = self.user_config.todoist_api_key
-        self.api = TodoistAPI(self.TODOIST_API_KEY)
+        self.api = TodoistAPI(self.TODOIST_API_KEY, client=sdk_client())
         self.task_title = raindrop.title
-        self.task_description = raindrop.notes
+        self.task_description = task_description(raindrop)
         self.website_link = raindrop.link
+        self.governor = governor or TodoistRateGovernor()
+        self.task_id = None
+        self.route = route or Route(self.MAIN_WORK_PROJECT)
 
-    def create_task(self):
+    def create_task(self) -> bool:
         """
         Creates a new task in Todoist.
 
+        Requests go through the rate governor, so a 429 is waited out and retried
+        rather than dropped. A failure to add the link comment is logged but still
+        counts as success, to avoid creating a duplicate task on the next run.
+
         Returns
         -------
-        None
+        bool
+            True if the task was created. False if it was not, in which case the
+            raindrop should not be marked as processed.
         """
 
+        optional = {}
+        if self.route.section_id:
+            optional["section_id"] = self.route.section_id
+
         try:
-            task = self.api.add_task(
+            task = self.governor.call(
+                self.api.add_task,
                 content=f"{self.task_title}",
-                project_id=self.MAIN_WORK_PROJECT,
+                project_id=self.route.project_id,
                 description=f"{self.task_description}",
                 due_string="today",
                 due_lang="en",
                 priority=1,
-                labels=["Raindrop"],
+                labels=list(self.route.labels),
+                **optional,
             )
-
-            self._add_link_as_comment(task.id)
-            logger.info(f"Created task: {task.content}")
-
         except Exception as e:
-            logger.error(e)
+            logger.error(f"Task not created for '{self.task_title}': {e}")
+            return False
+
+        self.task_id = self.raindrop.task_id = task.id
+        self._add_link_as_comment(task.id)
+        logger.info(f"Created task: {task.content}")
+        return True
 
     def _add_link_as_comment(self, task_id):
         """
@@ -92,6 +150,8 @@ class TodoistTaskCreator:
         """
 
         try:
-            self.api.add_comment(task_id=task_id, content=self.website_link)
+            self.governor.call(
+                self.api.add_comment, task_id=task_id, content=self.website_link
+            )
         except Exception as e:
             logger.error(e)
@@ -0,0 +1,160 @@
+from typing import Any
+
+from loguru import logger
+
+from raindrop_todoist_syncer.config import UserConfigProtocol
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.rd_process import RaindropChange
+from raindrop_todoist_syncer.td_index import normalise_link
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
+from raindrop_todoist_syncer.td_sync import TodoistSyncClient
+from raindrop_todoist_syncer.td_task import task_description
+
+
+class TodoistTaskUpdater:
+    """
+    Push changes to processed raindrops into their existing Todoist tasks.
+
+    All updates are sent as Sync API commands, up to 100 per request. Each task's
+    content and description are rewritten. If the link changed, the new link is added
+    as a comment, in the same way `TodoistTaskCreator` adds it.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+    sync_client : TodoistSyncClient, default = None
+        Created from the user config if not given.
+
+    Example
+    -------
+    >>> updater = TodoistTaskUpdater(user_config)
+    >>> updated = updater.update_tasks(processor.changed_raindrops_extractor())
+    """
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        governor: TodoistRateGovernor | None = None,
+        sync_client: TodoistSyncClient | None = None,
+    ) -> None:
+        self.sync_client = sync_client or TodoistSyncClient(user_config, governor)
+
+    def update_tasks(self, changes: list[RaindropChange]) -> list[Raindrop]:
+        """
+        Update the tasks of changed raindrops.
+
+        Parameters
+        ----------
+        changes : list[RaindropChange]
+            From `RaindropsProcessor.changed_raindrops_extractor`.
+
+        Returns
+        -------
+        list[Raindrop]
+            The raindrops whose tasks were updated. Only these should have their
+            database rows replaced, so failed updates are retried on the next run.
+        """
+        if not changes:
+            return []
+        commands_by_raindrop: dict[int, list[str]] = {}
+        commands = []
+        for raindrop, previous in changes:
+            raindrop_commands = [
+                self.sync_client.command(
+                    "item_update",
+                    {
+                        "id": raindrop.task_id,
+                        "content": raindrop.title,
+                        "description": task_description(raindrop),
+                    },
+                )
+            ]
+            if normalise_link(raindrop.link) != normalise_link(previous["link"]):
+                raindrop_commands.append(
+                    self.sync_client.command(
+                        "note_add",
+                        {"item_id": raindrop.task_id, "content": raindrop.link},
+                        temp_id=f"note-{raindrop.id}",
+                    )
+                )
+            commands_by_raindrop[raindrop.id] = [c["uuid"] for c in raindrop_commands]
+            commands.extend(raindrop_commands)
+
+        failed = self.sync_client.commands(commands)["failed"]
+        updated = [
+            raindrop
+            for raindrop, _ in changes
+            if not any(uuid in failed for uuid in commands_by_raindrop[raindrop.id])
+        ]
+        logger.info(f"Updated {len(updated)} of {len(changes)} changed task(s).")
+        return updated
+
+
+class TodoistTaskCloser:
+    """
+    Close, or delete, the Todoist tasks of raindrops that are no longer favourites.
+
+    All tasks are closed with Sync API commands, up to 100 per request. A task that no
+    longer exists in Todoist counts as closed.
+
+    Parameters
+    ----------
+    user_config : UserConfig
+        A user config.
+    governor : TodoistRateGovernor, default = None
+        The rate governor for the run.
+    sync_client : TodoistSyncClient, default = None
+        Created from the user config if not given.
+    action : str, default = "close"
+        "close" to complete the tasks, "delete" to delete them.
+    """
+
+    ACTIONS = {"close": "item_close", "delete": "item_delete"}
+
+    def __init__(
+        self,
+        user_config: UserConfigProtocol,
+        governor: TodoistRateGovernor | None = None,
+        sync_client: TodoistSyncClient | None = None,
+        action: str = "close",
+    ) -> None:
+        if action not in self.ACTIONS:
+            raise ValueError(f"Unknown action '{action}'. Use 'close' or 'delete'.")
+        self.sync_client = sync_client or TodoistSyncClient(user_config, governor)
+        self.command_type = self.ACTIONS[action]
+
+    def close_tasks(self, task_ids: dict[int, str]) -> list[int]:
+        """
+        Close the tasks of removed raindrops.
+
+        Parameters
+        ----------
+        task_ids : dict[int, str]
+            Raindrop id to task id.
+
+        Returns
+        -------
+        list[int]
+            The ids of the raindrops whose tasks are closed or already gone.
+        """
+        if not task_ids:
+            return []
+        commands = {
+            raindrop_id: self.sync_client.command(self.command_type, {"id": task_id})
+            for raindrop_id, task_id in task_ids.items()
+        }
+        failed = self.sync_client.commands(list(commands.values()))["failed"]
+        closed = [
+            raindrop_id
+            for raindrop_id, command in commands.items()
+            if command["uuid"] not in failed or self._is_gone(failed[command["uuid"]])
+        ]
+        logger.info(f"Closed {len(closed)} of {len(task_ids)} task(s).")
+        return closed
+
+    @staticmethod
+    def _is_gone(status: Any) -> bool:
+        return isinstance(status, dict) and status.get("http_code") == 404
@@ -0,0 +1,832 @@
+import asyncio
+from collections import OrderedDict
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, NamedTuple
+from urllib.parse import urlencode, urlsplit
+
+import httpx
+from loguru import logger
+import requests
+from requests.structures import CaseInsensitiveDict
+import urllib3
+
+DEFAULT_TIMEOUT = 30.0
+POOL_SIZE = 16
+
+# Requests per second allowed to each host. Raindrop allows 120 a minute.
+RATE_LIMITS = {"api.raindrop.io": 2.0}
+RATE_LIMIT_BURST = 10
+
+# Headers that no longer apply once a body has been read and decoded.
+_BODY_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class HttpRequest(NamedTuple):
+    """
+    A request, as passed through the middleware to a transport.
+
+    Attributes
+    ----------
+    method : str
+        e.g. "GET".
+    url : str
+        The URL, without the query string.
+    headers : dict, default = None
+    params : dict, default = None
+        Query string parameters.
+    json : Any, default = None
+        A body to send as JSON.
+    data : Any, default = None
+        A body to send as form fields (a dict) or as is.
+    timeout : float, default = None
+        Seconds to wait for the server. Set by `TimeoutMiddleware` if not given.
+    cache_ttl : float, default = None
+        Seconds a successful GET response may be reused by `CacheMiddleware`. Not
+        cached if not given.
+    """
+
+    method: str
+    url: str
+    headers: dict[str, str] | None = None
+    params: dict[str, Any] | None = None
+    json: Any = None
+    data: Any = None
+    timeout: float | None = None
+    cache_ttl: float | None = None
+
+    @property
+    def host(self) -> str:
+        return urlsplit(self.url).hostname or ""
+
+    @property
+    def full_url(self) -> str:
+        """
+        The URL with the query string.
+        """
+        if not self.params:
+            return self.url
+        return f"{self.url}?{urlencode(self.params, doseq=True)}"
+
+
+class HttpResponse:
+    """
+    A response from any transport.
+
+    Has the parts of the `requests.Response` interface the clients use, and raises
+    the same `requests` exceptions, whichever backend made the request.
+
+    Parameters
+    ----------
+    status_code : int
+    content : bytes, default = b""
+    headers : Mapping, default = None
+    request : HttpRequest, default = None
+    elapsed : float, default = 0.0
+        Seconds the transport took.
+    """
+
+    def __init__(
+        self,
+        status_code: int,
+        content: bytes = b"",
+        headers: Any = None,
+        request: HttpRequest | None = None,
+        elapsed: float = 0.0,
+    ) -> None:
+        self.status_code = status_code
+        self.content = content
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.request = request
+        self.elapsed = elapsed
+
+    @classmethod
+    def from_json(
+        cls, data: Any, status_code: int = 200, headers: Any = None
+    ) -> "HttpResponse":
+        headers = {"Content-Type": "application/json", **(headers or {})}
+        return cls(status_code, json.dumps(data).encode(), headers)
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """
+        Raises
+        ------
+        requests.HTTPError
+            If the status code is 4xx or 5xx.
+        """
+        if not self.ok:
+            url = self.request.url if self.request else ""
+            raise requests.HTTPError(
+                f"{self.status_code} Error for url: {url}", response=self
+            )
+
+    def __repr__(self) -> str:
+        return f"<HttpResponse [{self.status_code}]>"
+
+
+class Transport:
+    """
+    A backend that sends requests. Every backend raises `requests.ConnectionError` or
+    `requests.Timeout` when no response arrives, so callers handle one family of
+    exceptions.
+    """
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        raise NotImplementedError(f"{type(self).__name__} can't send synchronously.")
+
+    async def send_async(self, request: HttpRequest) -> HttpResponse:
+        raise NotImplementedError(f"{type(self).__name__} can't send asynchronously.")
+
+
+class RequestsTransport(Transport):
+    """
+    Send requests with a pooled `requests.Session`.
+    """
+
+    def __init__(self, session: requests.Session | None = None) -> None:
+        self.session = session or requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        response = self.session.request(
+            request.method,
+            request.url,
+            headers=request.headers,
+            params=request.params,
+            json=request.json,
+            data=request.data,
+            timeout=request.timeout,
+        )
+        return HttpResponse(
+            response.status_code,
+            response.content,
+            response.headers,
+            request,
+            time.perf_counter() - start,
+        )
+
+
+class Urllib3Transport(Transport):
+    """
+    Send requests with a raw `urllib3.PoolManager`, without the `requests` layer.
+    """
+
+    def __init__(self, pool: urllib3.PoolManager | None = None) -> None:
+        self.pool = pool or urllib3.PoolManager(maxsize=POOL_SIZE)
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        headers = dict(request.headers or {})
+        body = None
+        if request.json is not None:
+            body = json.dumps(request.json).encode()
+            headers.setdefault("Content-Type", "application/json")
+        elif isinstance(request.data, dict):
+            body = urlencode(request.data)
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        elif request.data is not None:
+            body = request.data
+        start = time.perf_counter()
+        try:
+            response = self.pool.request(
+                request.method,
+                request.full_url,
+                body=body,
+                headers=headers,
+                timeout=request.timeout,
+                retries=urllib3.Retry(connect=0, read=0, status=0, other=0),
+            )
+        except urllib3.exceptions.TimeoutError as err:
+            raise requests.Timeout(str(err)) from err
+        except urllib3.exceptions.HTTPError as err:
+            raise requests.ConnectionError(str(err)) from err
+        return HttpResponse(
+            response.status,
+            response.data,
+            response.headers,
+            request,
+            time.perf_counter() - start,
+        )
+
+
+class AsyncTransport(Transport):
+    """
+    Send requests from an event loop with a pooled `httpx.AsyncClient`.
+
+    The client is bound to the loop it is first used on, so create the transport
+    inside the loop and `aclose` it there.
+    """
+
+    def __init__(self, client: httpx.AsyncClient | None = None) -> None:
+        self.client = client or httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE
+            )
+        )
+
+    async def send_async(self, request: HttpRequest) -> HttpResponse:
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                request.method,
+                request.url,
+                headers=request.headers,
+                params=request.params,
+                json=request.json,
+                data=request.data,
+                timeout=request.timeout,
+            )
+        except httpx.TimeoutException as err:
+            raise requests.Timeout(str(err)) from err
+        except httpx.TransportError as err:
+            raise requests.ConnectionError(str(err)) from err
+        return HttpResponse(
+            response.status_code,
+            response.content,
+            response.headers,
+            request,
+            time.perf_counter() - start,
+        )
+
+    async def aclose(self) -> None:
+        await self.client.aclose()
+
+
+class FakeTransport(Transport):
+    """
+    An in-memory transport for tests.
+
+    Parameters
+    ----------
+    handler : Callable
+        Called with each `HttpRequest`. Returns an `HttpResponse` or raises.
+
+    Attributes
+    ----------
+    requests : list[HttpRequest]
+        Every request sent, in order.
+    """
+
+    def __init__(self, handler: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.handler = handler
+        self.requests: list[HttpRequest] = []
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        self.requests.append(request)
+        response = self.handler(request)
+        response.request = request
+        return response
+
+    async def send_async(self, request: HttpRequest) -> HttpResponse:
+        return self.send(request)
+
+
+Handler = Callable[[HttpRequest], HttpResponse]
+AsyncHandler = Callable[[HttpRequest], Awaitable[HttpResponse]]
+
+
+class Middleware:
+    """
+    A step every request passes through on its way to the transport.
+
+    Subclasses override `handle`, and `handle_async` if they wait or block, calling
+    `call_next` to pass the request on. The default passes it on unchanged.
+    """
+
+    def handle(self, request: HttpRequest, call_next: Handler) -> HttpResponse:
+        return call_next(request)
+
+    async def handle_async(
+        self, request: HttpRequest, call_next: AsyncHandler
+    ) -> HttpResponse:
+        return await call_next(request)
+
+
+class TimeoutMiddleware(Middleware):
+    """
+    Give requests without a timeout a default one, so no request can hang forever.
+    """
+
+    def __init__(self, seconds: float = DEFAULT_TIMEOUT) -> None:
+        self.seconds = seconds
+
+    def handle(self, request: HttpRequest, call_next: Handler) -> HttpResponse:
+        return call_next(self._with_timeout(request))
+
+    async def handle_async(
+        self, request: HttpRequest, call_next: AsyncHandler
+    ) -> HttpResponse:
+        return await call_next(self._with_timeout(request))
+
+    def _with_timeout(self, request: HttpRequest) -> HttpRequest:
+        if request.timeout is None:
+            return request._replace(timeout=self.seconds)
+        return request
+
+
+class RetryMiddleware(Middleware):
+    """
+    Retry idempotent requests that fail with a server error or no response, with
+    exponential backoff.
+
+    POST requests are never retried, as a retried create could make a duplicate.
+    429s are left to the caller, which knows the API's rate limit rules.
+
+    Parameters
+    ----------
+    attempts : int, default = 3
+        Attempts in total, including the first.
+    backoff : float, default = 1.0
+        Seconds before the first retry. Doubled for each one after.
+    max_backoff : float, default = 10.0
+    sleep : Callable, default = time.sleep
+        Allow a fake sleep to be passed for testing.
+    """
+
+    RETRY_STATUSES = frozenset({500, 502, 503, 504})
+    IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 1.0,
+        max_backoff: float = 10.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+
+    def handle(self, request: HttpRequest, call_next: Handler) -> HttpResponse:
+        attempt = 1
+        while True:
+            try:
+                response = call_next(request)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if not self._should_retry(request, attempt):
+                    raise
+                self._sleep(self._delay(request, attempt, err))
+            else:
+                if response.status_code not in self.RETRY_STATUSES or (
+                    not self._should_retry(request, attempt)
+                ):
+                    return response
+                self._sleep(self._delay(request, attempt, response))
+            attempt += 1
+
+    async def handle_async(
+        self, request: HttpRequest, call_next: AsyncHandler
+    ) -> HttpResponse:
+        attempt = 1
+        while True:
+            try:
+                response = await call_next(request)
+            except (requests.ConnectionError, requests.Timeout) as err:
+                if not self._should_retry(request, attempt):
+                    raise
+                await asyncio.sleep(self._delay(request, attempt, err))
+            else:
+                if response.status_code not in self.RETRY_STATUSES or (
+                    not self._should_retry(request, attempt)
+                ):
+                    return response
+                await asyncio.sleep(self._delay(request, attempt, response))
+            attempt += 1
+
+    def _should_retry(self, request: HttpRequest, attempt: int) -> bool:
+        return attempt < self.attempts and request.method in self.IDEMPOTENT_METHODS
+
+    def _delay(self, request: HttpRequest, attempt: int, cause: Any) -> float:
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        logger.warning(
+            f"{request.method} {request.url} failed ({cause!r}). Retrying in "
+            f"{delay:.1f}s (attempt {attempt}/{self.attempts})."
+        )
+        return delay
+
+
+class RateLimitMiddleware(Middleware):
+    """
+    Space out requests to each host so they stay under its rate limit.
+
+    A host may take `burst` requests at once, then one per `1 / rate` seconds
+    (the generic cell rate algorithm). Hosts without a rate are not limited.
+
+    Parameters
+    ----------
+    rates : dict[str, float]
+        Host to requests per second.
+    burst : int, default = RATE_LIMIT_BURST
+    clock : Callable, default = time.monotonic
+    sleep : Callable, default = time.sleep
+        Allow a fake clock and sleep to be passed for testing.
+    """
+
+    def __init__(
+        self,
+        rates: dict[str, float],
+        burst: int = RATE_LIMIT_BURST,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.rates = rates
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._next_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def handle(self, request: HttpRequest, call_next: Handler) -> HttpResponse:
+        delay = self._reserve(request.host)
+        if delay > 0:
+            self._sleep(delay)
+        return call_next(request)
+
+    async def handle_async(
+        self, request: HttpRequest, call_next: AsyncHandler
+    ) -> HttpResponse:
+        delay = self._reserve(request.host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return await call_next(request)
+
+    def _reserve(self, host: str) -> float:
+        """
+        Take the host's next free slot. Returns the seconds until it comes round.
+        """
+        rate = self.rates.get(host)
+        if not rate:
+            return 0.0
+        interval = 1 / rate
+        with self._lock:
+            now = self._clock()
+            next_at = max(self._next_at.get(host, now), now)
+            delay = next_at - (self.burst - 1) * interval - now
+            self._next_at[host] = next_at + interval
+        if delay > 0:
+            logger.debug(f"Rate limiting {host}: waiting {delay:.2f}s.")
+        return max(delay, 0.0)
+
+
+class CacheMiddleware(Middleware):
+    """
+    Reuse successful GET responses for requests that set a `cache_ttl`.
+
+    Entries are keyed by URL and credentials, so responses are never shared between
+    accounts. Any other request to a host drops the host's entries, as it may have
+    changed what they would return. The least recently used entry is dropped once
+    there are `max_entries`.
+
+    Attributes
+    ----------
+    hits : int
+    misses : int
+    """
+
+    def __init__(
+        self, max_entries: int = 256, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[tuple, tuple[float, HttpResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def handle(self, request: HttpRequest, call_next: Handler) -> HttpResponse:
+        cached = self._lookup(request)
+        if cached is not None:
+            return cached
+        response = call_next(request)
+        self._store(request, response)
+        return response
+
+    async def handle_async(
+        self, request: HttpRequest, call_next: AsyncHandler
+    ) -> HttpResponse:
+        cached = self._lookup(request)
+        if cached is not None:
+            return cached
+        response = await call_next(request)
+        self._store(request, response)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _lookup(self, request: HttpRequest) -> HttpResponse | None:
+        with self._lock:
+            if request.method != "GET":
+                for key in [k for k in self._entries if k[0] == request.host]:
+                    del self._entries[key]
+                return None
+            if request.cache_ttl is None:
+                return None
+            key = self._key(request)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= self._clock():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def _store(self, request: HttpRequest, response: HttpResponse) -> None:
+        if request.method != "GET" or request.cache_ttl is None or not response.ok:
+            return
+        with self._lock:
+            key = self._key(request)
+            self._entries[key] = (self._clock() + request.cache_ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _key(request: HttpRequest) -> tuple:
+        auth = (request.headers or {}).get("Authorization", "")
+        return (
+            request.host,
+            request.full_url,
+            hashlib.sha256(auth.encode()).hexdigest(),
+        )
+
+
+class TransportMetrics:
+    """
+    Per-host request counts, timings and response sizes.
+    """
+
+    def __init__(self) -> None:
+        self._hosts: dict[str, dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self, host: str, seconds: float, size: int = 0, error: bool = False
+    ) -> None:
+        with self._lock:
+            stats = self._hosts.setdefault(
+                host,
+                {
+                    "requests": 0,
+                    "errors": 0,
+                    "seconds": 0.0,
+                    "max_seconds": 0.0,
+                    "bytes": 0,
+                },
+            )
+            stats["requests"] += 1
+            stats["errors"] += error
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["bytes"] += size
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """
+        The stats by host, with the mean time per request.
+        """
+        with self._lock:
+            return {
+                host: {
+                    **{k: round(v, 3) for k, v in stats.items()},
+                    "mean_seconds": round(stats["seconds"] / stats["requests"], 3),
+                }
+                for host, stats in self._hosts.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+class MetricsMiddleware(Middleware):
+    """
+    Record every request that reaches the transport in a `TransportMetrics`.
+
+    Place it last, so each retry is recorded and cache hits are not.
+    """
+
+    def __init__(self, metrics: TransportMetrics) -> None:
+        self.metrics = metrics
+
+    def handle(self, request: HttpRequest, call_next: Handler) -> HttpResponse:
+        start = time.perf_counter()
+        try:
+            response = call_next(request)
+        except Exception:
+            self.metrics.record(request.host, time.perf_counter() - start, error=True)
+            raise
+        self._record(request, response, time.perf_counter() - start)
+        return response
+
+    async def handle_async(
+        self, request: HttpRequest, call_next: AsyncHandler
+    ) -> HttpResponse:
+        start = time.perf_counter()
+        try:
+            response = await call_next(request)
+        except Exception:
+            self.metrics.record(request.host, time.perf_counter() - start, error=True)
+            raise
+        self._record(request, response, time.perf_counter() - start)
+        return response
+
+    def _record(
+        self, request: HttpRequest, response: HttpResponse, seconds: float
+    ) -> None:
+        self.metrics.record(
+            request.host, seconds, len(response.content), error=not response.ok
+        )
+
+
+class HttpClient:
+    """
+    Send requests through a stack of middleware to a transport.
+
+    Parameters
+    ----------
+    transport : Transport
+        The backend.
+    middleware : list[Middleware], default = ()
+        Outermost first.
+    metrics : TransportMetrics, default = None
+        The metrics recorded by the stack's `MetricsMiddleware`, if any.
+
+    Example
+    -------
+    >>> http = HttpClient(RequestsTransport(), [TimeoutMiddleware()])
+    >>> response = http.get("https://api.raindrop.io/rest/v1/collections")
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        middleware: list[Middleware] | tuple = (),
+        metrics: TransportMetrics | None = None,
+    ) -> None:
+        self.transport = transport
+        self.middleware = list(middleware)
+        self.metrics = metrics
+
+    def send(self, request: HttpRequest) -> HttpResponse:
+        def call(index: int, request: HttpRequest) -> HttpResponse:
+            if index == len(self.middleware):
+                return self.transport.send(request)
+            return self.middleware[index].handle(
+                request, lambda request: call(index + 1, request)
+            )
+
+        return call(0, request)
+
+    async def send_async(self, request: HttpRequest) -> HttpResponse:
+        async def call(index: int, request: HttpRequest) -> HttpResponse:
+            if index == len(self.middleware):
+                return await self.transport.send_async(request)
+            return await self.middleware[index].handle_async(
+                request, lambda request: call(index + 1, request)
+            )
+
+        return await call(0, request)
+
+    def clear_cache(self) -> None:
+        """
+        Drop every response cached by the stack's `CacheMiddleware`, if any.
+        """
+        for middleware in self.middleware:
+            if isinstance(middleware, CacheMiddleware):
+                middleware.clear()
+
+    def request(self, method: str, url: str, **kwargs) -> HttpResponse:
+        return self.send(HttpRequest(method, url, **kwargs))
+
+    async def request_async(self, method: str, url: str, **kwargs) -> HttpResponse:
+        return await self.send_async(HttpRequest(method, url, **kwargs))
+
+    def get(self, url: str, **kwargs) -> HttpResponse:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> HttpResponse:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> HttpResponse:
+        return self.request("PUT", url, **kwargs)
+
+
+def build_http_client(
+    transport: Transport | None = None,
+    metrics: TransportMetrics | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> HttpClient:
+    """
+    An `HttpClient` with the standard middleware.
+
+    cache -> rate limit -> retry -> timeout -> metrics -> transport
+
+    Parameters
+    ----------
+    transport : Transport, default = None
+        Defaults to a `RequestsTransport`.
+    metrics : TransportMetrics, default = None
+        Pass the same metrics to several clients to measure them together.
+    timeout : float, default = DEFAULT_TIMEOUT
+    """
+    metrics = metrics or TransportMetrics()
+    return HttpClient(
+        transport or RequestsTransport(),
+        [
+            CacheMiddleware(),
+            RateLimitMiddleware(RATE_LIMITS),
+            RetryMiddleware(),
+            TimeoutMiddleware(timeout),
+            MetricsMiddleware(metrics),
+        ],
+        metrics,
+    )
+
+
+_default_client: HttpClient | None = None
+_default_lock = threading.Lock()
+
+
+def default_http_client() -> HttpClient:
+    """
+    The process-wide client used by every API client not given its own, so they
+    share one connection pool, cache and set of metrics.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = build_http_client()
+        return _default_client
+
+
+def set_default_http_client(client: HttpClient | None) -> None:
+    """
+    Replace the process-wide client. None builds a new one when next needed.
+    """
+    global _default_client
+    with _default_lock:
+        _default_client = client
+
+
+class HttpxTransportAdapter(httpx.BaseTransport):
+    """
+    Route an `httpx.Client`, such as the one inside the Todoist SDK, through an
+    `HttpClient`.
+
+    Parameters
+    ----------
+    http : HttpClient, default = None
+        Defaults to the process-wide client at the time of each request.
+    """
+
+    def __init__(self, http: HttpClient | None = None) -> None:
+        self.http = http
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        http = self.http or default_http_client()
+        try:
+            response = http.send(
+                HttpRequest(
+                    request.method,
+                    str(request.url),
+                    headers=dict(request.headers),
+                    data=request.read() or None,
+                )
+            )
+        except requests.Timeout as err:
+            raise httpx.TimeoutException(str(err), request=request) from err
+        except requests.ConnectionError as err:
+            raise httpx.ConnectError(str(err), request=request) from err
+        headers = {
+            k: v for k, v in response.headers.items() if k.lower() not in _BODY_HEADERS
+        }
+        return httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=response.content,
+            request=request,
+        )
+
+
+def sdk_client() -> httpx.Client:
+    """
+    An `httpx.Client` for an SDK, e.g. `TodoistAPI(token, client=sdk_client())`, that
+    sends through the process-wide `HttpClient`.
+    """
+    return httpx.Client(transport=HttpxTransportAdapter())
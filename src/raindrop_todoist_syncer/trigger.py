@@ -0,0 +1,166 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+from pathlib import Path
+import socketserver
+import threading
+from typing import Any
+
+from loguru import logger
+
+from raindrop_todoist_syncer.daemon import SyncDaemon
+
+
+def parse_trigger(command: str) -> int | None:
+    """
+    Parse a trigger command: "sync" for a full sync, or a raindrop id to push.
+
+    Raises
+    ------
+    ValueError
+        If the command is neither.
+    """
+    command = command.strip()
+    if command == "sync":
+        return None
+    return int(command)
+
+
+class TriggerServer:
+    """
+    Accept triggers for a `SyncDaemon` from other local programs, e.g. a Shortcut, a
+    browser extension or a relay for IFTTT, so a new favourite doesn't have to wait
+    for the next scheduled cycle.
+
+    Over HTTP, bound to localhost only:
+
+    - `POST /sync` runs a full sync.
+    - `POST /raindrops/<id>` pushes one raindrop.
+    - `GET /status` returns the daemon's cycle stats as JSON.
+
+    Over the UNIX socket, each line is a command: "sync" or a raindrop id. Each is
+    answered with "ok" or "error: <reason>". The socket is only accessible by its
+    owner.
+
+    Triggers only wake the daemon, which coalesces them, so a burst of triggers costs
+    one cycle.
+
+    Parameters
+    ----------
+    daemon : SyncDaemon
+        The daemon to trigger.
+    port : int, default = None
+        The HTTP port. No HTTP listener if not given. 0 picks a free port.
+    socket_path : Path, default = None
+        The UNIX socket path. No socket listener if not given.
+
+    Example
+    -------
+    >>> triggers = TriggerServer(daemon, port=8765)
+    >>> triggers.start()
+    >>> daemon.serve()
+    >>> triggers.close()
+    """
+
+    HOST = "127.0.0.1"
+
+    def __init__(
+        self,
+        daemon: SyncDaemon,
+        port: int | None = None,
+        socket_path: Path | None = None,
+    ) -> None:
+        self.daemon = daemon
+        self.port = port
+        self.socket_path = socket_path
+        self._servers: list[socketserver.BaseServer] = []
+
+    def start(self) -> None:
+        """
+        Start listening, each listener on its own thread.
+        """
+        if self.port is not None:
+            server = ThreadingHTTPServer((self.HOST, self.port), _HttpTriggerHandler)
+            server.sync_daemon = self.daemon
+            self.port = server.server_address[1]
+            self._serve(server)
+            logger.info(f"Listening for triggers on http://{self.HOST}:{self.port}.")
+        if self.socket_path is not None:
+            self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+            # Left behind if the last daemon was killed.
+            self.socket_path.unlink(missing_ok=True)
+            server = socketserver.ThreadingUnixStreamServer(
+                str(self.socket_path), _SocketTriggerHandler
+            )
+            server.sync_daemon = self.daemon
+            os.chmod(self.socket_path, 0o600)
+            self._serve(server)
+            logger.info(f"Listening for triggers on {self.socket_path}.")
+
+    def close(self) -> None:
+        """
+        Stop listening and remove the socket file.
+        """
+        for server in self._servers:
+            server.shutdown()
+            server.server_close()
+        self._servers = []
+        if self.socket_path is not None:
+            self.socket_path.unlink(missing_ok=True)
+
+    def _serve(self, server: socketserver.BaseServer) -> None:
+        server.daemon_threads = True
+        threading.Thread(
+            target=server.serve_forever, name="rts-trigger", daemon=True
+        ).start()
+        self._servers.append(server)
+
+
+class _HttpTriggerHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        if self.path == "/sync":
+            command = "sync"
+        elif self.path.startswith("/raindrops/"):
+            command = self.path.removeprefix("/raindrops/")
+        else:
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            raindrop_id = parse_trigger(command)
+        except ValueError:
+            self._reply(400, {"error": f"Not a raindrop id: {command}"})
+            return
+        self.server.sync_daemon.trigger(raindrop_id)
+        self._reply(202, {"queued": "sync" if raindrop_id is None else raindrop_id})
+
+    def do_GET(self) -> None:
+        if self.path != "/status":
+            self._reply(404, {"error": f"Unknown path {self.path}"})
+            return
+        daemon = self.server.sync_daemon
+        self._reply(200, {**daemon.stats.as_dict(), "triggers": daemon.triggers})
+
+    def _reply(self, status: int, body: dict[str, Any]) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug(f"Trigger request: {format % args}")
+
+
+class _SocketTriggerHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        for line in self.rfile:
+            command = line.decode(errors="replace").strip()
+            if not command:
+                continue
+            try:
+                self.server.sync_daemon.trigger(parse_trigger(command))
+            except ValueError:
+                self.wfile.write(f"error: unknown command {command}\n".encode())
+            else:
+                self.wfile.write(b"ok\n")
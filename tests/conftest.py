@@ -4,13 +4,18 @@ from unittest.mock import Mock
 import shutil
 
 import pytest
-from requests import HTTPError
 
 from raindrop_todoist_syncer.config import UserConfig, SystemConfig, SecretsConfig
 from raindrop_todoist_syncer.env_manage import EnvironmentVariablesFileManager
 from raindrop_todoist_syncer.rd_credentials import RaindropCredentialsManager
 from raindrop_todoist_syncer.rd_token import RaindropAccessTokenRefresher
 from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.transport import (
+    FakeTransport,
+    HttpClient,
+    HttpResponse,
+    set_default_http_client,
+)
 
 
 def mock_env_vars_func():
@@ -118,7 +123,26 @@ def raindrop_access_token_refresher_for_file_overwriting(
     return RaindropAccessTokenRefresher(rcm, evfm)
 
 
-# ------------------------------- mock_requests_get-------------------------------------
+# ---------------------------------- fake_http -----------------------------------------
+
+
+@pytest.fixture
+def fake_http():
+    """
+    Send requests made through the default HTTP client to a handler, with no
+    middleware. Returns a function taking the handler and returning the transport.
+    """
+
+    def _install(handler):
+        transport = FakeTransport(handler)
+        set_default_http_client(HttpClient(transport))
+        return transport
+
+    yield _install
+    set_default_http_client(None)
+
+
+# ------------------------------ mock_raindrop_api -------------------------------------
 """
 response_one and response_two created using _dummy_collections/dummy_twenty_six in
 raindrop.
@@ -140,42 +164,23 @@ def response_two_data():
 
 
 @pytest.fixture
-def mock_requests_get(monkeypatch, response_one_data, response_two_data):
-    """Mocks requests.get method for two successful responses"""
-
-    def _mocked_requests_get(url, headers=None, params=None):
-        mock_response = Mock()
-        if params == {"perpage": 25, "page": 0, "search": "❤️"}:
-            mock_response.json.return_value = response_one_data
-            mock_response.status_code = 200
-            mock_response.headers = {
-                "x-ratelimit-remaining": 119,
-                "x-ratelimit-limit": 120,
-            }
-        elif params == {"perpage": 25, "page": 1, "search": "❤️"}:
-            mock_response.json.return_value = response_two_data
-            mock_response.status_code = 200
-            mock_response.headers = {
-                "x-ratelimit-remaining": 118,
-                "x-ratelimit-limit": 120,
-            }
-        else:
-            mock_response.status_code = 404
-            mock_response.raise_for_status.side_effect = HTTPError("404 Client Error")
-        return mock_response
-
-    monkeypatch.setattr("requests.get", _mocked_requests_get)
-
-
-@pytest.fixture
-def mock_requests_get_no_status(monkeypatch):
-    """Mocks requests.get method without a status code"""
-
-    def _mocked_requests_get_no_status(url, headers=None, params=None):
-        mock_response = Mock()
-        return mock_response
-
-    monkeypatch.setattr("requests.get", _mocked_requests_get_no_status)
+def mock_raindrop_api(fake_http, response_one_data, response_two_data):
+    """Serves the two pages of favourites through the default HTTP client"""
+
+    def _handler(request):
+        if request.params == {"perpage": 25, "page": 0, "search": "❤️"}:
+            return HttpResponse.from_json(
+                response_one_data,
+                headers={"x-ratelimit-remaining": "119", "x-ratelimit-limit": "120"},
+            )
+        if request.params == {"perpage": 25, "page": 1, "search": "❤️"}:
+            return HttpResponse.from_json(
+                response_two_data,
+                headers={"x-ratelimit-remaining": "118", "x-ratelimit-limit": "120"},
+            )
+        return HttpResponse(404)
+
+    return fake_http(_handler)
 
 
 # ------------------------ mock_requests_response_object--------------------------------
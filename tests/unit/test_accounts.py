@@ -0,0 +1,122 @@
+import threading
+
+import pytest
+
+from raindrop_todoist_syncer.accounts import (
+    AccountPool,
+    load_accounts,
+    shared_transport,
+)
+from raindrop_todoist_syncer.daemon import CycleStats
+
+
+class FakeDaemon:
+    """
+    Stands in for an account's `SyncDaemon`. Each cycle calls `work` and records the
+    given duration.
+    """
+
+    def __init__(self, seconds=1.0, work=None):
+        self.seconds = seconds
+        self.work = work or (lambda daemon: None)
+        self.stats = CycleStats()
+
+    def run_cycle(self):
+        self.work(self)
+        self.stats.record(self.seconds)
+        return True
+
+
+@pytest.fixture
+def accounts_dir(tmp_path, mock_env_vars_fixture):
+    accounts_dir = tmp_path / "accounts"
+    env = "\n".join(f"{key}='{value}'" for key, value in mock_env_vars_fixture.items())
+    for name in ("alice", "bob"):
+        (accounts_dir / name).mkdir(parents=True)
+        (accounts_dir / name / ".env").write_text(env)
+    # No .env, so not an account.
+    (accounts_dir / "notes").mkdir()
+    # Missing secrets.
+    (accounts_dir / "carol").mkdir()
+    (accounts_dir / "carol" / ".env").write_text("TODOIST_API_KEY='x'")
+    return accounts_dir
+
+
+def test_load_accounts(accounts_dir):
+    accounts = load_accounts(accounts_dir)
+    assert list(accounts) == ["alice", "bob"]
+    assert accounts["alice"].database_dir == accounts_dir / "alice" / "db"
+    assert accounts["bob"].env_file == accounts_dir / "bob" / ".env"
+
+
+def test_load_accounts_no_dir(tmp_path):
+    assert load_accounts(tmp_path / "accounts") == {}
+
+
+def test_from_dir_shares_transport_only(accounts_dir):
+    pool = AccountPool.from_dir(accounts_dir, sync=lambda *args: 0)
+    alice, bob = pool.daemons["alice"], pool.daemons["bob"]
+    assert alice.http is not bob.http
+    assert alice.http.transport is bob.http.transport
+    assert alice.governor is not bob.governor
+    assert alice.user_config.cache_dir != bob.user_config.cache_dir
+
+
+def test_shared_transport_stores_no_cookies():
+    transport = shared_transport()
+    assert transport.session.cookies._policy.allowed_domains() == []
+
+
+class TestAccountPool:
+    def test_each_account_runs_once(self):
+        daemons = {name: FakeDaemon() for name in "abcde"}
+        stats = AccountPool(daemons, workers=2).run(rounds=1)
+        assert {
+            name: account.cycles for name, account in stats.items()
+        } == dict.fromkeys("abcde", 1)
+
+    def test_least_served_first(self):
+        order = []
+        daemons = {
+            name: FakeDaemon(work=lambda daemon, name=name: order.append(name))
+            for name in "abc"
+        }
+        daemons["a"].stats.record(30.0)
+        daemons["b"].stats.record(10.0)
+        AccountPool(daemons, workers=1).run(rounds=1)
+        assert order == ["c", "b", "a"]
+
+    def test_huge_account_does_not_starve_others(self):
+        released = threading.Event()
+
+        def huge(daemon):
+            assert released.wait(5), "Small account starved"
+
+        def small(daemon):
+            if daemon.stats.cycles == 2:
+                released.set()
+
+        daemons = {"huge": FakeDaemon(60.0, huge), "small": FakeDaemon(1.0, small)}
+        stats = AccountPool(daemons, workers=2, interval=0).run(rounds=3)
+        assert stats["small"].cycles == 3
+        assert stats["huge"].cycles == 3
+
+    def test_account_never_runs_twice_at_once(self):
+        lock = threading.Lock()
+
+        def work(daemon):
+            assert lock.acquire(blocking=False)
+            lock.release()
+
+        daemons = {"a": FakeDaemon(work=work), "b": FakeDaemon()}
+        stats = AccountPool(daemons, workers=4, interval=0).run(rounds=5)
+        assert stats["a"].cycles == 5
+
+    def test_stop(self):
+        daemons = {
+            "a": FakeDaemon(work=lambda daemon: pool.stop()),
+            "b": FakeDaemon(),
+        }
+        pool = AccountPool(daemons, workers=1)
+        stats = pool.run()
+        assert stats["a"].cycles + stats["b"].cycles == 1
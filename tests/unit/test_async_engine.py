@@ -0,0 +1,233 @@
+import asyncio
+from unittest.mock import Mock, patch
+
+import pytest
+from requests import HTTPError
+
+from raindrop_todoist_syncer.async_engine import (
+    AsyncRaindropClient,
+    AsyncSyncEngine,
+    AsyncTodoistClient,
+)
+from raindrop_todoist_syncer.routing import Route
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor, TodoistRateLimitError
+from raindrop_todoist_syncer.transport import (
+    FakeTransport,
+    HttpClient,
+    HttpResponse,
+)
+
+
+def fav(raindrop_id):
+    return {
+        "_id": raindrop_id,
+        "important": True,
+        "created": "2024-01-01",
+        "title": f"Title {raindrop_id}",
+        "note": "",
+        "link": f"https://example.com/{raindrop_id}",
+    }
+
+
+class FakeApis:
+    """
+    Serves favourites, highlights, OAuth and Todoist task writes.
+    """
+
+    def __init__(self, favourite_ids, token="ij910"):
+        self.favourites = [fav(raindrop_id) for raindrop_id in favourite_ids]
+        self.token = token
+        self.oauth_calls = 0
+        self.tasks = []
+        self.comments = []
+
+    def __call__(self, request):
+        if request.host == "raindrop.io":
+            self.oauth_calls += 1
+            self.token = "new-token"
+            return HttpResponse.from_json({"access_token": "new-token"})
+        if request.host == "api.todoist.com":
+            body = request.json
+            if request.url.endswith("/tasks"):
+                self.tasks.append(body)
+                return HttpResponse.from_json({"id": f"task-{len(self.tasks)}", **body})
+            self.comments.append(body)
+            return HttpResponse.from_json({"id": "c1"})
+        if request.headers["Authorization"] != f"Bearer {self.token}":
+            return HttpResponse(401)
+        if request.url.endswith("/highlights"):
+            return HttpResponse.from_json({"items": []})
+        if "collections" in request.url:
+            return HttpResponse.from_json({"items": []})
+        page = request.params["page"]
+        per_page = request.params["perpage"]
+        items = self.favourites[page * per_page : (page + 1) * per_page]
+        return HttpResponse.from_json(
+            {"result": True, "count": len(self.favourites), "items": items}
+        )
+
+
+def run_with_http(handler, coroutine_factory):
+    return asyncio.run(coroutine_factory(HttpClient(FakeTransport(handler))))
+
+
+class TestAsyncRaindropClient:
+    def test_get_all_raindrops(self, mock_user_config):
+        apis = FakeApis(range(100000000, 100000060))
+        raindrops = run_with_http(
+            apis,
+            lambda http: AsyncRaindropClient(
+                mock_user_config, http
+            ).get_all_raindrops(),
+        )
+        assert [rd["_id"] for rd in raindrops] == list(range(100000000, 100000060))
+
+    @patch("raindrop_todoist_syncer.async_engine.EnvironmentVariablesFileManager")
+    def test_stale_token_refreshed_once(self, mock_evfm, mock_user_config):
+        apis = FakeApis([], token="fresh-token-not-yet-issued")
+
+        async def requests(http):
+            client = AsyncRaindropClient(mock_user_config, http)
+            await asyncio.gather(
+                client.request("GET", "collections"),
+                client.request("GET", "highlights"),
+            )
+
+        run_with_http(apis, requests)
+
+        assert apis.oauth_calls == 1
+        mock_evfm.return_value.write_new_access_token.assert_called_once_with(
+            "new-token"
+        )
+        assert mock_user_config.raindrop_access_token == "new-token"
+
+    def test_client_error_raised(self, mock_user_config):
+        def not_found(request):
+            return HttpResponse(404)
+
+        with pytest.raises(HTTPError):
+            run_with_http(
+                not_found,
+                lambda http: AsyncRaindropClient(mock_user_config, http).request(
+                    "GET", "collections"
+                ),
+            )
+
+
+class TestAsyncTodoistClient:
+    def test_429_retried(self, mock_user_config):
+        responses = iter(
+            [
+                HttpResponse(429, headers={"Retry-After": "0"}),
+                HttpResponse.from_json({"id": "t1"}),
+            ]
+        )
+        governor = TodoistRateGovernor()
+        task = run_with_http(
+            lambda request: next(responses),
+            lambda http: AsyncTodoistClient(mock_user_config, http, governor).add_task(
+                content="x"
+            ),
+        )
+        assert task == {"id": "t1"}
+        assert governor.throttled_responses == 1
+        assert governor.remaining_budget == governor.request_limit - 2
+
+    def test_gives_up_after_max_retries(self, mock_user_config):
+        governor = TodoistRateGovernor(max_retries=1)
+        with pytest.raises(TodoistRateLimitError):
+            run_with_http(
+                lambda request: HttpResponse(429, headers={"Retry-After": "0"}),
+                lambda http: AsyncTodoistClient(
+                    mock_user_config, http, governor
+                ).add_task(content="x"),
+            )
+
+
+@pytest.fixture
+def todoist_indexes():
+    with (
+        patch("raindrop_todoist_syncer.async_engine.TodoistTaskIndex") as index,
+        patch("raindrop_todoist_syncer.async_engine.ResolutionCache"),
+        patch("raindrop_todoist_syncer.async_engine.TaskRouter") as router,
+        patch(
+            "raindrop_todoist_syncer.async_engine.load_routing_rules",
+            Mock(return_value={}),
+        ),
+    ):
+        loaded_index = index.return_value.load.return_value
+        loaded_index.contains.side_effect = lambda rd: rd.id == 100000001
+        loaded_index.task_id_for.return_value = "existing"
+        router.return_value.route.return_value = Route("p1", labels=("Raindrop",))
+        yield index
+
+
+class TestAsyncSyncEngine:
+    @pytest.fixture
+    def mock_db_manager(self):
+        db_manager = Mock()
+        db_manager.get_latest_database.return_value = {
+            "Processed Raindrops": [{"id": 100000000}]
+        }
+        return db_manager
+
+    def test_run(self, todoist_indexes, mock_user_config, mock_db_manager):
+        apis = FakeApis(range(100000000, 100000030))
+        engine = AsyncSyncEngine(
+            mock_user_config,
+            Mock(),
+            mock_db_manager,
+            transport=FakeTransport(apis),
+        )
+        favourites = engine.run()
+
+        assert len(favourites) == 30
+        assert len(engine.created) == 28
+        assert [rd.task_id for rd in engine.already_tasked] == ["existing"]
+        assert {task["project_id"] for task in apis.tasks} == {"p1"}
+        assert len(apis.comments) == 28
+        stored = [
+            rd
+            for call in mock_db_manager.update_database.call_args_list
+            for rd in call.args[0]
+        ]
+        assert sorted(rd.id for rd in stored) == list(range(100000001, 100000030))
+        assert all(rd.task_id for rd in stored)
+        todoist_indexes.return_value.load.return_value.save.assert_called_once()
+        assert "total_seconds" in engine.report()
+
+    def test_nothing_new_skips_todoist(
+        self, todoist_indexes, mock_user_config, mock_db_manager
+    ):
+        apis = FakeApis([100000000])
+        AsyncSyncEngine(
+            mock_user_config,
+            Mock(),
+            mock_db_manager,
+            transport=FakeTransport(apis),
+        ).run()
+
+        todoist_indexes.assert_not_called()
+        assert apis.tasks == []
+        mock_db_manager.update_database.assert_not_called()
+
+    def test_failed_task_not_stored(
+        self, todoist_indexes, mock_user_config, mock_db_manager
+    ):
+        apis = FakeApis([100000000, 100000002])
+
+        def todoist_down(request):
+            if request.host == "api.todoist.com":
+                return HttpResponse(400)
+            return apis(request)
+
+        engine = AsyncSyncEngine(
+            mock_user_config,
+            Mock(),
+            mock_db_manager,
+            transport=FakeTransport(todoist_down),
+        )
+        engine.run()
+
+        assert engine.created == []
+        mock_db_manager.update_database.assert_not_called()
@@ -24,6 +24,16 @@ def test_system_config_init(attr: str, expected_value: Path):
     assert getattr(mock_system_config, attr) == expected_value
 
 
+def test_system_config_init_config_dir():
+    config_dir = Path("mock_user_dir/.config/rts/accounts/alice")
+    mock_system_config = SystemConfig(Path("mock_user_dir"), config_dir)
+    assert mock_system_config.env_file == config_dir / ".env"
+    assert mock_system_config.database_dir == config_dir / "db"
+    assert mock_system_config.launch_agents_dir == Path(
+        "mock_user_dir/Library/LaunchAgents"
+    )
+
+
 @pytest.mark.parametrize(
     "attr, expected_value", [(k.lower(), v) for k, v in mock_env_vars_func().items()]
 )
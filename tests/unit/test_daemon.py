@@ -0,0 +1,211 @@
+import os
+import signal
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from raindrop_todoist_syncer.daemon import CycleStats, SyncDaemon
+from raindrop_todoist_syncer.transport import (
+    CacheMiddleware,
+    FakeTransport,
+    HttpClient,
+    HttpRequest,
+    HttpResponse,
+)
+
+
+def http_error(status_code, url):
+    response = HttpResponse(status_code, request=HttpRequest("GET", url))
+    return requests.HTTPError(response=response)
+
+
+@pytest.fixture
+def http():
+    return HttpClient(FakeTransport(lambda request: HttpResponse(200)))
+
+
+@pytest.fixture(autouse=True)
+def mock_clients():
+    with (
+        patch("raindrop_todoist_syncer.daemon.RaindropClient") as raindrop_client,
+        patch("raindrop_todoist_syncer.daemon.DatabaseManager") as database_manager,
+    ):
+        yield raindrop_client, database_manager
+
+
+@pytest.fixture
+def restore_signals():
+    handlers = {
+        signum: signal.getsignal(signum)
+        for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)
+    }
+    yield
+    for signum, handler in handlers.items():
+        signal.signal(signum, handler)
+
+
+class TestSyncDaemon:
+    def test_state_kept_between_cycles(self, mock_user_config, http, mock_clients):
+        sync = Mock()
+        daemon = SyncDaemon(mock_user_config, sync, interval=0, max_cycles=3, http=http)
+        stats = daemon.serve()
+
+        assert stats.cycles == 3
+        assert stats.failures == 0
+        raindrop_client, database_manager = mock_clients
+        raindrop_client.assert_called_once_with(mock_user_config, http)
+        database_manager.assert_called_once_with(mock_user_config)
+        assert sync.call_count == 3
+        assert len({call.args for call in sync.call_args_list}) == 1
+        assert sync.call_args.args[3] is daemon.governor
+
+    def test_failed_cycle_does_not_stop_daemon(self, mock_user_config, http):
+        sync = Mock(side_effect=[ValueError("Boom"), None])
+        daemon = SyncDaemon(mock_user_config, sync, interval=0, max_cycles=2, http=http)
+        stats = daemon.serve()
+        assert (stats.cycles, stats.failures) == (2, 1)
+
+    def test_stale_raindrop_token_retried(self, mock_user_config, http, mock_clients):
+        error = http_error(401, "https://api.raindrop.io/rest/v1/raindrops/0/")
+        sync = Mock(side_effect=[error, None])
+        daemon = SyncDaemon(mock_user_config, sync, http=http)
+
+        assert daemon.run_cycle()
+        assert sync.call_count == 2
+        assert mock_clients[0].call_count == 2
+
+    def test_other_401_not_retried(self, mock_user_config, http):
+        error = http_error(401, "https://api.todoist.com/api/v1/sync")
+        sync = Mock(side_effect=[error, None])
+        daemon = SyncDaemon(mock_user_config, sync, http=http)
+
+        assert not daemon.run_cycle()
+        assert sync.call_count == 1
+
+    def test_cache_cleared_each_cycle(self, mock_user_config):
+        cache = CacheMiddleware()
+        http = HttpClient(FakeTransport(lambda request: HttpResponse(200)), [cache])
+        http.get("https://api.raindrop.io/rest/v1/raindrops/0/", cache_ttl=60)
+        daemon = SyncDaemon(mock_user_config, Mock(), http=http)
+        daemon.run_cycle()
+        http.get("https://api.raindrop.io/rest/v1/raindrops/0/", cache_ttl=60)
+        assert cache.hits == 0
+
+    def test_sigterm_finishes_cycle_then_stops(
+        self, mock_user_config, http, restore_signals
+    ):
+        finished = []
+
+        def sync(*args):
+            os.kill(os.getpid(), signal.SIGTERM)
+            finished.append(True)
+
+        daemon = SyncDaemon(mock_user_config, sync, interval=3600, http=http)
+        daemon.install_signal_handlers()
+        stats = daemon.serve()
+
+        assert finished == [True]
+        assert (stats.cycles, stats.failures) == (1, 0)
+        # A second signal is no longer caught.
+        assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+    def test_schedule_sets_wait(self, mock_user_config, http):
+        schedule = Mock()
+        schedule.record.return_value = 0
+        sync = Mock(side_effect=[3, ValueError("Boom"), 0])
+        daemon = SyncDaemon(
+            mock_user_config, sync, schedule=schedule, max_cycles=3, http=http
+        )
+        daemon.serve()
+        # A failed cycle counts as quiet.
+        assert [call.args for call in schedule.record.call_args_list] == [
+            (True,),
+            (False,),
+        ]
+
+    @staticmethod
+    def _triggering_daemon(mock_user_config, http, raindrop_ids, push=None):
+        """
+        A daemon whose first cycle sends a trigger for each of `raindrop_ids`.
+        """
+
+        def sync(*args):
+            if sync.call_count == 1:
+                for raindrop_id in raindrop_ids:
+                    daemon.trigger(raindrop_id)
+            return 0
+
+        sync = Mock(side_effect=sync)
+        daemon = SyncDaemon(
+            mock_user_config,
+            sync,
+            interval=3600,
+            push=push,
+            coalesce=0,
+            max_cycles=2,
+            http=http,
+        )
+        return daemon, sync
+
+    def test_triggers_coalesced_into_one_cycle(self, mock_user_config, http):
+        daemon, sync = self._triggering_daemon(mock_user_config, http, [None] * 3)
+        daemon.serve()
+        assert sync.call_count == 2
+        assert daemon.triggers == 3
+        assert not daemon._wake.is_set()
+
+    def test_pushed_raindrops_synced_alone(self, mock_user_config, http):
+        push = Mock(return_value=1)
+        daemon, sync = self._triggering_daemon(mock_user_config, http, [1, 2], push)
+        daemon.serve()
+        sync.assert_called_once()
+        assert push.call_args.args[4] == {1, 2}
+        assert daemon.last_changes == 1
+
+    def test_full_sync_trigger_absorbs_pushes(self, mock_user_config, http):
+        push = Mock()
+        daemon, sync = self._triggering_daemon(mock_user_config, http, [1, None], push)
+        daemon.serve()
+        assert sync.call_count == 2
+        push.assert_not_called()
+
+    def test_push_without_push_func_runs_full_sync(self, mock_user_config, http):
+        daemon, sync = self._triggering_daemon(mock_user_config, http, [1])
+        daemon.serve()
+        assert sync.call_count == 2
+
+    @patch("raindrop_todoist_syncer.daemon.UserConfig.from_env_file")
+    def test_sighup_reloads_and_runs_at_once(
+        self, mock_from_env_file, mock_user_config, http, mock_clients, restore_signals
+    ):
+        reloaded = Mock()
+        mock_from_env_file.return_value = reloaded
+        sync = Mock(
+            side_effect=lambda *args: (
+                os.kill(os.getpid(), signal.SIGHUP) if sync.call_count == 1 else None
+            )
+        )
+        daemon = SyncDaemon(
+            mock_user_config, sync, interval=3600, max_cycles=2, http=http
+        )
+        daemon.install_signal_handlers()
+        daemon.serve()
+
+        mock_from_env_file.assert_called_once_with(mock_user_config.system_config)
+        assert sync.call_args.args[0] is reloaded
+        assert mock_clients[0].call_count == 2
+
+
+class TestCycleStats:
+    def test_record(self):
+        stats = CycleStats()
+        stats.record(1.0)
+        stats.record(3.0, failed=True)
+        assert stats.as_dict() == {
+            "cycles": 2,
+            "failures": 1,
+            "last_seconds": 3.0,
+            "mean_seconds": 2.0,
+            "max_seconds": 3.0,
+        }
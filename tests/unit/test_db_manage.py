@@ -0,0 +1,59 @@
+from unittest.mock import patch
+
+from raindrop_todoist_syncer.db_manage import DatabaseManager
+
+
+def test_update_database_appends(mock_user_config, raindrop_object):
+    dbm = DatabaseManager(mock_user_config)
+    dbm.update_database([raindrop_object])
+    rows = dbm.get_latest_database()["Processed Raindrops"]
+    assert [row["id"] for row in rows] == [628161672]
+
+
+def test_replace_rows(mock_user_config, raindrop_object):
+    dbm = DatabaseManager(mock_user_config)
+    dbm.update_database([raindrop_object])
+    raindrop_object.title = "New title"
+    raindrop_object.task_id = "t1"
+    dbm.replace_rows([raindrop_object])
+    rows = dbm.get_latest_database()["Processed Raindrops"]
+    assert len(rows) == 1
+    assert rows[0]["title"] == "New title"
+    assert rows[0]["task_id"] == "t1"
+
+
+def test_replace_rows_ignores_untracked(mock_user_config, raindrop_object):
+    dbm = DatabaseManager(mock_user_config)
+    dbm.replace_rows([raindrop_object])
+    assert dbm.get_latest_database()["Processed Raindrops"] == []
+
+
+def test_remove_rows(mock_user_config, raindrop_object):
+    dbm = DatabaseManager(mock_user_config)
+    dbm.update_database([raindrop_object])
+    dbm.remove_rows({628161672, 1})
+    assert dbm.get_latest_database()["Processed Raindrops"] == []
+
+
+def test_loaded_database_reused(mock_user_config, raindrop_object):
+    dbm = DatabaseManager(mock_user_config)
+    dbm.update_database([raindrop_object])
+    with patch("raindrop_todoist_syncer.db_manage.json.loads") as mock_loads:
+        rows = dbm.get_latest_database()["Processed Raindrops"]
+    mock_loads.assert_not_called()
+    assert [row["id"] for row in rows] == [628161672]
+
+
+def test_returned_lists_are_copies(mock_user_config, raindrop_object):
+    dbm = DatabaseManager(mock_user_config)
+    dbm.update_database([raindrop_object])
+    dbm.get_latest_database()["Processed Raindrops"].clear()
+    assert len(dbm.get_latest_database()["Processed Raindrops"]) == 1
+
+
+def test_database_changed_elsewhere_reloaded(mock_user_config, raindrop_object):
+    dbm = DatabaseManager(mock_user_config)
+    dbm.get_latest_database()
+    DatabaseManager(mock_user_config).update_database([raindrop_object])
+    rows = dbm.get_latest_database()["Processed Raindrops"]
+    assert [row["id"] for row in rows] == [628161672]
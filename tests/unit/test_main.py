@@ -6,50 +6,331 @@ import pytest
 
 from raindrop_todoist_syncer.config import SystemConfig, UserConfig
 from raindrop_todoist_syncer.main import (
+    ENGINES,
     main,
     driver,
     parse_args,
+    push_raindrops,
+    sync_accounts,
     fetch_raindrops_and_create_tasks,
+    sync_completions,
 )
 from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.rd_process import RaindropChange
+from raindrop_todoist_syncer.schedule import AdaptiveSchedule
+
+
+@pytest.fixture
+def mock_sync_pipeline():
+    """
+    Replace the default engine.
+    """
+    mock_engine = MagicMock()
+    with patch.dict(ENGINES, pipeline=mock_engine):
+        yield mock_engine
 
 
-@patch("raindrop_todoist_syncer.main.TodoistTaskCreator.create_task")
 @patch(
-    "raindrop_todoist_syncer.main.RaindropsProcessor.newly_favourited_raindrops_extractor"
+    "raindrop_todoist_syncer.main.RaindropsProcessor.changed_raindrops_extractor",
+    Mock(return_value=[]),
 )
+@patch(
+    "raindrop_todoist_syncer.main.RaindropsProcessor.removed_favourites_extractor",
+    Mock(return_value=[]),
+)
+@patch("raindrop_todoist_syncer.main.TodoistTaskUpdater")
+@patch("raindrop_todoist_syncer.main.TodoistTaskCloser")
 def test_fetch_raindrops_and_create_tasks(
-    mock_rd_processor_rd_extractor: MagicMock,
-    mock_todoist_task_creator_create_task: MagicMock,
+    mock_task_closer: MagicMock,
+    mock_task_updater: MagicMock,
+    mock_sync_pipeline: MagicMock,
+):
+    mock_user_config, mock_rd_client, mock_db_manager = Mock(), Mock(), Mock()
+    mock_sync_pipeline.return_value.run.return_value = []
+    mock_sync_pipeline.return_value.report.return_value = ""
+
+    fetch_raindrops_and_create_tasks(mock_user_config, mock_rd_client, mock_db_manager)
+
+    assert mock_sync_pipeline.call_args.args[:3] == (
+        mock_user_config,
+        mock_rd_client,
+        mock_db_manager,
+    )
+    mock_sync_pipeline.return_value.run.assert_called_once()
+    mock_sync_pipeline.return_value.highlight_index.assert_not_called()
+    mock_task_updater.assert_not_called()
+    mock_task_closer.assert_not_called()
+
+
+@patch(
+    "raindrop_todoist_syncer.main.RaindropsProcessor.removed_favourites_extractor",
+    Mock(return_value=[]),
+)
+@patch("raindrop_todoist_syncer.main.TodoistTaskUpdater")
+@patch("raindrop_todoist_syncer.main.RaindropsProcessor.changed_raindrops_extractor")
+def test_fetch_raindrops_and_create_tasks_changed_rows_replaced(
+    mock_changed_extractor: MagicMock,
+    mock_task_updater: MagicMock,
+    mock_sync_pipeline: MagicMock,
     raindrop_object: Raindrop,
 ):
-    mock_user_config = Mock()
-    mock_rd_client = Mock()
     mock_db_manager = Mock()
-    mock_rd_processor_rd_extractor.return_value = [raindrop_object]
+    changes = [RaindropChange(raindrop_object, {})]
+    mock_changed_extractor.return_value = changes
+    mock_task_updater.return_value.update_tasks.return_value = [raindrop_object]
 
-    fetch_raindrops_and_create_tasks(mock_user_config, mock_rd_client, mock_db_manager)
+    fetch_raindrops_and_create_tasks(Mock(), Mock(), mock_db_manager)
+
+    mock_sync_pipeline.return_value.highlight_index.return_value.attach.assert_called_once_with(
+        [raindrop_object]
+    )
+    mock_task_updater.return_value.update_tasks.assert_called_once_with(changes)
+    mock_db_manager.replace_rows.assert_called_once_with([raindrop_object])
+    mock_db_manager.update_database.assert_not_called()
+
+
+@patch("raindrop_todoist_syncer.main.TodoistTaskIndex")
+@patch("raindrop_todoist_syncer.main.TodoistTaskCloser")
+@patch("raindrop_todoist_syncer.main.RaindropsProcessor.removed_favourites_extractor")
+@patch(
+    "raindrop_todoist_syncer.main.RaindropsProcessor.changed_raindrops_extractor",
+    Mock(return_value=[]),
+)
+@pytest.mark.usefixtures("mock_sync_pipeline")
+def test_fetch_raindrops_and_create_tasks_removed_tasks_closed(
+    mock_removed_extractor: MagicMock,
+    mock_task_closer: MagicMock,
+    mock_task_index: MagicMock,
+):
+    mock_db_manager = Mock()
+    mock_removed_extractor.return_value = [
+        {"id": 1, "task_id": "t1", "link": "https://a.com"},
+        {"id": 2, "task_id": "t2", "link": "https://b.com"},
+    ]
+    mock_task_closer.return_value.close_tasks.return_value = [1]
+
+    fetch_raindrops_and_create_tasks(Mock(), Mock(), mock_db_manager)
+
+    mock_task_closer.return_value.close_tasks.assert_called_once_with(
+        {1: "t1", 2: "t2"}
+    )
+    mock_db_manager.remove_rows.assert_called_once_with({1})
+    mock_task_index.assert_not_called()
+
+
+@patch("raindrop_todoist_syncer.main.TodoistTaskIndex")
+@patch("raindrop_todoist_syncer.main.TodoistTaskCloser")
+@patch("raindrop_todoist_syncer.main.RaindropsProcessor.removed_favourites_extractor")
+@patch(
+    "raindrop_todoist_syncer.main.RaindropsProcessor.changed_raindrops_extractor",
+    Mock(return_value=[]),
+)
+@pytest.mark.usefixtures("mock_sync_pipeline")
+def test_fetch_raindrops_and_create_tasks_removed_legacy_rows_use_index(
+    mock_removed_extractor: MagicMock,
+    mock_task_closer: MagicMock,
+    mock_task_index: MagicMock,
+):
+    mock_db_manager = Mock()
+    mock_removed_extractor.return_value = [
+        {"id": 1, "link": "https://a.com/"},
+        {"id": 2, "link": "https://b.com"},
+    ]
+    loaded_index = mock_task_index.return_value.load.return_value
+    loaded_index.by_raindrop_id = {}
+    loaded_index.by_link = {"https://a.com": "t1"}
+    mock_task_closer.return_value.close_tasks.return_value = [1]
+
+    fetch_raindrops_and_create_tasks(Mock(), Mock(), mock_db_manager)
 
-    mock_rd_client.get_all_raindrops.assert_called_once()
-    mock_rd_processor_rd_extractor.assert_called_once()
-    mock_todoist_task_creator_create_task.assert_called_once()
-    mock_db_manager.update_database.assert_called_once()
+    mock_task_closer.return_value.close_tasks.assert_called_once_with({1: "t1"})
+    mock_db_manager.remove_rows.assert_called_once_with({1, 2})
 
 
 # Patch as __init_ calls API to refresh token. DBManager not mocked as passed to a Mock.
+@patch("raindrop_todoist_syncer.main.sync_completions")
 @patch("raindrop_todoist_syncer.main.RaindropClient")
 @patch("raindrop_todoist_syncer.main.fetch_raindrops_and_create_tasks")
 def test_driver_command_run(
     mock_fetch_raindrops_and_create_tasks: MagicMock,
     _mock_raindrop_client: MagicMock,
+    mock_sync_completions: MagicMock,
     mock_user_config: UserConfig,
 ):
     # No command, i.e. the default command creates the same Namespace object.
-    mock_args = argparse.Namespace(command="run")
+    mock_args = argparse.Namespace(
+        command="run",
+        on_complete="unfavourite",
+        engine="pipeline",
+        adaptive=False,
+    )
     driver(mock_args, mock_user_config)
+    mock_sync_completions.assert_called_once()
     mock_fetch_raindrops_and_create_tasks.assert_called_once()
 
 
+@patch("raindrop_todoist_syncer.main.sync_completions")
+@patch("raindrop_todoist_syncer.main.RaindropClient")
+@patch("raindrop_todoist_syncer.main.fetch_raindrops_and_create_tasks")
+def test_driver_command_run_completion_sync_off(
+    mock_fetch_raindrops_and_create_tasks: MagicMock,
+    _mock_raindrop_client: MagicMock,
+    mock_sync_completions: MagicMock,
+    mock_user_config: UserConfig,
+):
+    mock_args = argparse.Namespace(
+        command="run", on_complete="none", engine="async", adaptive=False
+    )
+    driver(mock_args, mock_user_config)
+    mock_sync_completions.assert_not_called()
+    assert mock_fetch_raindrops_and_create_tasks.call_args.args[4] == "async"
+
+
+@patch("raindrop_todoist_syncer.main.sync_once")
+@patch("raindrop_todoist_syncer.main.RaindropClient")
+def test_driver_command_run_adaptive_records_changes(
+    _mock_raindrop_client: MagicMock,
+    mock_sync_once: MagicMock,
+    mock_user_config: UserConfig,
+):
+    mock_sync_once.return_value = 2
+    mock_args = argparse.Namespace(
+        command="run", on_complete="none", engine="pipeline", adaptive=True
+    )
+    driver(mock_args, mock_user_config)
+    schedule = AdaptiveSchedule(mock_user_config).load()
+    assert schedule.interval == AdaptiveSchedule.MIN_INTERVAL
+    assert not schedule.due()
+
+    # Not due yet, so the next run is skipped.
+    driver(mock_args, mock_user_config)
+    mock_sync_once.assert_called_once()
+
+
+@patch("raindrop_todoist_syncer.main.SyncDaemon")
+def test_driver_command_serve(mock_daemon: MagicMock, mock_user_config: UserConfig):
+    mock_args = argparse.Namespace(
+        command="serve",
+        on_complete="tag",
+        engine="async",
+        interval=60.0,
+        port=None,
+        socket=False,
+        adaptive=False,
+    )
+    driver(mock_args, mock_user_config)
+    sync = mock_daemon.call_args.args[1]
+    assert sync.keywords == {"on_complete": "tag", "engine": "async"}
+    assert mock_daemon.call_args.kwargs["interval"] == 60.0
+    mock_daemon.return_value.install_signal_handlers.assert_called_once()
+    mock_daemon.return_value.serve.assert_called_once()
+    assert mock_daemon.call_args.kwargs["push"] is push_raindrops
+
+
+@patch("raindrop_todoist_syncer.main.SyncPipeline")
+def test_push_raindrops_creates_new_favourites_only(
+    mock_sync_pipeline: MagicMock,
+    mock_user_config: UserConfig,
+    rd_extracted_single_raindrop_dict: dict,
+):
+    raindrops = {
+        1: {**rd_extracted_single_raindrop_dict, "_id": 1, "important": True},
+        2: {**rd_extracted_single_raindrop_dict, "_id": 2, "important": False},
+        3: {**rd_extracted_single_raindrop_dict, "_id": 3, "important": True},
+    }
+    rc = Mock()
+    rc.get_raindrop.side_effect = raindrops.get
+    dbm = Mock()
+    dbm.get_latest_database.return_value = {"Processed Raindrops": [{"id": 3}]}
+    mock_sync_pipeline.return_value.created = [Mock()]
+    mock_sync_pipeline.return_value.already_tasked = []
+
+    changes = push_raindrops(mock_user_config, rc, dbm, Mock(), {1, 2, 3, 4})
+
+    assert changes == 1
+    assert [call.args for call in rc.get_raindrop.call_args_list] == [(1,), (2,), (4,)]
+    created = mock_sync_pipeline.return_value.create.call_args.args[0]
+    assert [raindrop.id for raindrop in created] == [1]
+
+
+@patch("raindrop_todoist_syncer.main.SyncPipeline")
+def test_push_raindrops_nothing_new(
+    mock_sync_pipeline: MagicMock, mock_user_config: UserConfig
+):
+    rc = Mock()
+    dbm = Mock()
+    dbm.get_latest_database.return_value = {"Processed Raindrops": [{"id": 3}]}
+    assert push_raindrops(mock_user_config, rc, dbm, Mock(), {3}) == 0
+    rc.get_raindrop.assert_not_called()
+    mock_sync_pipeline.assert_not_called()
+
+
+class TestSyncCompletions:
+    @pytest.fixture
+    def mock_db_manager(self):
+        db_manager = Mock()
+        db_manager.get_latest_database.return_value = {
+            "Processed Raindrops": [
+                {"id": 1, "task_id": "t1"},
+                {"id": 2, "task_id": "t2"},
+                {"id": 3},
+            ]
+        }
+        return db_manager
+
+    @patch("raindrop_todoist_syncer.main.TodoistCompletionReader")
+    def test_unfavourite(self, mock_reader, mock_db_manager):
+        mock_reader.return_value.completed_task_ids.return_value = {"t2", "t9"}
+        mock_rd_client = Mock()
+        sync_completions(Mock(), mock_rd_client, mock_db_manager, "unfavourite")
+        mock_rd_client.update_raindrops.assert_called_once_with(
+            [2], {"important": False}
+        )
+        mock_db_manager.remove_rows.assert_called_once_with({2})
+        mock_reader.return_value.commit.assert_called_once()
+
+    @patch("raindrop_todoist_syncer.main.TodoistCompletionReader")
+    def test_tag_keeps_rows(self, mock_reader, mock_db_manager):
+        mock_reader.return_value.completed_task_ids.return_value = {"t1"}
+        mock_rd_client = Mock()
+        sync_completions(Mock(), mock_rd_client, mock_db_manager, "tag")
+        mock_rd_client.update_raindrops.assert_called_once_with([1], {"tags": ["done"]})
+        mock_db_manager.remove_rows.assert_not_called()
+
+    @patch("raindrop_todoist_syncer.main.TodoistCompletionReader")
+    def test_nothing_completed(self, mock_reader, mock_db_manager):
+        mock_reader.return_value.completed_task_ids.return_value = set()
+        mock_rd_client = Mock()
+        sync_completions(Mock(), mock_rd_client, mock_db_manager, "unfavourite")
+        mock_db_manager.get_latest_database.assert_not_called()
+        mock_rd_client.update_raindrops.assert_not_called()
+        mock_reader.return_value.commit.assert_called_once()
+
+    @patch("raindrop_todoist_syncer.main.TodoistCompletionReader")
+    def test_failed_update_not_committed(self, mock_reader, mock_db_manager):
+        mock_reader.return_value.completed_task_ids.return_value = {"t1"}
+        mock_rd_client = Mock()
+        mock_rd_client.update_raindrops.side_effect = Exception("Boom")
+        with pytest.raises(Exception):
+            sync_completions(Mock(), mock_rd_client, mock_db_manager, "unfavourite")
+        mock_reader.return_value.commit.assert_not_called()
+
+
+@pytest.mark.parametrize("apply", [True, False])
+@patch("raindrop_todoist_syncer.main.DatabaseManager", Mock())
+@patch("raindrop_todoist_syncer.main.RaindropClient", Mock())
+@patch("raindrop_todoist_syncer.main.Reconciler")
+def test_driver_command_reconcile(
+    mock_reconciler: MagicMock, apply: bool, mock_user_config: UserConfig, capsys
+):
+    plan = mock_reconciler.return_value.plan.return_value
+    plan.is_empty.return_value = False
+    plan.summary.return_value = "Tasks to create: 1"
+    driver(argparse.Namespace(command="reconcile", apply=apply), mock_user_config)
+    assert "Tasks to create: 1" in capsys.readouterr().out
+    assert mock_reconciler.return_value.apply.called is apply
+
+
 @patch(
     "raindrop_todoist_syncer.main.AutomationManager."
     "activate_automatic_rd_fetch_and_task_creation"
@@ -78,10 +359,123 @@ def test_driver_command_run_automate_disable(
 @pytest.mark.parametrize(
     "command_ran_in_cli, expected",
     [
-        ([], argparse.Namespace(command="run")),  # Test default argument is 'run'
-        (["run"], argparse.Namespace(command="run")),
-        (["automate_enable"], argparse.Namespace(command="automate_enable")),
-        (["automate_disable"], argparse.Namespace(command="automate_disable")),
+        # Test default argument is 'run'
+        (
+            [],
+            argparse.Namespace(
+                command="run",
+                on_complete="unfavourite",
+                engine="pipeline",
+                adaptive=False,
+            ),
+        ),
+        (
+            ["run"],
+            argparse.Namespace(
+                command="run",
+                on_complete="unfavourite",
+                engine="pipeline",
+                adaptive=False,
+            ),
+        ),
+        (
+            ["run", "--on-complete", "tag"],
+            argparse.Namespace(
+                command="run", on_complete="tag", engine="pipeline", adaptive=False
+            ),
+        ),
+        (
+            ["run", "--engine", "async"],
+            argparse.Namespace(
+                command="run",
+                on_complete="unfavourite",
+                engine="async",
+                adaptive=False,
+            ),
+        ),
+        (
+            ["run", "--adaptive"],
+            argparse.Namespace(
+                command="run",
+                on_complete="unfavourite",
+                engine="pipeline",
+                adaptive=True,
+            ),
+        ),
+        (
+            ["serve", "--interval", "60"],
+            argparse.Namespace(
+                command="serve",
+                on_complete="unfavourite",
+                engine="pipeline",
+                interval=60,
+                port=None,
+                socket=False,
+                adaptive=False,
+            ),
+        ),
+        (
+            ["serve", "--port", "8765", "--socket"],
+            argparse.Namespace(
+                command="serve",
+                on_complete="unfavourite",
+                engine="pipeline",
+                interval=300,
+                port=8765,
+                socket=True,
+                adaptive=False,
+            ),
+        ),
+        (
+            ["accounts", "--workers", "8", "--serve"],
+            argparse.Namespace(
+                command="accounts",
+                on_complete="unfavourite",
+                engine="pipeline",
+                workers=8,
+                serve=True,
+                interval=300,
+                adaptive=False,
+            ),
+        ),
+        (
+            ["reconcile"],
+            argparse.Namespace(
+                command="reconcile",
+                apply=False,
+                on_complete="unfavourite",
+                engine="pipeline",
+                adaptive=False,
+            ),
+        ),
+        (
+            ["reconcile", "--apply"],
+            argparse.Namespace(
+                command="reconcile",
+                apply=True,
+                on_complete="unfavourite",
+                engine="pipeline",
+                adaptive=False,
+            ),
+        ),
+        (
+            ["automate_enable"],
+            argparse.Namespace(
+                command="automate_enable",
+                on_complete="unfavourite",
+                engine="pipeline",
+                adaptive=False,
+            ),
+        ),
+        (
+            ["automate_disable"],
+            argparse.Namespace(
+                command="automate_disable",
+                on_complete="unfavourite",
+                engine="pipeline",
+                adaptive=False,
+            ),
+        ),
     ],
 )
 def test_parse_args(command_ran_in_cli: str | None, expected: argparse.Namespace):
@@ -91,6 +485,21 @@ def test_parse_args(command_ran_in_cli: str | None, expected: argparse.Namespace
     assert actual == expected
 
 
+@patch("raindrop_todoist_syncer.main.AccountPool.from_dir")
+@pytest.mark.parametrize("serve, rounds", [(False, 1), (True, None)])
+def test_sync_accounts(
+    mock_from_dir: MagicMock, serve: bool, rounds: int | None, tmp_path
+):
+    args = argparse.Namespace(
+        on_complete="tag", engine="pipeline", workers=3, interval=60.0, serve=serve
+    )
+    system_config = SystemConfig(tmp_path)
+    sync_accounts(args, system_config)
+    assert mock_from_dir.call_args.args[0] == system_config.accounts_dir
+    assert mock_from_dir.call_args.kwargs == {"workers": 3, "interval": 60.0}
+    mock_from_dir.return_value.run.assert_called_once_with(rounds=rounds)
+
+
 @patch("raindrop_todoist_syncer.main.driver")
 @patch("raindrop_todoist_syncer.main.UserConfig.from_env_file")
 @patch("raindrop_todoist_syncer.main.SystemConfig")
@@ -0,0 +1,144 @@
+import threading
+import time
+
+import pytest
+
+from raindrop_todoist_syncer.pipeline import Pipeline, Stage
+
+
+def collect(into):
+    return lambda item, emit: into.append(item)
+
+
+def test_run_single_worker_keeps_order():
+    out = []
+    pipeline = Pipeline(
+        [Stage("double", lambda x, emit: emit(x * 2)), Stage("collect", collect(out))]
+    )
+    pipeline.run(range(50))
+    assert out == [x * 2 for x in range(50)]
+
+
+def test_run_many_workers_process_every_item():
+    out = []
+    lock = threading.Lock()
+
+    def record(item, emit):
+        with lock:
+            out.append(item)
+
+    pipeline = Pipeline(
+        [
+            Stage("square", lambda x, emit: emit(x * x), workers=4),
+            Stage("collect", record),
+        ]
+    )
+    pipeline.run(range(100))
+    assert sorted(out) == [x * x for x in range(100)]
+    assert pipeline.stats()["square"]["items_in"] == 100
+    assert pipeline.stats()["square"]["items_out"] == 100
+
+
+def test_run_stage_may_emit_many_or_none():
+    out = []
+    pipeline = Pipeline(
+        [
+            Stage("split", lambda xs, emit: [emit(x) for x in xs]),
+            Stage("evens", lambda x, emit: emit(x) if x % 2 == 0 else None),
+            Stage("collect", collect(out)),
+        ]
+    )
+    pipeline.run([[1, 2], [], [3, 4, 5, 6]])
+    assert out == [2, 4, 6]
+
+
+def test_run_batches_queued_items():
+    batches = []
+    source_done = threading.Event()
+
+    def source():
+        yield from range(7)
+        source_done.set()
+
+    pipeline = Pipeline(
+        [
+            Stage(
+                "batch",
+                collect(batches),
+                queue_size=10,
+                batch_size=3,
+                setup=source_done.wait,
+            )
+        ]
+    )
+    pipeline.run(source())
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_run_flush_emits_downstream():
+    out = []
+    seen = []
+
+    def total(emit):
+        emit(sum(seen))
+
+    pipeline = Pipeline(
+        [
+            Stage("sum", lambda x, emit: seen.append(x), flush=total),
+            Stage("collect", collect(out)),
+        ]
+    )
+    pipeline.run([1, 2, 3])
+    assert out == [6]
+
+
+def test_run_backpressure_blocks_upstream():
+    pipeline = Pipeline(
+        [
+            Stage("fast", lambda x, emit: emit(x)),
+            Stage("slow", lambda x, emit: time.sleep(0.01), queue_size=1),
+        ]
+    )
+    pipeline.run(range(10))
+    stats = pipeline.stats()
+    assert stats["fast"]["blocked_seconds"] > 0
+    assert stats["fast"]["busy_seconds"] < stats["fast"]["blocked_seconds"]
+    assert pipeline.report().splitlines()[2].endswith("<- bottleneck")
+
+
+def test_run_error_stops_pipeline_and_is_raised():
+    processed = []
+
+    def fail_on_three(x, emit):
+        if x == 3:
+            raise ValueError("bad item")
+        emit(x)
+
+    pipeline = Pipeline(
+        [
+            Stage("check", fail_on_three, queue_size=1),
+            Stage("collect", collect(processed), queue_size=1),
+        ]
+    )
+    with pytest.raises(ValueError, match="bad item"):
+        pipeline.run(range(1000))
+    assert len(processed) < 1000
+
+
+def test_run_setup_error_is_raised():
+    def setup():
+        raise RuntimeError("no setup")
+
+    pipeline = Pipeline([Stage("stage", lambda x, emit: None, setup=setup)])
+    with pytest.raises(RuntimeError, match="no setup"):
+        pipeline.run(range(100))
+
+
+def test_run_source_error_is_raised():
+    def source():
+        yield 1
+        raise ConnectionError("fetch failed")
+
+    pipeline = Pipeline([Stage("stage", lambda x, emit: None)])
+    with pytest.raises(ConnectionError):
+        pipeline.run(source())
@@ -123,14 +123,19 @@ def test_create_plist_file_content(mock_automation_manager: AutomationManager):
     mock_automation_manager._create_plist_file_content()
     actual = mock_automation_manager.plist_content.split("\n")
     executable = actual[10].strip()
-    stdout_log = actual[20].strip()
-    stderr_log = actual[23].strip()
+    stdout_log = actual[22].strip()
+    stderr_log = actual[25].strip()
 
     assert executable.endswith(".local/bin/rts</string>")
+    assert [line.strip() for line in actual[11:13]] == [
+        "<string>run</string>",
+        "<string>--adaptive</string>",
+    ]
+    assert actual[19].strip() == "<integer>60</integer>"
     assert stdout_log.endswith("/.config/rts/logs/launchd-stdout.log</string>")
     assert stderr_log.endswith("/.config/rts/logs/launchd-stderr.log</string>")
-    assert actual[24] == "</dict>"
-    assert actual[25] == "</plist>"
+    assert actual[26] == "</dict>"
+    assert actual[27] == "</plist>"
 
 
 def test_write_plist_file(
@@ -0,0 +1,98 @@
+from unittest.mock import Mock
+
+import pytest
+
+from raindrop_todoist_syncer.config import UserConfig
+from raindrop_todoist_syncer.rd_highlights import HighlightIndex
+
+
+def highlight(highlight_id, raindrop_id, created, text="text", note=""):
+    return {
+        "_id": highlight_id,
+        "raindropRef": raindrop_id,
+        "text": text,
+        "note": note,
+        "created": created,
+        "color": "yellow",
+    }
+
+
+@pytest.fixture
+def mock_raindrop_client():
+    client = Mock()
+    client.get_highlights.return_value = [
+        highlight("h2", 1, "2024-01-02T00:00:00Z", text="second"),
+        highlight("h1", 1, "2024-01-01T00:00:00Z", text="first"),
+        highlight("h3", 2, "2024-01-01T12:00:00Z"),
+    ]
+    return client
+
+
+@pytest.fixture
+def clock():
+    return Mock(return_value=1_000_000.0)
+
+
+@pytest.fixture
+def highlight_index(mock_user_config: UserConfig, mock_raindrop_client, clock):
+    return HighlightIndex(mock_user_config, mock_raindrop_client, clock=clock)
+
+
+def test_first_load_is_full_fetch(highlight_index, mock_raindrop_client):
+    highlight_index.load()
+    mock_raindrop_client.get_highlights.assert_called_once_with()
+    assert len(highlight_index.highlights) == 3
+
+
+def test_for_raindrop_oldest_first(highlight_index):
+    highlight_index.load()
+    texts = [h["text"] for h in highlight_index.for_raindrop(1)]
+    assert texts == ["first", "second"]
+
+
+def test_for_raindrop_without_highlights(highlight_index):
+    highlight_index.load()
+    assert highlight_index.for_raindrop(99) == []
+
+
+def test_attach(highlight_index, raindrop_object):
+    highlight_index.load()
+    raindrop_object.id = 2
+    highlight_index.attach([raindrop_object])
+    assert len(raindrop_object.highlights) == 1
+
+
+def test_reload_is_incremental(
+    mock_user_config, highlight_index, mock_raindrop_client, clock
+):
+    highlight_index.load()
+    mock_raindrop_client.get_highlights.return_value = [
+        highlight("h4", 2, "2024-01-03T00:00:00Z"),
+        highlight("h2", 1, "2024-01-02T00:00:00Z", text="second"),
+    ]
+    reloaded = HighlightIndex(mock_user_config, mock_raindrop_client, clock=clock)
+    reloaded.load()
+    mock_raindrop_client.get_highlights.assert_called_with("2024-01-02T00:00:00Z")
+    assert len(reloaded.highlights) == 4
+    assert len(reloaded.for_raindrop(2)) == 2
+
+
+def test_stale_cache_full_fetch_drops_deleted(
+    mock_user_config, highlight_index, mock_raindrop_client, clock
+):
+    highlight_index.load()
+    clock.return_value += HighlightIndex.FULL_REFRESH_SECONDS + 1
+    mock_raindrop_client.get_highlights.return_value = [
+        highlight("h3", 2, "2024-01-01T12:00:00Z")
+    ]
+    reloaded = HighlightIndex(mock_user_config, mock_raindrop_client, clock=clock)
+    reloaded.load()
+    mock_raindrop_client.get_highlights.assert_called_with()
+    assert list(reloaded.highlights) == ["h3"]
+
+
+def test_corrupt_cache_ignored(highlight_index, mock_raindrop_client):
+    highlight_index.cache_path.parent.mkdir(parents=True)
+    highlight_index.cache_path.write_text("{not json")
+    highlight_index.load()
+    mock_raindrop_client.get_highlights.assert_called_once_with()
@@ -1,3 +1,8 @@
+import pytest
+
+from raindrop_todoist_syncer.rd_object import content_hash
+
+
 class TestInit:
     """
     Early warning system for my own idiocy.
@@ -21,6 +26,12 @@ class TestInit:
     def test_init_link(self, raindrop_object):
         assert raindrop_object.link == "https://www.python.org/"
 
+    def test_init_collection_id(self, raindrop_object):
+        assert raindrop_object.collection_id == 36697540
+
+    def test_init_tags(self, raindrop_object):
+        assert raindrop_object.tags == []
+
 
 class TestToDict:
     def test_to_dict(self, raindrop_object):
@@ -32,10 +43,31 @@ class TestToDict:
             "title": "Welcome to Python.org",
             "notes": "",
             "link": "https://www.python.org/",
+            "last_update": "2023-08-14T09:36:24.856Z",
+            "content_hash": "15e378dc7ae6a609",
+            "task_id": None,
         }
         assert raindrop_object.to_dict() == expected_result
 
 
+class TestContentHash:
+    def test_content_hash_matches_function(self, raindrop_object):
+        assert raindrop_object.content_hash == content_hash(
+            "Welcome to Python.org", "", "https://www.python.org/"
+        )
+
+    @pytest.mark.parametrize("field", ["title", "notes", "link"])
+    def test_content_hash_changes_with_field(self, raindrop_object, field):
+        before = raindrop_object.content_hash
+        setattr(raindrop_object, field, "changed")
+        assert raindrop_object.content_hash != before
+
+    def test_content_hash_ignores_tags(self, raindrop_object):
+        before = raindrop_object.content_hash
+        raindrop_object.tags = ["new"]
+        assert raindrop_object.content_hash == before
+
+
 class TestInitErrors:
     """
     Test object for handling possible edge case data returned from the API.
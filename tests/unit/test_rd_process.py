@@ -5,7 +5,7 @@ import pytest
 
 from raindrop_todoist_syncer.config import UserConfig
 from raindrop_todoist_syncer.rd_process import RaindropsProcessor
-from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.rd_object import Raindrop, content_hash
 
 
 @pytest.fixture
@@ -267,3 +267,112 @@ class TestConvertToRdObjects:
         rdp = RaindropsProcessor(mock_user_config, fav)
         rd_objects = rdp._convert_to_rd_objects(fav)
         assert rd_objects == []
+
+
+class TestChangedRaindropsExtractor:
+    @staticmethod
+    def _rd(rd_id, title="Title", last_update="2024-01-02"):
+        return {
+            "_id": rd_id,
+            "important": True,
+            "created": "2024-01-01",
+            "lastUpdate": last_update,
+            "title": title,
+            "note": "",
+            "link": "https://example.com",
+        }
+
+    @staticmethod
+    def _row(rd_id, title="Title", last_update="2024-01-01", task_id="t1"):
+        return {
+            "id": rd_id,
+            "title": title,
+            "link": "https://example.com",
+            "last_update": last_update,
+            "content_hash": content_hash(title, "", "https://example.com"),
+            "task_id": task_id,
+        }
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_changed_title_detected(self, MockDatabaseManager, mock_user_config):
+        MockDatabaseManager.return_value.get_latest_database.return_value = {
+            "Processed Raindrops": [self._row(1, title="Old"), self._row(2)]
+        }
+        rdp = RaindropsProcessor(mock_user_config, [self._rd(1), self._rd(2)])
+        changes = rdp.changed_raindrops_extractor()
+        assert [change.raindrop.id for change in changes] == [1]
+        assert changes[0].raindrop.task_id == "t1"
+        assert changes[0].previous["title"] == "Old"
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_same_last_update_not_hashed(self, MockDatabaseManager, mock_user_config):
+        MockDatabaseManager.return_value.get_latest_database.return_value = {
+            "Processed Raindrops": [self._row(1, title="Old", last_update="2024-01-02")]
+        }
+        rdp = RaindropsProcessor(mock_user_config, [self._rd(1)])
+        with patch("raindrop_todoist_syncer.rd_process.content_hash") as mock_hash:
+            assert rdp.changed_raindrops_extractor() == []
+        mock_hash.assert_not_called()
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_legacy_rows_skipped(self, MockDatabaseManager, mock_user_config):
+        MockDatabaseManager.return_value.get_latest_database.return_value = {
+            "Processed Raindrops": [{"id": 1, "title": "Old"}]
+        }
+        rdp = RaindropsProcessor(mock_user_config, [self._rd(1)])
+        assert rdp.changed_raindrops_extractor() == []
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_database_read_once(self, MockDatabaseManager, mock_user_config):
+        MockDatabaseManager.return_value.get_latest_database.return_value = {
+            "Processed Raindrops": []
+        }
+        rdp = RaindropsProcessor(mock_user_config, [self._rd(1)])
+        rdp.newly_favourited_raindrops_extractor()
+        rdp.changed_raindrops_extractor()
+        MockDatabaseManager.return_value.get_latest_database.assert_called_once()
+
+
+class TestRemovedFavouritesExtractor:
+    @staticmethod
+    def _processor(mock_user_config, MockDatabaseManager, fav_ids, tracked_ids):
+        MockDatabaseManager.return_value.get_latest_database.return_value = {
+            "Processed Raindrops": [{"id": i} for i in tracked_ids]
+        }
+        all_rds = [{"_id": i, "important": True} for i in fav_ids]
+        return RaindropsProcessor(mock_user_config, all_rds)
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_removed_found(self, MockDatabaseManager, mock_user_config):
+        rdp = self._processor(mock_user_config, MockDatabaseManager, [1, 3], [1, 2])
+        assert rdp.removed_favourites_extractor() == [{"id": 2}]
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_small_library_below_minimum_allowed(
+        self, MockDatabaseManager, mock_user_config
+    ):
+        rdp = self._processor(mock_user_config, MockDatabaseManager, [], range(5))
+        assert len(rdp.removed_favourites_extractor()) == 5
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_mass_removal_blocked(self, MockDatabaseManager, mock_user_config):
+        rdp = self._processor(
+            mock_user_config, MockDatabaseManager, range(50), range(100)
+        )
+        assert rdp.removed_favourites_extractor() == []
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_removal_within_fraction_allowed(
+        self, MockDatabaseManager, mock_user_config
+    ):
+        rdp = self._processor(
+            mock_user_config, MockDatabaseManager, range(80), range(100)
+        )
+        assert len(rdp.removed_favourites_extractor()) == 20
+
+    @patch("raindrop_todoist_syncer.rd_process.DatabaseManager")
+    def test_large_sets(self, MockDatabaseManager, mock_user_config):
+        rdp = self._processor(
+            mock_user_config, MockDatabaseManager, range(1, 50_000), range(50_000)
+        )
+        assert rdp.removed_favourites_extractor() == [{"id": 0}]
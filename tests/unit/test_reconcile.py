@@ -0,0 +1,177 @@
+from unittest.mock import Mock, patch
+
+import pytest
+
+from raindrop_todoist_syncer.rd_object import content_hash
+from raindrop_todoist_syncer.reconcile import ReconcilePlan, Reconciler
+
+
+def fav(raindrop_id, title="Title", link=None):
+    return {
+        "_id": raindrop_id,
+        "important": True,
+        "created": "2024-01-01",
+        "title": title,
+        "note": "",
+        "link": link or f"https://example.com/{raindrop_id}",
+    }
+
+
+def row(raindrop_id, title="Title", task_id=None):
+    link = f"https://example.com/{raindrop_id}"
+    return {
+        "id": raindrop_id,
+        "title": title,
+        "link": link,
+        "content_hash": content_hash(title, "", link),
+        "task_id": task_id,
+    }
+
+
+@pytest.fixture
+def mock_raindrop_client():
+    client = Mock()
+    client.get_all_raindrops.return_value = [
+        fav(1),
+        fav(2, title="New title"),
+        fav(3),
+        fav(4),
+        fav(5),
+        {"_id": 9, "title": "Not a favourite"},
+    ]
+    return client
+
+
+@pytest.fixture
+def mock_db_manager():
+    db_manager = Mock()
+    db_manager.get_latest_database.return_value = {
+        "Processed Raindrops": [
+            row(1, task_id="t1"),
+            row(2, task_id="t2"),
+            row(6),
+            row(7),
+        ]
+    }
+    return db_manager
+
+
+@pytest.fixture
+def mock_task_index():
+    task_index = Mock()
+    task_index.tasks = {
+        "t1": {"raindrop_id": 1, "link": None},
+        "t2": {"raindrop_id": 2, "link": None},
+        "t3": {"raindrop_id": 3, "link": None},
+        "t5": {"raindrop_id": None, "link": "https://example.com/5"},
+        "t6": {"raindrop_id": None, "link": "https://example.com/6"},
+        "t8": {"raindrop_id": None, "link": "https://unrelated.com"},
+    }
+    return task_index
+
+
+@pytest.fixture
+def reconciler(
+    mock_user_config, mock_raindrop_client, mock_db_manager, mock_task_index
+):
+    return Reconciler(
+        mock_user_config,
+        mock_raindrop_client,
+        mock_db_manager,
+        task_index=mock_task_index,
+    )
+
+
+class TestPlan:
+    def test_missing_tasks(self, reconciler):
+        assert [rd.id for rd in reconciler.plan().missing_tasks] == [4]
+
+    def test_untracked_get_task_ids(self, reconciler):
+        untracked = sorted(reconciler.plan().untracked, key=lambda rd: rd.id)
+        assert [(rd.id, rd.task_id) for rd in untracked] == [(3, "t3"), (5, "t5")]
+
+    def test_stale_rows(self, reconciler):
+        stale = reconciler.plan().stale_rows
+        assert sorted(r["id"] for r in stale) == [6, 7]
+
+    def test_orphaned_tasks_only_identified_ones(self, reconciler):
+        assert reconciler.plan().orphaned_tasks == {6: "t6"}
+
+    def test_changed(self, reconciler):
+        changed = reconciler.plan().changed
+        assert [(c.raindrop.id, c.raindrop.task_id) for c in changed] == [(2, "t2")]
+
+    def test_task_index_fully_refreshed(self, reconciler, mock_task_index):
+        reconciler.plan()
+        mock_task_index.full_refresh.assert_called_once()
+
+    def test_api_cost(self, reconciler):
+        # Two requests to create task 4, one batch to close, one batch to update.
+        assert reconciler.plan().api_cost() == 4
+
+    def test_summary(self, reconciler):
+        summary = reconciler.plan().summary()
+        assert "Tasks to create:" in summary
+        assert "Estimated Todoist requests: 4" in summary
+
+    def test_in_sync_is_empty(self, reconciler, mock_raindrop_client, mock_task_index):
+        mock_raindrop_client.get_all_raindrops.return_value = [fav(1), fav(2)]
+        mock_task_index.tasks = {
+            "t1": {"raindrop_id": 1, "link": None},
+            "t2": {"raindrop_id": 2, "link": None},
+        }
+        reconciler.database_manager.get_latest_database.return_value = {
+            "Processed Raindrops": [row(1, task_id="t1"), row(2, task_id="t2")]
+        }
+        plan = reconciler.plan()
+        assert plan.is_empty()
+        assert plan.api_cost() == 0
+
+    def test_large_library(self, reconciler, mock_raindrop_client, mock_task_index):
+        n = 30_000
+        mock_raindrop_client.get_all_raindrops.return_value = [fav(i) for i in range(n)]
+        reconciler.database_manager.get_latest_database.return_value = {
+            "Processed Raindrops": [row(i, task_id=f"t{i}") for i in range(1, n + 1)]
+        }
+        mock_task_index.tasks = {
+            f"t{i}": {"raindrop_id": i, "link": None} for i in range(1, n + 1)
+        }
+        plan = reconciler.plan()
+        assert [rd.id for rd in plan.missing_tasks] == [0]
+        assert [r["id"] for r in plan.stale_rows] == [n]
+        assert plan.orphaned_tasks == {n: f"t{n}"}
+        assert plan.changed == []
+
+
+class TestApply:
+    @patch("raindrop_todoist_syncer.reconcile.SyncPipeline")
+    @patch("raindrop_todoist_syncer.reconcile.TodoistTaskUpdater")
+    @patch("raindrop_todoist_syncer.reconcile.TodoistTaskCloser")
+    def test_apply(
+        self,
+        mock_closer,
+        mock_updater,
+        mock_sync_pipeline,
+        reconciler,
+        mock_db_manager,
+    ):
+        plan = reconciler.plan()
+        mock_updater.return_value.update_tasks.return_value = [plan.changed[0].raindrop]
+        reconciler.apply(plan)
+        mock_db_manager.update_database.assert_called_once_with(plan.untracked)
+        mock_db_manager.remove_rows.assert_called_once_with({6, 7})
+        mock_closer.return_value.close_tasks.assert_called_once_with({6: "t6"})
+        mock_db_manager.replace_rows.assert_called_once_with([plan.changed[0].raindrop])
+        mock_sync_pipeline.return_value.create.assert_called_once_with(
+            plan.missing_tasks
+        )
+
+    @patch("raindrop_todoist_syncer.reconcile.SyncPipeline")
+    @patch("raindrop_todoist_syncer.reconcile.TodoistTaskCloser")
+    def test_empty_plan_no_writes(
+        self, mock_closer, mock_sync_pipeline, reconciler, mock_db_manager
+    ):
+        reconciler.apply(ReconcilePlan([], [], [], {}, []))
+        mock_closer.assert_not_called()
+        mock_sync_pipeline.assert_not_called()
+        mock_db_manager.update_database.assert_not_called()
@@ -0,0 +1,268 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from raindrop_todoist_syncer.config import UserConfig
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.routing import (
+    ResolutionCache,
+    Route,
+    TaskRouter,
+    load_routing_rules,
+)
+from raindrop_todoist_syncer.td_index import MAIN_WORK_PROJECT
+from raindrop_todoist_syncer.td_sync import TodoistSyncClient
+
+
+@pytest.fixture
+def mock_api():
+    api = Mock()
+    api.get_projects.side_effect = lambda **kwargs: iter(
+        [[SimpleNamespace(id="p1", name="Work"), SimpleNamespace(id="p2", name="Dev")]]
+    )
+    api.get_sections.side_effect = lambda **kwargs: iter(
+        [[SimpleNamespace(id="s1", name="Articles", project_id="p2")]]
+    )
+    api.get_labels.side_effect = lambda **kwargs: iter(
+        [[SimpleNamespace(id="l1", name="Raindrop")]]
+    )
+    return api
+
+
+@pytest.fixture
+def mock_sync_client():
+    sync_client = Mock()
+    sync_client.command = TodoistSyncClient.command
+    sync_client.commands.side_effect = lambda commands: {
+        "temp_id_mapping": {c["temp_id"]: f"new-{c['args']['name']}" for c in commands},
+        "failed": {},
+    }
+    return sync_client
+
+
+@pytest.fixture
+def mock_raindrop_client():
+    client = Mock()
+    client.get_collections.return_value = [
+        {"_id": 10, "title": "Reading"},
+        {"_id": 11, "title": "Code"},
+    ]
+    return client
+
+
+@pytest.fixture
+def clock():
+    return Mock(return_value=1_000_000.0)
+
+
+@pytest.fixture
+def resolution_cache(
+    mock_user_config: UserConfig,
+    mock_api,
+    mock_raindrop_client,
+    mock_sync_client,
+    clock,
+):
+    return ResolutionCache(
+        mock_user_config,
+        api=mock_api,
+        raindrop_client=mock_raindrop_client,
+        sync_client=mock_sync_client,
+        clock=clock,
+    )
+
+
+def rd(raindrop_id, collection_id=None, tags=()):
+    return Raindrop(
+        {
+            "_id": raindrop_id,
+            "created": "2023-08-14T09:36:24.856Z",
+            "title": "Title",
+            "note": "",
+            "link": "https://example.com",
+            "collection": {"$id": collection_id},
+            "tags": list(tags),
+        }
+    )
+
+
+class TestLoadRoutingRules:
+    def test_no_file(self, mock_user_config):
+        assert load_routing_rules(mock_user_config) == {}
+
+    def test_file(self, mock_user_config):
+        mock_user_config.routing_file.parent.mkdir(parents=True)
+        mock_user_config.routing_file.write_text('{"default_project": "Work"}')
+        assert load_routing_rules(mock_user_config) == {"default_project": "Work"}
+
+
+class TestResolutionCache:
+    def test_project_id(self, resolution_cache):
+        assert resolution_cache.project_id("Dev") == "p2"
+
+    def test_section_id(self, resolution_cache):
+        assert resolution_cache.section_id("p2", "Articles") == "s1"
+
+    def test_collection_name(self, resolution_cache):
+        assert resolution_cache.collection_name(11) == "Code"
+
+    def test_system_collection_needs_no_fetch(
+        self, resolution_cache, mock_raindrop_client
+    ):
+        assert resolution_cache.collection_name(-1) == "Unsorted"
+        mock_raindrop_client.get_collections.assert_not_called()
+
+    def test_hit_does_not_refetch(self, resolution_cache, mock_api):
+        resolution_cache.project_id("Dev")
+        resolution_cache.project_id("Work")
+        mock_api.get_projects.assert_called_once()
+
+    def test_miss_refetches_only_once_per_run(self, resolution_cache, mock_api):
+        assert resolution_cache.project_id("Nope") is None
+        assert resolution_cache.project_id("Still nope") is None
+        mock_api.get_projects.assert_called_once()
+
+    def test_persisted_and_reused(
+        self, mock_user_config, resolution_cache, mock_api, clock
+    ):
+        resolution_cache.project_id("Dev")
+        resolution_cache.save()
+        reloaded = ResolutionCache(mock_user_config, api=mock_api, clock=clock).load()
+        assert reloaded.project_id("Work") == "p1"
+        mock_api.get_projects.assert_called_once()
+
+    def test_ttl_expiry_refetches(
+        self, mock_user_config, resolution_cache, mock_api, clock
+    ):
+        resolution_cache.project_id("Dev")
+        resolution_cache.save()
+        clock.return_value += ResolutionCache.TTL_SECONDS + 1
+        reloaded = ResolutionCache(mock_user_config, api=mock_api, clock=clock).load()
+        reloaded.project_id("Dev")
+        assert mock_api.get_projects.call_count == 2
+
+    def test_cache_file_content(self, resolution_cache):
+        resolution_cache.project_id("Dev")
+        resolution_cache.save()
+        cache = json.loads(resolution_cache.cache_path.read_text())
+        assert cache["data"]["projects"] == {"Work": "p1", "Dev": "p2"}
+
+    def test_ensure_labels_creates_only_missing_in_one_batch(
+        self, resolution_cache, mock_api, mock_sync_client
+    ):
+        created = resolution_cache.ensure_labels({"Raindrop", "python", "later"})
+        assert created == ["later", "python"]
+        mock_sync_client.commands.assert_called_once()
+        commands = mock_sync_client.commands.call_args.args[0]
+        assert [c["args"]["name"] for c in commands] == ["later", "python"]
+        assert resolution_cache.data["labels"]["python"] == "new-python"
+        mock_api.get_labels.assert_called_once()
+
+    def test_ensure_labels_all_known_no_calls(
+        self, resolution_cache, mock_api, mock_sync_client
+    ):
+        resolution_cache.ensure_labels({"Raindrop"})
+        resolution_cache.ensure_labels({"Raindrop"})
+        mock_api.get_labels.assert_called_once()
+        mock_sync_client.commands.assert_not_called()
+
+    def test_ensure_labels_failed_command_not_cached(
+        self, resolution_cache, mock_sync_client
+    ):
+        mock_sync_client.commands.side_effect = None
+        mock_sync_client.commands.return_value = {"temp_id_mapping": {}, "failed": {}}
+        assert resolution_cache.ensure_labels({"python"}) == []
+        assert "python" not in resolution_cache.data["labels"]
+
+
+class TestTaskRouter:
+    @pytest.fixture
+    def rules(self):
+        return {
+            "collections": {"Reading": {"project": "Work"}},
+            "tags": {"python": {"project": "Dev", "section": "Articles"}},
+        }
+
+    def test_no_rules_makes_no_calls(self, resolution_cache, mock_api):
+        router = TaskRouter(resolution_cache, {})
+        router.prepare([rd(1, 10)])
+        assert router.route(rd(1, 10)) == Route(MAIN_WORK_PROJECT)
+        assert mock_api.mock_calls == []
+
+    def test_collection_rule(self, resolution_cache, rules):
+        router = TaskRouter(resolution_cache, rules)
+        router.prepare([rd(1, 10)])
+        assert router.route(rd(1, 10)) == Route("p1")
+
+    def test_tag_rule_beats_collection_rule(self, resolution_cache, rules):
+        router = TaskRouter(resolution_cache, rules)
+        router.prepare([rd(1, 10, ["python"])])
+        assert router.route(rd(1)) == Route("p2", "s1")
+
+    def test_unmatched_gets_default(self, resolution_cache, rules):
+        router = TaskRouter(resolution_cache, rules)
+        router.prepare([rd(1, 11)])
+        assert router.route(rd(1)) == Route(MAIN_WORK_PROJECT)
+
+    def test_default_project_rule(self, resolution_cache):
+        router = TaskRouter(resolution_cache, {"default_project": "Dev"})
+        router.prepare([rd(1)])
+        assert router.route(rd(1)) == Route("p2")
+
+    def test_unknown_project_falls_back_to_default(self, resolution_cache):
+        rules = {"tags": {"x": {"project": "Missing"}}}
+        router = TaskRouter(resolution_cache, rules)
+        router.prepare([rd(1, tags=["x"])])
+        assert router.route(rd(1)) == Route(MAIN_WORK_PROJECT)
+
+    def test_rule_labels_created_in_prepare(self, resolution_cache, mock_sync_client):
+        rules = {"tags": {"x": {"labels": ["reading"]}}}
+        router = TaskRouter(resolution_cache, rules)
+        router.prepare([rd(1, tags=["x"]), rd(2, tags=["x"])])
+        mock_sync_client.commands.assert_called_once()
+        assert router.route(rd(2)).labels == ("Raindrop", "reading")
+
+    def test_route_is_lookup_only(self, resolution_cache, mock_api, rules):
+        router = TaskRouter(resolution_cache, rules)
+        router.prepare([rd(i, 10) for i in range(50)])
+        calls_after_prepare = len(mock_api.mock_calls)
+        for i in range(50):
+            router.route(rd(i, 10))
+        assert len(mock_api.mock_calls) == calls_after_prepare
+
+
+class TestTagLabels:
+    def test_no_tag_config_no_tag_labels(self, resolution_cache):
+        router = TaskRouter(resolution_cache, {"default_project": "Work"})
+        assert router.tag_labels(rd(1, tags=["python"])) == ()
+
+    def test_mapped_tags_only(self, resolution_cache):
+        router = TaskRouter(resolution_cache, {"tag_labels": {"python": "Python"}})
+        assert router.tag_labels(rd(1, tags=["python", "misc"])) == ("Python",)
+
+    def test_unmapped_tags_as_labels(self, resolution_cache):
+        rules = {"tag_labels": {"python": "Python"}, "unmapped_tags_as_labels": True}
+        router = TaskRouter(resolution_cache, rules)
+        assert router.tag_labels(rd(1, tags=["python", "misc"])) == ("Python", "misc")
+
+    def test_long_tag_truncated(self, resolution_cache):
+        router = TaskRouter(resolution_cache, {"unmapped_tags_as_labels": True})
+        assert router.tag_labels(rd(1, tags=["x" * 100])) == ("x" * 60,)
+
+    def test_route_includes_tag_labels_without_duplicates(self, resolution_cache):
+        rules = {"tag_labels": {"a": "A", "b": "A", "c": "Raindrop"}}
+        router = TaskRouter(resolution_cache, rules)
+        router.prepare([rd(1, tags=["a", "b", "c"])])
+        assert router.route(rd(1)).labels == ("Raindrop", "A")
+
+    def test_labels_for_whole_backfill_created_in_one_batch(
+        self, resolution_cache, mock_api, mock_sync_client
+    ):
+        router = TaskRouter(resolution_cache, {"unmapped_tags_as_labels": True})
+        raindrops = [rd(i, tags=[f"tag{i % 20}", "common"]) for i in range(300)]
+        router.prepare(raindrops)
+        mock_api.get_labels.assert_called_once()
+        mock_sync_client.commands.assert_called_once()
+        assert len(mock_sync_client.commands.call_args.args[0]) == 21
@@ -0,0 +1,77 @@
+import pytest
+
+from raindrop_todoist_syncer.schedule import AdaptiveSchedule
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def schedule(mock_user_config, clock):
+    # rand of 0.5 means no jitter.
+    return AdaptiveSchedule(mock_user_config, clock=clock, rand=lambda: 0.5)
+
+
+def test_backs_off_when_quiet(schedule):
+    delays = [schedule.record(False) for _ in range(3)]
+    assert delays == [120, 240, 480]
+
+
+def test_backoff_capped(schedule):
+    for _ in range(20):
+        delay = schedule.record(False)
+    assert delay == AdaptiveSchedule.MAX_INTERVAL
+
+
+def test_change_resets_to_min(schedule):
+    schedule.record(False)
+    schedule.record(False)
+    assert schedule.record(True) == AdaptiveSchedule.MIN_INTERVAL
+
+
+@pytest.mark.parametrize("rand, expected", [(0.0, 54), (1.0, 66)])
+def test_jitter_bounds(mock_user_config, clock, rand, expected):
+    schedule = AdaptiveSchedule(mock_user_config, clock=clock, rand=lambda: rand)
+    assert schedule.record(True) == pytest.approx(expected)
+
+
+def test_due(schedule, clock):
+    assert schedule.due()
+    schedule.record(True)
+    assert not schedule.due()
+    assert schedule.seconds_until_due() == 60
+    clock.now += 60
+    assert schedule.due()
+
+
+def test_learned_rate_persisted(schedule, mock_user_config, clock):
+    schedule.record(False)
+    loaded = AdaptiveSchedule(mock_user_config, clock=clock).load()
+    assert loaded.interval == 120
+    assert loaded.next_run_at == schedule.next_run_at
+
+
+def test_load_clamps_interval(schedule, mock_user_config):
+    schedule.interval = 10**6
+    schedule.save()
+    loaded = AdaptiveSchedule(mock_user_config).load()
+    assert loaded.interval == AdaptiveSchedule.MAX_INTERVAL
+
+
+@pytest.mark.parametrize("content", ["", "[]", '{"interval": "x"}', '{"a": 1}'])
+def test_load_corrupt_file(mock_user_config, content):
+    schedule = AdaptiveSchedule(mock_user_config)
+    schedule.path.parent.mkdir(parents=True)
+    schedule.path.write_text(content)
+    schedule.load()
+    assert (schedule.interval, schedule.next_run_at) == (60, 0.0)
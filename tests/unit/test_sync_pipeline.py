@@ -0,0 +1,183 @@
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.sync_pipeline import SyncPipeline
+
+
+def fav(raindrop_id, important=True):
+    return {
+        "_id": raindrop_id,
+        "important": important,
+        "created": "2024-01-01",
+        "title": f"Title {raindrop_id}",
+        "note": "",
+        "link": f"https://example.com/{raindrop_id}",
+        "tags": [],
+        "collection": {"$id": -1},
+    }
+
+
+class FakeDecoder:
+    """
+    Pages are passed as lists of raindrops.
+    """
+
+    def __init__(self, raindrop_client):
+        self.finished = False
+
+    def decode(self, page):
+        return page
+
+    def finish(self):
+        self.finished = True
+
+
+@pytest.fixture
+def mock_db_manager():
+    db_manager = Mock()
+    db_manager.get_latest_database.return_value = {
+        "Processed Raindrops": [{"id": 1, "task_id": "t1"}]
+    }
+    return db_manager
+
+
+@pytest.fixture
+def mock_raindrop_client():
+    client = Mock()
+    client.iter_pages.return_value = iter(
+        [[fav(1), fav(2)], [fav(3, important=False), fav(4)]]
+    )
+    return client
+
+
+@pytest.fixture
+def todoist():
+    """
+    Patch everything that talks to Todoist. Tasks are created with id "task-<id>".
+    """
+
+    def creator(user_config, raindrop, governor, route):
+        task_creator = Mock()
+
+        def create_task():
+            raindrop.task_id = f"task-{raindrop.id}"
+            return True
+
+        task_creator.create_task.side_effect = create_task
+        return task_creator
+
+    with (
+        patch("raindrop_todoist_syncer.sync_pipeline.RaindropPageDecoder", FakeDecoder),
+        patch("raindrop_todoist_syncer.sync_pipeline.TodoistTaskIndex") as index,
+        patch("raindrop_todoist_syncer.sync_pipeline.HighlightIndex") as highlights,
+        patch("raindrop_todoist_syncer.sync_pipeline.ResolutionCache"),
+        patch("raindrop_todoist_syncer.sync_pipeline.TaskRouter") as router,
+        patch(
+            "raindrop_todoist_syncer.sync_pipeline.load_routing_rules",
+            Mock(return_value={}),
+        ),
+        patch(
+            "raindrop_todoist_syncer.sync_pipeline.TodoistTaskCreator",
+            side_effect=creator,
+        ) as task_creator,
+    ):
+        index.return_value.load.return_value.contains.return_value = False
+        router.return_value.route.return_value = "route"
+        yield MagicMock(
+            index=index.return_value.load.return_value,
+            highlights=highlights,
+            task_creator=task_creator,
+        )
+
+
+def stored_ids(db_manager):
+    return sorted(
+        rd.id
+        for call in db_manager.update_database.call_args_list
+        for rd in call.args[0]
+    )
+
+
+class TestRun:
+    def test_new_favourites_created_and_stored(
+        self, todoist, mock_user_config, mock_raindrop_client, mock_db_manager
+    ):
+        sync_pipeline = SyncPipeline(
+            mock_user_config, mock_raindrop_client, mock_db_manager
+        )
+        favourites = sync_pipeline.run()
+
+        assert [rd["_id"] for rd in favourites] == [1, 2, 4]
+        assert stored_ids(mock_db_manager) == [2, 4]
+        assert sorted(rd.task_id for rd in sync_pipeline.created) == [
+            "task-2",
+            "task-4",
+        ]
+        assert todoist.index.add.call_count == 2
+        todoist.index.save.assert_called_once()
+        assert "commit" in sync_pipeline.report()
+
+    def test_nothing_new_skips_todoist(
+        self, todoist, mock_user_config, mock_raindrop_client, mock_db_manager
+    ):
+        mock_raindrop_client.iter_pages.return_value = iter([[fav(1)]])
+        SyncPipeline(mock_user_config, mock_raindrop_client, mock_db_manager).run()
+
+        todoist.index.contains.assert_not_called()
+        todoist.highlights.assert_not_called()
+        mock_db_manager.update_database.assert_not_called()
+
+    def test_existing_task_not_duplicated(
+        self, todoist, mock_user_config, mock_raindrop_client, mock_db_manager
+    ):
+        todoist.index.contains.side_effect = lambda rd: rd.id == 2
+        todoist.index.task_id_for.return_value = "existing"
+        sync_pipeline = SyncPipeline(
+            mock_user_config, mock_raindrop_client, mock_db_manager
+        )
+        sync_pipeline.run()
+
+        assert stored_ids(mock_db_manager) == [2, 4]
+        assert [rd.task_id for rd in sync_pipeline.already_tasked] == ["existing"]
+        assert todoist.task_creator.call_count == 1
+
+    def test_failed_task_not_stored(
+        self, todoist, mock_user_config, mock_raindrop_client, mock_db_manager
+    ):
+        todoist.task_creator.side_effect = None
+        todoist.task_creator.return_value.create_task.return_value = False
+        SyncPipeline(mock_user_config, mock_raindrop_client, mock_db_manager).run()
+
+        mock_db_manager.update_database.assert_not_called()
+        todoist.index.save.assert_not_called()
+
+    def test_commits_batched(
+        self, todoist, mock_user_config, mock_raindrop_client, mock_db_manager
+    ):
+        mock_raindrop_client.iter_pages.return_value = iter(
+            [[fav(n) for n in range(100, 150)], [fav(n) for n in range(150, 160)]]
+        )
+        SyncPipeline(mock_user_config, mock_raindrop_client, mock_db_manager).run()
+
+        assert stored_ids(mock_db_manager) == list(range(100, 160))
+        assert all(
+            len(call.args[0]) <= SyncPipeline.COMMIT_BATCH_SIZE
+            for call in mock_db_manager.update_database.call_args_list
+        )
+
+    def test_fetch_error_raised(
+        self, todoist, mock_user_config, mock_raindrop_client, mock_db_manager
+    ):
+        mock_raindrop_client.iter_pages.side_effect = ConnectionError("offline")
+        with pytest.raises(ConnectionError):
+            SyncPipeline(mock_user_config, mock_raindrop_client, mock_db_manager).run()
+
+
+def test_create(todoist, mock_user_config, mock_db_manager, raindrop_object: Raindrop):
+    sync_pipeline = SyncPipeline(mock_user_config, Mock(), mock_db_manager)
+    sync_pipeline.create([raindrop_object])
+
+    mock_db_manager.update_database.assert_called_once_with([raindrop_object])
+    assert raindrop_object.task_id == f"task-{raindrop_object.id}"
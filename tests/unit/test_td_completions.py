@@ -0,0 +1,64 @@
+from unittest.mock import Mock
+
+import pytest
+
+from raindrop_todoist_syncer.td_completions import TodoistCompletionReader
+
+
+@pytest.fixture
+def mock_sync_client():
+    sync_client = Mock()
+    sync_client.read.return_value = {"sync_token": "token-1", "full_sync": True}
+    return sync_client
+
+
+@pytest.fixture
+def reader(mock_user_config, mock_sync_client):
+    return TodoistCompletionReader(mock_user_config, sync_client=mock_sync_client)
+
+
+def test_first_read_sets_baseline(reader, mock_sync_client):
+    assert reader.completed_task_ids() == set()
+    mock_sync_client.read.assert_called_once_with("*", ["items"])
+
+
+def test_token_only_saved_on_commit(mock_user_config, reader, mock_sync_client):
+    reader.completed_task_ids()
+    assert not reader.state_path.exists()
+    reader.commit()
+    reloaded = TodoistCompletionReader(mock_user_config, sync_client=mock_sync_client)
+    assert reloaded.sync_token == "token-1"
+
+
+def test_incremental_read_returns_completions(
+    mock_user_config, reader, mock_sync_client
+):
+    reader.completed_task_ids()
+    reader.commit()
+    mock_sync_client.read.return_value = {
+        "sync_token": "token-2",
+        "full_sync": False,
+        "items": [
+            {"id": "t1", "checked": True},
+            {"id": "t2", "checked": False},
+            {"id": "t3", "checked": True, "is_deleted": True},
+        ],
+    }
+    reloaded = TodoistCompletionReader(mock_user_config, sync_client=mock_sync_client)
+    assert reloaded.completed_task_ids() == {"t1"}
+    mock_sync_client.read.assert_called_with("token-1", ["items"])
+
+
+def test_full_sync_reported_by_todoist_is_baseline(reader, mock_sync_client):
+    reader.sync_token = "expired"
+    mock_sync_client.read.return_value = {
+        "sync_token": "token-2",
+        "full_sync": True,
+        "items": [{"id": "t1", "checked": True}],
+    }
+    assert reader.completed_task_ids() == set()
+
+
+def test_commit_without_read_does_nothing(reader):
+    reader.commit()
+    assert not reader.state_path.exists()
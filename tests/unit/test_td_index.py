@@ -0,0 +1,178 @@
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from raindrop_todoist_syncer.config import UserConfig
+from raindrop_todoist_syncer.rd_object import Raindrop
+from raindrop_todoist_syncer.td_index import (
+    TodoistTaskIndex,
+    normalise_link,
+    raindrop_marker,
+)
+
+
+def task(task_id, description="", project_id="p1"):
+    return SimpleNamespace(id=task_id, description=description, project_id=project_id)
+
+
+def comment(task_id, content):
+    return SimpleNamespace(task_id=task_id, content=content)
+
+
+@pytest.fixture
+def mock_api():
+    api = Mock()
+    api.get_tasks.return_value = iter(
+        [
+            [task("t1", "Notes\n\n[raindrop:111111111]"), task("t2")],
+            [task("t3", "See https://example.com/page/", project_id="p2")],
+        ]
+    )
+    api.get_comments.side_effect = [
+        iter([[comment("t2", "https://news.ycombinator.com/"), comment("t9", "x")]]),
+        iter([]),
+    ]
+    api.filter_tasks.return_value = iter([])
+    return api
+
+
+@pytest.fixture
+def clock():
+    return Mock(return_value=1_000_000.0)
+
+
+@pytest.fixture
+def task_index(mock_user_config: UserConfig, mock_api, clock):
+    return TodoistTaskIndex(mock_user_config, api=mock_api, clock=clock)
+
+
+def rd(raindrop_id, link):
+    return Raindrop(
+        {
+            "_id": raindrop_id,
+            "created": "2023-08-14T09:36:24.856Z",
+            "title": "Title",
+            "note": "",
+            "link": link,
+        }
+    )
+
+
+def test_raindrop_marker():
+    assert raindrop_marker(123) == "[raindrop:123]"
+
+
+def test_normalise_link():
+    assert normalise_link(" https://example.com/ ") == "https://example.com"
+
+
+class TestFullRefresh:
+    def test_indexes_marker(self, task_index):
+        task_index.full_refresh()
+        assert task_index.by_raindrop_id == {111111111: "t1"}
+
+    def test_indexes_comment_and_description_links(self, task_index):
+        task_index.full_refresh()
+        assert task_index.by_link == {
+            "https://news.ycombinator.com": "t2",
+            "https://example.com/page": "t3",
+        }
+
+    def test_ignores_comments_on_other_tasks(self, task_index):
+        task_index.full_refresh()
+        assert "t9" not in task_index.tasks
+
+    def test_fetches_all_pages(self, task_index):
+        task_index.full_refresh()
+        assert set(task_index.tasks) == {"t1", "t2", "t3"}
+
+    def test_fetches_comments_per_project(self, task_index, mock_api):
+        task_index.full_refresh()
+        assert [
+            c.kwargs["project_id"] for c in mock_api.get_comments.call_args_list
+        ] == [
+            "p1",
+            "p2",
+        ]
+
+    def test_requests_made_through_governor(self, task_index):
+        task_index.full_refresh()
+        # Every iterator costs one call per page plus the call that exhausts it.
+        assert task_index.governor.remaining_budget == (
+            task_index.governor.request_limit - 6
+        )
+
+
+class TestContains:
+    def test_contains_by_raindrop_id(self, task_index):
+        task_index.full_refresh()
+        assert task_index.contains(rd(111111111, "https://unrelated.com"))
+
+    def test_contains_by_link(self, task_index):
+        task_index.full_refresh()
+        assert task_index.contains(rd(2, "https://news.ycombinator.com"))
+
+    def test_not_contained(self, task_index):
+        task_index.full_refresh()
+        assert not task_index.contains(rd(3, "https://new.com"))
+
+    def test_task_id_for(self, task_index):
+        task_index.full_refresh()
+        assert task_index.task_id_for(rd(111111111, "https://x.com")) == "t1"
+        assert task_index.task_id_for(rd(2, "https://news.ycombinator.com")) == "t2"
+        assert task_index.task_id_for(rd(3, "https://new.com")) is None
+
+    def test_add(self, task_index):
+        task_index.add("t4", rd(4, "https://new.com"))
+        assert task_index.contains(rd(4, "https://other.com"))
+        assert task_index.contains(rd(5, "https://new.com/"))
+
+
+class TestLoad:
+    def test_no_cache_does_full_refresh_and_saves(self, task_index, mock_api):
+        task_index.load()
+        mock_api.get_tasks.assert_called_once()
+        mock_api.filter_tasks.assert_not_called()
+        assert json.loads(task_index.cache_path.read_text())["tasks"]["t1"] == {
+            "link": None,
+            "raindrop_id": 111111111,
+        }
+
+    def test_fresh_cache_refreshes_incrementally(
+        self, mock_user_config, task_index, mock_api, clock
+    ):
+        task_index.load()
+        mock_api.filter_tasks.return_value = iter(
+            [[task("t1"), task("t5", "[raindrop:5]"), task("t6", project_id="p3")]]
+        )
+        mock_api.get_comments.side_effect = lambda **kwargs: iter([])
+        clock.return_value += 600
+
+        reloaded = TodoistTaskIndex(mock_user_config, api=mock_api, clock=clock).load()
+
+        mock_api.get_tasks.assert_called_once()
+        assert mock_api.filter_tasks.call_args.kwargs["query"] == (
+            "@Raindrop & created after: -1 days"
+        )
+        assert set(reloaded.tasks) == {"t1", "t2", "t3", "t5", "t6"}
+        mock_api.get_comments.assert_called_with(task_id="t6", limit=200)
+
+    def test_stale_cache_does_full_refresh(
+        self, mock_user_config, task_index, mock_api, clock
+    ):
+        task_index.load()
+        clock.return_value += TodoistTaskIndex.FULL_REFRESH_SECONDS + 1
+        mock_api.get_tasks.return_value = iter([[task("t7")]])
+        mock_api.get_comments.side_effect = lambda **kwargs: iter([])
+
+        reloaded = TodoistTaskIndex(mock_user_config, api=mock_api, clock=clock).load()
+
+        assert set(reloaded.tasks) == {"t7"}
+
+    def test_corrupt_cache_ignored(self, task_index, mock_api):
+        task_index.cache_path.parent.mkdir(parents=True)
+        task_index.cache_path.write_text("{not json")
+        task_index.load()
+        mock_api.get_tasks.assert_called_once()
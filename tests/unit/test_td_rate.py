@@ -0,0 +1,161 @@
+from unittest.mock import Mock
+
+import pytest
+
+from raindrop_todoist_syncer.td_rate import (
+    TodoistRateGovernor,
+    TodoistRateLimitError,
+)
+
+
+class FakeClock:
+    """A clock that only moves when `sleep` is called."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def governor(clock):
+    return TodoistRateGovernor(
+        request_limit=3, window_seconds=60, clock=clock, sleep=clock.sleep
+    )
+
+
+def http_error(status_code: int, headers: dict | None = None) -> Exception:
+    err = Exception(f"{status_code} error")
+    err.response = Mock(status_code=status_code, headers=headers or {})
+    return err
+
+
+class TestBudget:
+    def test_remaining_budget_starts_full(self, governor):
+        assert governor.remaining_budget == 3
+
+    def test_remaining_budget_decreases_per_call(self, governor):
+        governor.call(lambda: None)
+        governor.call(lambda: None)
+        assert governor.remaining_budget == 1
+
+    def test_waits_for_window_when_budget_exhausted(self, governor, clock):
+        for _ in range(4):
+            governor.call(lambda: None)
+        assert clock.sleeps == [60]
+        assert governor.total_wait_seconds == 60
+
+    def test_budget_recovers_after_window(self, governor, clock):
+        for _ in range(3):
+            governor.call(lambda: None)
+        clock.now += 61
+        assert governor.remaining_budget == 3
+
+
+class TestTryAcquire:
+    def test_takes_slot_and_budget(self, governor):
+        assert governor.try_acquire() == 0
+        assert governor.remaining_budget == 2
+
+    def test_no_free_slot(self, governor):
+        governor.try_acquire()
+        assert governor.try_acquire() == governor.SLOT_POLL_SECONDS
+        governor.release(latency=0, status_code=200)
+        assert governor.try_acquire() == 0
+
+    def test_budget_exhausted_returns_wait(self, governor, clock):
+        for _ in range(3):
+            governor.try_acquire()
+            governor.release(latency=0, status_code=200)
+        clock.now = 10
+        governor.concurrency = 1
+        assert governor.try_acquire() == 50
+        assert governor.total_wait_seconds == 50
+
+
+class TestRetryAfter:
+    def test_429_retried_after_retry_after_seconds(self, governor, clock):
+        func = Mock(side_effect=[http_error(429, {"Retry-After": "7"}), "task"])
+        assert governor.call(func) == "task"
+        assert clock.sleeps == [7]
+        assert governor.throttled_responses == 1
+
+    def test_429_without_header_uses_default(self, governor, clock):
+        func = Mock(side_effect=[http_error(429), "task"])
+        governor.call(func)
+        assert clock.sleeps == [governor.default_retry_after]
+
+    def test_429_http_date_in_past_does_not_wait(self, governor, clock):
+        retry_after = "Wed, 21 Oct 2015 07:28:00 GMT"
+        func = Mock(side_effect=[http_error(429, {"Retry-After": retry_after}), "ok"])
+        governor.call(func)
+        assert clock.sleeps == []
+
+    def test_gives_up_after_max_retries(self, governor):
+        governor.max_retries = 2
+        func = Mock(side_effect=http_error(429, {"Retry-After": "1"}))
+        with pytest.raises(TodoistRateLimitError):
+            governor.call(func)
+        assert func.call_count == 3
+
+    def test_other_errors_reraised_without_retry(self, governor):
+        func = Mock(side_effect=http_error(500))
+        with pytest.raises(Exception, match="500 error"):
+            governor.call(func)
+        assert func.call_count == 1
+
+
+class TestAimd:
+    def test_concurrency_increases_additively(self, clock):
+        governor = TodoistRateGovernor(max_concurrency=4, clock=clock)
+        for _ in range(3):
+            governor.call(lambda: None)
+        # 1 success at concurrency 1, then 2 successes at concurrency 2.
+        assert governor.concurrency == 3
+
+    def test_concurrency_capped(self, clock):
+        governor = TodoistRateGovernor(max_concurrency=2, clock=clock)
+        for _ in range(10):
+            governor.call(lambda: None)
+        assert governor.concurrency == 2
+
+    def test_429_halves_concurrency(self, governor):
+        governor.concurrency = 4
+        governor.call(Mock(side_effect=[http_error(429, {"Retry-After": "0"}), "ok"]))
+        assert governor.concurrency == 2
+
+    def test_slow_response_halves_concurrency(self, governor, clock):
+        governor.concurrency = 4
+
+        def slow():
+            clock.now += governor.latency_target + 1
+
+        governor.call(slow)
+        assert governor.concurrency == 2
+
+    def test_concurrency_never_below_one(self, governor):
+        for _ in range(2):
+            governor.acquire()
+            governor.release(latency=0, status_code=429)
+        assert governor.concurrency == 1
+
+
+def test_stats(governor):
+    governor.call(lambda: None)
+    assert governor.stats() == {
+        "remaining_budget": 2,
+        "total_wait_seconds": 0,
+        "concurrency": 2,
+        "throttled_responses": 0,
+    }
@@ -0,0 +1,90 @@
+import json
+from unittest.mock import Mock, patch
+
+import pytest
+
+from raindrop_todoist_syncer.config import UserConfig
+from raindrop_todoist_syncer.td_sync import TodoistSyncClient, TodoistSyncError
+from raindrop_todoist_syncer.transport import FakeTransport, HttpClient, HttpResponse
+
+
+@pytest.fixture
+def sync_client(mock_user_config: UserConfig):
+    return TodoistSyncClient(mock_user_config)
+
+
+def sync_response(commands_data: dict) -> Mock:
+    commands = json.loads(commands_data["commands"])
+    mock_response = Mock()
+    mock_response.json.return_value = {
+        "sync_status": {c["uuid"]: "ok" for c in commands},
+        "temp_id_mapping": {c["temp_id"]: f"id-{c['temp_id']}" for c in commands},
+    }
+    return mock_response
+
+
+class TestCommand:
+    def test_command_structure(self):
+        command = TodoistSyncClient.command("label_add", {"name": "x"}, temp_id="t1")
+        assert command["type"] == "label_add"
+        assert command["args"] == {"name": "x"}
+        assert command["temp_id"] == "t1"
+        assert len(command["uuid"]) == 36
+
+    def test_command_without_temp_id(self):
+        command = TodoistSyncClient.command("item_close", {"id": "1"})
+        assert "temp_id" not in command
+
+
+class TestCommands:
+    def test_batches_of_max_commands(self, sync_client):
+        commands = [
+            sync_client.command("label_add", {"name": str(i)}, temp_id=str(i))
+            for i in range(250)
+        ]
+        with patch.object(
+            TodoistSyncClient, "_post", side_effect=sync_response
+        ) as mock_post:
+            result = sync_client.commands(commands)
+        assert mock_post.call_count == 3
+        assert len(result["temp_id_mapping"]) == 250
+        assert result["failed"] == {}
+
+    def test_failed_commands_reported(self, sync_client):
+        command = sync_client.command("label_add", {"name": "x"})
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            "sync_status": {command["uuid"]: {"error": "Invalid"}}
+        }
+        with patch.object(TodoistSyncClient, "_post", return_value=mock_response):
+            result = sync_client.commands([command])
+        assert result["failed"] == {command["uuid"]: {"error": "Invalid"}}
+
+    def test_no_commands_no_requests(self, sync_client):
+        with patch.object(TodoistSyncClient, "_post") as mock_post:
+            sync_client.commands([])
+        mock_post.assert_not_called()
+
+
+def test_sync_invalid_json(sync_client):
+    mock_response = Mock(text="<html>")
+    mock_response.json.side_effect = ValueError
+    with patch.object(TodoistSyncClient, "_post", return_value=mock_response):
+        with pytest.raises(TodoistSyncError):
+            sync_client.sync({})
+
+
+def test_post_sends_auth_header(mock_user_config: UserConfig):
+    transport = FakeTransport(lambda request: HttpResponse.from_json({}))
+    sync_client = TodoistSyncClient(mock_user_config, http=HttpClient(transport))
+    sync_client._post({"commands": "[]"})
+    assert transport.requests[0].headers == {"Authorization": "Bearer ab12"}
+    assert transport.requests[0].data == {"commands": "[]"}
+
+
+def test_read(sync_client):
+    with patch.object(TodoistSyncClient, "sync", return_value={}) as mock_sync:
+        sync_client.read("abc", ["items"])
+    mock_sync.assert_called_once_with(
+        {"sync_token": "abc", "resource_types": '["items"]'}
+    )
@@ -4,6 +4,7 @@ import json
 import pytest
 
 from raindrop_todoist_syncer.rd_process import RaindropsProcessor
+from raindrop_todoist_syncer.td_rate import TodoistRateGovernor
 from raindrop_todoist_syncer.td_task import TodoistTaskCreator
 
 
@@ -42,9 +43,58 @@ class TestCreateTask:
             mock_add_task.assert_called_once_with(
                 content="Welcome to Python.org",
                 project_id=todoist_task_creator.MAIN_WORK_PROJECT,
-                description="",
+                description="[raindrop:628161672]",
                 due_string="today",
                 due_lang="en",
                 priority=1,
                 labels=["Raindrop"],
             )
+
+    def test_create_task_returns_true_on_success(self, todoist_task_creator):
+        with patch("raindrop_todoist_syncer.td_task.TodoistAPI.add_task"):
+            assert todoist_task_creator.create_task() is True
+
+    def test_create_task_records_task_id_on_raindrop(self, todoist_task_creator):
+        with (
+            patch("raindrop_todoist_syncer.td_task.TodoistAPI.add_task") as add_task,
+            patch("raindrop_todoist_syncer.td_task.TodoistAPI.add_comment"),
+        ):
+            add_task.return_value.id = "123"
+            todoist_task_creator.create_task()
+        assert todoist_task_creator.raindrop.task_id == "123"
+        assert todoist_task_creator.raindrop.to_dict()["task_id"] == "123"
+
+    def test_create_task_returns_false_on_error(self, todoist_task_creator):
+        with patch(
+            "raindrop_todoist_syncer.td_task.TodoistAPI.add_task",
+            side_effect=Exception("Boom"),
+        ):
+            assert todoist_task_creator.create_task() is False
+
+    def test_create_task_goes_through_governor(self, raindrop_object, mock_user_config):
+        governor = TodoistRateGovernor()
+        task_creator = TodoistTaskCreator(mock_user_config, raindrop_object, governor)
+        with (
+            patch("raindrop_todoist_syncer.td_task.TodoistAPI.add_task"),
+            patch("raindrop_todoist_syncer.td_task.TodoistAPI.add_comment"),
+        ):
+            task_creator.create_task()
+        assert governor.remaining_budget == governor.request_limit - 2
+
+
+class TestDescription:
+    def test_description_with_notes_and_highlights(
+        self, raindrop_object, mock_user_config
+    ):
+        raindrop_object.notes = "My note"
+        raindrop_object.highlights = [
+            {"text": "First line\nSecond line", "note": ""},
+            {"text": "Another", "note": "Why it matters"},
+        ]
+        task_creator = TodoistTaskCreator(mock_user_config, raindrop_object)
+        assert task_creator.task_description == (
+            "My note\n\n"
+            "> First line\n> Second line\n\n"
+            "> Another\nWhy it matters\n\n"
+            "[raindrop:628161672]"
+        )
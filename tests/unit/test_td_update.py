@@ -0,0 +1,110 @@
+from unittest.mock import Mock
+
+import pytest
+
+from raindrop_todoist_syncer.rd_process import RaindropChange
+from raindrop_todoist_syncer.td_sync import TodoistSyncClient
+from raindrop_todoist_syncer.td_update import TodoistTaskCloser, TodoistTaskUpdater
+
+
+@pytest.fixture
+def mock_sync_client():
+    sync_client = Mock()
+    sync_client.command = TodoistSyncClient.command
+    sync_client.commands.return_value = {"temp_id_mapping": {}, "failed": {}}
+    return sync_client
+
+
+@pytest.fixture
+def updater(mock_user_config, mock_sync_client):
+    return TodoistTaskUpdater(mock_user_config, sync_client=mock_sync_client)
+
+
+@pytest.fixture
+def change(raindrop_object):
+    raindrop_object.task_id = "t1"
+    previous = {"id": raindrop_object.id, "link": raindrop_object.link}
+    return RaindropChange(raindrop_object, previous)
+
+
+def test_no_changes_no_requests(updater, mock_sync_client):
+    assert updater.update_tasks([]) == []
+    mock_sync_client.commands.assert_not_called()
+
+
+def test_item_update_command(updater, mock_sync_client, change):
+    updated = updater.update_tasks([change])
+    assert updated == [change.raindrop]
+    commands = mock_sync_client.commands.call_args.args[0]
+    assert len(commands) == 1
+    assert commands[0]["type"] == "item_update"
+    assert commands[0]["args"] == {
+        "id": "t1",
+        "content": "Welcome to Python.org",
+        "description": "[raindrop:628161672]",
+    }
+
+
+def test_changed_link_adds_comment(updater, mock_sync_client, change):
+    change.previous["link"] = "https://old.example.com"
+    updater.update_tasks([change])
+    commands = mock_sync_client.commands.call_args.args[0]
+    assert [c["type"] for c in commands] == ["item_update", "note_add"]
+    assert commands[1]["args"] == {"item_id": "t1", "content": change.raindrop.link}
+
+
+def test_all_changes_in_one_call(updater, mock_sync_client, change):
+    updater.update_tasks([change] * 3)
+    mock_sync_client.commands.assert_called_once()
+
+
+def test_failed_update_not_returned(updater, mock_sync_client, change):
+    def _fail_all(commands):
+        return {"temp_id_mapping": {}, "failed": {c["uuid"]: "err" for c in commands}}
+
+    mock_sync_client.commands.side_effect = _fail_all
+    assert updater.update_tasks([change]) == []
+
+
+class TestTodoistTaskCloser:
+    @pytest.fixture
+    def closer(self, mock_user_config, mock_sync_client):
+        return TodoistTaskCloser(mock_user_config, sync_client=mock_sync_client)
+
+    def test_close_commands_in_one_call(self, closer, mock_sync_client):
+        closed = closer.close_tasks({1: "t1", 2: "t2"})
+        assert closed == [1, 2]
+        commands = mock_sync_client.commands.call_args.args[0]
+        assert [(c["type"], c["args"]) for c in commands] == [
+            ("item_close", {"id": "t1"}),
+            ("item_close", {"id": "t2"}),
+        ]
+
+    def test_delete_action(self, mock_user_config, mock_sync_client):
+        closer = TodoistTaskCloser(
+            mock_user_config, sync_client=mock_sync_client, action="delete"
+        )
+        closer.close_tasks({1: "t1"})
+        commands = mock_sync_client.commands.call_args.args[0]
+        assert commands[0]["type"] == "item_delete"
+
+    def test_unknown_action(self, mock_user_config):
+        with pytest.raises(ValueError):
+            TodoistTaskCloser(mock_user_config, action="archive")
+
+    def test_failed_not_returned_but_missing_task_is(self, closer, mock_sync_client):
+        def _fail(commands):
+            return {
+                "temp_id_mapping": {},
+                "failed": {
+                    commands[0]["uuid"]: {"error": "Boom", "http_code": 500},
+                    commands[1]["uuid"]: {"error": "Item not found", "http_code": 404},
+                },
+            }
+
+        mock_sync_client.commands.side_effect = _fail
+        assert closer.close_tasks({1: "t1", 2: "t2"}) == [2]
+
+    def test_nothing_to_close(self, closer, mock_sync_client):
+        assert closer.close_tasks({}) == []
+        mock_sync_client.commands.assert_not_called()
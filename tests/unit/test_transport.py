@@ -0,0 +1,431 @@
+import asyncio
+from unittest.mock import Mock
+
+import httpx
+import pytest
+import requests
+import urllib3
+
+from raindrop_todoist_syncer.transport import (
+    AsyncTransport,
+    CacheMiddleware,
+    FakeTransport,
+    HttpClient,
+    HttpRequest,
+    HttpResponse,
+    HttpxTransportAdapter,
+    MetricsMiddleware,
+    Middleware,
+    RateLimitMiddleware,
+    RequestsTransport,
+    RetryMiddleware,
+    TimeoutMiddleware,
+    TransportMetrics,
+    Urllib3Transport,
+    build_http_client,
+    default_http_client,
+    set_default_http_client,
+)
+
+URL = "https://api.raindrop.io/rest/v1/raindrops/0/"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def responses(*items):
+    """
+    A handler returning (or raising) each item in turn.
+    """
+    items = iter(items)
+
+    def _handler(request):
+        item = next(items)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    return _handler
+
+
+class TestHttpRequest:
+    def test_host(self):
+        assert HttpRequest("GET", URL).host == "api.raindrop.io"
+
+    def test_full_url(self):
+        request = HttpRequest("GET", URL, params={"page": 1, "search": "❤️"})
+        assert request.full_url == f"{URL}?page=1&search=%E2%9D%A4%EF%B8%8F"
+
+    def test_full_url_without_params(self):
+        assert HttpRequest("GET", URL).full_url == URL
+
+
+class TestHttpResponse:
+    def test_json_and_headers(self):
+        response = HttpResponse.from_json({"a": 1}, headers={"X-Test": "1"})
+        assert response.json() == {"a": 1}
+        assert response.headers["x-test"] == "1"
+        assert response.ok
+
+    def test_raise_for_status(self):
+        response = HttpResponse(401, request=HttpRequest("GET", URL))
+        with pytest.raises(requests.HTTPError) as err:
+            response.raise_for_status()
+        assert err.value.response.status_code == 401
+
+    def test_raise_for_status_ok(self):
+        HttpResponse(204).raise_for_status()
+
+
+class TestHttpClient:
+    def test_middleware_order(self):
+        calls = []
+
+        class Tag(Middleware):
+            def __init__(self, name):
+                self.name = name
+
+            def handle(self, request, call_next):
+                calls.append(self.name)
+                return call_next(request)
+
+        transport = FakeTransport(lambda request: HttpResponse(200))
+        HttpClient(transport, [Tag("outer"), Tag("inner")]).get(URL)
+        assert calls == ["outer", "inner"]
+        assert transport.requests == [HttpRequest("GET", URL)]
+
+    def test_send_async(self):
+        transport = FakeTransport(lambda request: HttpResponse(200))
+        http = HttpClient(transport, [TimeoutMiddleware(5)])
+        response = asyncio.run(http.request_async("GET", URL))
+        assert response.status_code == 200
+        assert transport.requests[0].timeout == 5
+
+
+class TestTimeoutMiddleware:
+    def test_default_timeout(self):
+        transport = FakeTransport(lambda request: HttpResponse(200))
+        HttpClient(transport, [TimeoutMiddleware(7)]).get(URL)
+        assert transport.requests[0].timeout == 7
+
+    def test_own_timeout_kept(self):
+        transport = FakeTransport(lambda request: HttpResponse(200))
+        HttpClient(transport, [TimeoutMiddleware(7)]).get(URL, timeout=1)
+        assert transport.requests[0].timeout == 1
+
+
+class TestRetryMiddleware:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    def test_server_error_retried(self, clock):
+        transport = FakeTransport(responses(HttpResponse(503), HttpResponse(200)))
+        http = HttpClient(transport, [RetryMiddleware(sleep=clock.sleep)])
+        assert http.get(URL).status_code == 200
+        assert clock.sleeps == [1.0]
+
+    def test_connection_error_retried(self, clock):
+        transport = FakeTransport(
+            responses(requests.ConnectionError(), requests.Timeout(), HttpResponse(200))
+        )
+        http = HttpClient(transport, [RetryMiddleware(sleep=clock.sleep)])
+        assert http.get(URL).status_code == 200
+        assert clock.sleeps == [1.0, 2.0]
+
+    def test_gives_up_after_attempts(self, clock):
+        transport = FakeTransport(lambda request: HttpResponse(500))
+        http = HttpClient(transport, [RetryMiddleware(sleep=clock.sleep)])
+        assert http.get(URL).status_code == 500
+        assert len(transport.requests) == 3
+
+    def test_backoff_capped(self, clock):
+        transport = FakeTransport(lambda request: HttpResponse(500))
+        retry = RetryMiddleware(attempts=6, max_backoff=5, sleep=clock.sleep)
+        HttpClient(transport, [retry]).get(URL)
+        assert clock.sleeps == [1, 2, 4, 5, 5]
+
+    @pytest.mark.parametrize("status_code", [400, 404, 429])
+    def test_client_errors_not_retried(self, clock, status_code):
+        transport = FakeTransport(lambda request: HttpResponse(status_code))
+        HttpClient(transport, [RetryMiddleware(sleep=clock.sleep)]).get(URL)
+        assert len(transport.requests) == 1
+
+    def test_post_not_retried(self, clock):
+        transport = FakeTransport(responses(requests.ConnectionError()))
+        http = HttpClient(transport, [RetryMiddleware(sleep=clock.sleep)])
+        with pytest.raises(requests.ConnectionError):
+            http.post(URL)
+        assert clock.sleeps == []
+
+    def test_async(self):
+        transport = FakeTransport(responses(HttpResponse(502), HttpResponse(200)))
+        http = HttpClient(transport, [RetryMiddleware(backoff=0)])
+        assert asyncio.run(http.request_async("GET", URL)).status_code == 200
+        assert len(transport.requests) == 2
+
+
+class TestRateLimitMiddleware:
+    def test_burst_then_spaced(self):
+        clock = FakeClock()
+        limit = RateLimitMiddleware(
+            {"api.raindrop.io": 2.0}, burst=3, clock=clock, sleep=clock.sleep
+        )
+        http = HttpClient(FakeTransport(lambda request: HttpResponse(200)), [limit])
+        for _ in range(5):
+            http.get(URL)
+        assert clock.sleeps == [0.5, 0.5]
+
+    def test_unlimited_host(self):
+        clock = FakeClock()
+        limit = RateLimitMiddleware(
+            {"api.raindrop.io": 1.0}, burst=1, clock=clock, sleep=clock.sleep
+        )
+        http = HttpClient(FakeTransport(lambda request: HttpResponse(200)), [limit])
+        for _ in range(3):
+            http.get("https://api.todoist.com/api/v1/tasks")
+        assert clock.sleeps == []
+
+    def test_idle_host_refills(self):
+        clock = FakeClock()
+        limit = RateLimitMiddleware(
+            {"api.raindrop.io": 1.0}, burst=2, clock=clock, sleep=clock.sleep
+        )
+        http = HttpClient(FakeTransport(lambda request: HttpResponse(200)), [limit])
+        http.get(URL)
+        http.get(URL)
+        clock.now += 10
+        http.get(URL)
+        http.get(URL)
+        assert clock.sleeps == []
+
+
+class TestCacheMiddleware:
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.fixture
+    def cache(self, clock):
+        return CacheMiddleware(max_entries=2, clock=clock)
+
+    @pytest.fixture
+    def transport(self):
+        return FakeTransport(lambda request: HttpResponse.from_json({"ok": True}))
+
+    def test_hit_within_ttl(self, cache, transport, clock):
+        http = HttpClient(transport, [cache])
+        http.get(URL, cache_ttl=60)
+        clock.now = 59
+        http.get(URL, cache_ttl=60)
+        assert len(transport.requests) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expired(self, cache, transport, clock):
+        http = HttpClient(transport, [cache])
+        http.get(URL, cache_ttl=60)
+        clock.now = 60
+        http.get(URL, cache_ttl=60)
+        assert len(transport.requests) == 2
+
+    def test_no_ttl_not_cached(self, cache, transport):
+        http = HttpClient(transport, [cache])
+        http.get(URL)
+        http.get(URL)
+        assert len(transport.requests) == 2
+
+    def test_error_not_cached(self, cache):
+        transport = FakeTransport(lambda request: HttpResponse(500))
+        http = HttpClient(transport, [cache])
+        http.get(URL, cache_ttl=60)
+        http.get(URL, cache_ttl=60)
+        assert len(transport.requests) == 2
+
+    def test_keyed_by_params_and_credentials(self, cache, transport):
+        http = HttpClient(transport, [cache])
+        http.get(URL, params={"page": 0}, cache_ttl=60)
+        http.get(URL, params={"page": 1}, cache_ttl=60)
+        http.get(URL, params={"page": 0}, headers={"Authorization": "b"}, cache_ttl=60)
+        assert len(transport.requests) == 3
+
+    def test_write_invalidates_host(self, cache, transport):
+        http = HttpClient(transport, [cache])
+        http.get(URL, cache_ttl=60)
+        http.put("https://api.raindrop.io/rest/v1/raindrops/0")
+        http.get(URL, cache_ttl=60)
+        assert len(transport.requests) == 3
+
+    def test_write_to_other_host_keeps_entries(self, cache, transport):
+        http = HttpClient(transport, [cache])
+        http.get(URL, cache_ttl=60)
+        http.post("https://api.todoist.com/api/v1/tasks")
+        http.get(URL, cache_ttl=60)
+        assert len(transport.requests) == 2
+
+    def test_least_recently_used_evicted(self, cache, transport):
+        http = HttpClient(transport, [cache])
+        for page in (0, 1, 0, 2, 0, 1):
+            http.get(URL, params={"page": page}, cache_ttl=60)
+        requested = [request.params["page"] for request in transport.requests]
+        assert requested == [0, 1, 2, 1]
+
+
+class TestMetricsMiddleware:
+    def test_summary(self):
+        metrics = TransportMetrics()
+        transport = FakeTransport(
+            responses(
+                HttpResponse(200, b"abcd"),
+                HttpResponse(500, b"x"),
+                requests.ConnectionError(),
+            )
+        )
+        http = HttpClient(transport, [MetricsMiddleware(metrics)])
+        http.get(URL)
+        http.get(URL)
+        with pytest.raises(requests.ConnectionError):
+            http.get(URL)
+        summary = metrics.summary()["api.raindrop.io"]
+        assert summary["requests"] == 3
+        assert summary["errors"] == 2
+        assert summary["bytes"] == 5
+        assert summary["mean_seconds"] >= 0
+
+    def test_retries_each_recorded_cache_hits_not(self):
+        transport = FakeTransport(responses(HttpResponse(503), HttpResponse(200)))
+        metrics = TransportMetrics()
+        http = build_http_client(transport, metrics)
+        http.middleware[2] = RetryMiddleware(backoff=0)
+        http.get(URL, cache_ttl=60)
+        http.get(URL, cache_ttl=60)
+        assert metrics.summary()["api.raindrop.io"]["requests"] == 2
+
+
+class TestRequestsTransport:
+    def test_send(self):
+        session = Mock(spec=requests.Session)
+        session.request.return_value = Mock(
+            status_code=201, content=b'{"id": 1}', headers={"X-A": "b"}
+        )
+        response = RequestsTransport(session).send(
+            HttpRequest("POST", URL, json={"a": 1}, timeout=3)
+        )
+        assert response.json() == {"id": 1}
+        assert response.headers["x-a"] == "b"
+        assert session.request.call_args.kwargs["json"] == {"a": 1}
+        assert session.request.call_args.kwargs["timeout"] == 3
+
+
+class TestUrllib3Transport:
+    def test_json_body(self):
+        pool = Mock()
+        pool.request.return_value = Mock(status=200, data=b"{}", headers={})
+        Urllib3Transport(pool).send(
+            HttpRequest("PUT", URL, params={"page": 1}, json={"ids": [1]})
+        )
+        args, kwargs = pool.request.call_args
+        assert args == ("PUT", f"{URL}?page=1")
+        assert kwargs["body"] == b'{"ids": [1]}'
+        assert kwargs["headers"]["Content-Type"] == "application/json"
+
+    def test_form_body(self):
+        pool = Mock()
+        pool.request.return_value = Mock(status=200, data=b"{}", headers={})
+        Urllib3Transport(pool).send(HttpRequest("POST", URL, data={"a": "b c"}))
+        assert pool.request.call_args.kwargs["body"] == "a=b+c"
+
+    @pytest.mark.parametrize(
+        "error, expected",
+        [
+            (urllib3.exceptions.ReadTimeoutError(None, URL, "slow"), requests.Timeout),
+            (urllib3.exceptions.ProtocolError("reset"), requests.ConnectionError),
+        ],
+    )
+    def test_errors_mapped(self, error, expected):
+        pool = Mock()
+        pool.request.side_effect = error
+        with pytest.raises(expected):
+            Urllib3Transport(pool).send(HttpRequest("GET", URL))
+
+
+class TestAsyncTransport:
+    def test_send_async(self):
+        def handler(request):
+            return httpx.Response(200, json={"page": request.url.params["page"]})
+
+        async def main():
+            transport = AsyncTransport(
+                httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            )
+            try:
+                return await transport.send_async(
+                    HttpRequest("GET", URL, params={"page": 2})
+                )
+            finally:
+                await transport.aclose()
+
+        assert asyncio.run(main()).json() == {"page": "2"}
+
+    def test_connection_error_mapped(self):
+        def handler(request):
+            raise httpx.ConnectError("refused")
+
+        async def main():
+            transport = AsyncTransport(
+                httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            )
+            await transport.send_async(HttpRequest("GET", URL))
+
+        with pytest.raises(requests.ConnectionError):
+            asyncio.run(main())
+
+
+class TestHttpxTransportAdapter:
+    def test_request_and_response(self):
+        transport = FakeTransport(
+            lambda request: HttpResponse(
+                200,
+                b'{"id": "t1"}',
+                {"Content-Type": "application/json", "Content-Encoding": "gzip"},
+            )
+        )
+        client = httpx.Client(transport=HttpxTransportAdapter(HttpClient(transport)))
+        response = client.post(
+            "https://api.todoist.com/api/v1/tasks", json={"content": "x"}
+        )
+        assert response.json() == {"id": "t1"}
+        request = transport.requests[0]
+        assert request.method == "POST"
+        assert request.data == b'{"content":"x"}'
+
+    def test_decoded_body_not_decoded_again(self):
+        transport = FakeTransport(
+            lambda request: HttpResponse(200, b"{}", {"Content-Encoding": "gzip"})
+        )
+        client = httpx.Client(transport=HttpxTransportAdapter(HttpClient(transport)))
+        assert client.get(URL).json() == {}
+
+    def test_errors_mapped(self):
+        transport = FakeTransport(responses(requests.Timeout()))
+        client = httpx.Client(transport=HttpxTransportAdapter(HttpClient(transport)))
+        with pytest.raises(httpx.TimeoutException):
+            client.get(URL)
+
+
+class TestDefaultHttpClient:
+    def test_shared_until_replaced(self):
+        client = default_http_client()
+        assert default_http_client() is client
+        set_default_http_client(None)
+        assert default_http_client() is not client
+        set_default_http_client(None)
@@ -0,0 +1,93 @@
+import json
+import socket
+import urllib.error
+import urllib.request
+from unittest.mock import Mock
+
+import pytest
+
+from raindrop_todoist_syncer.daemon import CycleStats
+from raindrop_todoist_syncer.trigger import TriggerServer, parse_trigger
+
+
+@pytest.fixture
+def daemon():
+    daemon = Mock()
+    daemon.stats = CycleStats()
+    daemon.triggers = 2
+    return daemon
+
+
+@pytest.fixture
+def http_triggers(daemon):
+    triggers = TriggerServer(daemon, port=0)
+    triggers.start()
+    yield triggers
+    triggers.close()
+
+
+def request(triggers, method, path):
+    url = f"http://{TriggerServer.HOST}:{triggers.port}{path}"
+    req = urllib.request.Request(url, method=method)
+    try:
+        with urllib.request.urlopen(req, timeout=5) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as err:
+        return err.code, json.loads(err.read())
+
+
+@pytest.mark.parametrize("command, expected", [("sync", None), (" 42\n", 42)])
+def test_parse_trigger(command, expected):
+    assert parse_trigger(command) == expected
+
+
+def test_parse_trigger_invalid():
+    with pytest.raises(ValueError):
+        parse_trigger("favourite")
+
+
+class TestHttpTriggers:
+    def test_sync(self, http_triggers, daemon):
+        assert request(http_triggers, "POST", "/sync") == (202, {"queued": "sync"})
+        daemon.trigger.assert_called_once_with(None)
+
+    def test_push(self, http_triggers, daemon):
+        assert request(http_triggers, "POST", "/raindrops/42") == (202, {"queued": 42})
+        daemon.trigger.assert_called_once_with(42)
+
+    def test_bad_id(self, http_triggers, daemon):
+        status, _ = request(http_triggers, "POST", "/raindrops/abc")
+        assert status == 400
+        daemon.trigger.assert_not_called()
+
+    def test_unknown_path(self, http_triggers, daemon):
+        status, _ = request(http_triggers, "POST", "/other")
+        assert status == 404
+        daemon.trigger.assert_not_called()
+
+    def test_status(self, http_triggers):
+        status, body = request(http_triggers, "GET", "/status")
+        assert status == 200
+        assert body["cycles"] == 0
+        assert body["triggers"] == 2
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, "AF_UNIX"), reason="UNIX sockets are not available"
+)
+def test_socket_triggers(tmp_path, daemon):
+    socket_path = tmp_path / "rts.sock"
+    triggers = TriggerServer(daemon, socket_path=socket_path)
+    triggers.start()
+    try:
+        assert socket_path.stat().st_mode & 0o777 == 0o600
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.connect(str(socket_path))
+            client.sendall(b"sync\n42\nnope\n")
+            client.shutdown(socket.SHUT_WR)
+            replies = client.makefile().read().splitlines()
+    finally:
+        triggers.close()
+    assert replies == ["ok", "ok", "error: unknown command nope"]
+    assert [call.args for call in daemon.trigger.call_args_list] == [(None,), (42,)]
+    assert not socket_path.exists()